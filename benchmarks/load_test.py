@@ -0,0 +1,180 @@
+# *******************************************************************************************
+#  File:  load_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+# Runs many wtw processes at once against a temporary application folder and a local Open-Meteo stub, the way cron
+# jobs and supervisors do, and reports the throughput, the latency percentiles, the errors and the SQLite lock
+# contention seen. Run from the repository root:
+#
+#     python -m benchmarks.load_test --invocations 200 --concurrency 16 --mix current=5,forecast=3,add=1,delete=1
+#
+# Open-Meteo's per-minute quota is enforced by the application, so runs of more than about 600 upstream calls will
+# include time spent waiting for it.
+
+import argparse
+import collections
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from benchmarks.open_meteo_stub import OpenMeteoStub
+
+_COMMAND = [sys.executable, '-c', 'from wtw.core.commands import main; main()']
+
+# The messages SQLite and the application give when a process could not get the database lock in time
+_LOCK_ERRORS = ('database is locked', 'database table is locked')
+
+
+class _Run:
+    """
+    This class holds the shared state of a load test run
+    """
+
+    def __init__(self, folder: Path, env: dict, seeds: list[str], timeout: float) -> None:
+        self.folder = folder
+        self.env = env
+        self.timeout = timeout
+        self.names = list(seeds)
+        self.added: list[str] = list()
+        self.lock = threading.Lock()
+        self.counter = 0
+
+    def invoke(self, operation: str) -> tuple[str, float, bool, bool]:
+        """
+        Runs one invocation, returning the operation, its latency, whether it failed and whether it hit a lock
+        """
+        with self.lock:
+            self.counter += 1
+            number = self.counter
+            name = random.choice(self.names)
+            victim = self.added.pop(0) if operation == 'delete' and self.added else f"Missing {number}"
+
+        if operation == 'current':
+            arguments = ['current', name]
+        elif operation == 'forecast':
+            arguments = ['forecast', name]
+        elif operation == 'add':
+            batch = self.folder.joinpath(f"batch-{number}.txt")
+            batch.write_text(f"Added Site {number}\n", encoding='utf-8')
+            arguments = ['location', 'add', '--batch', str(batch)]
+        else:
+            arguments = ['location', 'delete', victim]
+
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(_COMMAND + arguments, env=self.env, capture_output=True, text=True,
+                                    timeout=self.timeout)
+            failed = result.returncode != 0
+            output = result.stdout + result.stderr
+        except subprocess.TimeoutExpired:
+            failed, output = True, 'timeout'
+        latency = time.perf_counter() - start
+
+        if operation == 'add' and not failed:
+            with self.lock:
+                self.added.append(f"Added Site {number}")
+
+        return operation, latency, failed, any(message in output for message in _LOCK_ERRORS)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))]
+
+
+def _parse_mix(value: str) -> dict[str, int]:
+    mix = dict()
+    for item in value.split(','):
+        operation, _, weight = item.partition('=')
+        if operation not in ('current', 'forecast', 'add', 'delete'):
+            raise argparse.ArgumentTypeError(f"unknown operation: {operation}")
+        mix[operation] = int(weight or 1)
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Concurrent invocation load test')
+    parser.add_argument('--invocations', type=int, default=200, help='The number of invocations in total')
+    parser.add_argument('--concurrency', type=int, default=16, help='The number of invocations running at once')
+    parser.add_argument('--mix', type=_parse_mix, default='current=5,forecast=3,add=1,delete=1',
+                        help='The relative weight of each operation')
+    parser.add_argument('--locations', type=int, default=20, help='The number of locations saved up front')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds the stub adds to every response')
+    parser.add_argument('--timeout', type=float, default=120.0, help='Seconds before an invocation is abandoned')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for the choice of operations')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    with tempfile.TemporaryDirectory(prefix='wtw-load-') as temp, OpenMeteoStub(latency=args.latency) as stub:
+        folder = Path(temp)
+        app_folder = folder.joinpath('app')
+        app_folder.mkdir()
+
+        env = dict(os.environ, WTW_APP_DIR=str(app_folder), WTW_OPEN_METEO_URL=stub.url, WTW_LOG_SINKS='file',
+                   PYTHONPATH=os.pathsep.join(filter(None, [str(Path.cwd()), os.environ.get('PYTHONPATH')])))
+
+        seeds = [f"Seed Town {i}" for i in range(args.locations)]
+        seed_file = folder.joinpath('seeds.txt')
+        seed_file.write_text('\n'.join(seeds) + '\n', encoding='utf-8')
+        subprocess.run(_COMMAND + ['location', 'add', '--batch', str(seed_file)], env=env, capture_output=True,
+                       check=True, timeout=args.timeout)
+        stub.requests.clear()
+
+        run = _Run(folder, env, seeds, args.timeout)
+        operations = random.choices(list(args.mix.keys()), weights=list(args.mix.values()), k=args.invocations)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(run.invoke, operations))
+        elapsed = time.perf_counter() - start
+
+        log_locks = 0
+        for log in app_folder.glob('app*.log'):
+            text = log.read_text(encoding='utf-8', errors='replace')
+            log_locks += sum(text.count(message) for message in _LOCK_ERRORS)
+
+    print(f"{args.invocations} invocations, {args.concurrency} at once, {args.locations} locations")
+    print(f"elapsed {elapsed:.2f}s, throughput {args.invocations / elapsed:.1f} invocations/s")
+    print(f"{'operation':<10} {'count':>6} {'errors':>7} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+
+    by_operation = collections.defaultdict(list)
+    for operation, latency, failed, locked in results:
+        by_operation[operation].append((latency, failed))
+    by_operation['all'] = [(latency, failed) for _, latency, failed, _ in results]
+
+    for operation, items in by_operation.items():
+        latencies = [latency for latency, _ in items]
+        errors = sum(1 for _, failed in items if failed)
+        print(f"{operation:<10} {len(items):>6} {errors / len(items):>6.1%} "
+              f"{_percentile(latencies, 50):>7.3f}s {_percentile(latencies, 90):>7.3f}s "
+              f"{_percentile(latencies, 99):>7.3f}s {max(latencies):>7.3f}s")
+
+    print(f"lock contention: {sum(1 for *_, locked in results if locked)} invocations reported a locked database, "
+          f"{log_locks} lock errors logged")
+    print(f"upstream requests: {dict(stub.requests)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+# *******************************************************************************************
+#  File:  open_meteo_stub.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['OpenMeteoStub']
+
+# A local stand-in for the Open-Meteo forecast, archive and geocoding APIs, serving the made up but consistent data
+# of the stub provider over HTTP, compressed and revalidated as the real service is. Point the application at it with
+# the WTW_OPEN_METEO_URL environment variable.
+# Run from the repository root:
+#
+#     python -m benchmarks.open_meteo_stub --port 8080
+
+import argparse
+import collections
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from wtw.core.providers import Response, StubProvider
+
+# The provider method answering each path
+_METHODS = {'/v1/archive': 'archive', '/v1/search': 'geocode'}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: 'OpenMeteoStub'
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        params = dict((key, values if key == 'daily' else values[0]) for key, values in parse_qs(url.query).items())
+        self.server.record(url.path)
+
+        if url.path == '/v1/forecast':
+            method = 'current' if 'current_weather' in params else 'forecast'
+        elif url.path in _METHODS:
+            method = _METHODS[url.path]
+        else:
+            self.send_error(404)
+            return
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        etag = self.headers.get('If-None-Match')
+        response = getattr(self.server.provider, method)(params, None if etag is None else Response(None, etag))
+        if response.not_modified:
+            self.send_response(304)
+            self.send_header('ETag', response.etag)
+            self.end_headers()
+            return
+
+        payload = response.body
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', response.etag)
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            payload = gzip.compress(payload, 6)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class OpenMeteoStub(ThreadingHTTPServer):
+    """
+    This class serves the stub on a local port, counting the requests to each endpoint
+    """
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0) -> None:
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.latency = latency
+        self.provider = StubProvider()
+        self.requests: collections.Counter = collections.Counter()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def record(self, path: str) -> None:
+        with self._lock:
+            self.requests[path] += 1
+
+    def __enter__(self) -> 'OpenMeteoStub':
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Local Open-Meteo stub')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    args = parser.parse_args()
+
+    with OpenMeteoStub(args.port, args.latency) as stub:
+        print(f"Serving the Open-Meteo stub on {stub.url}, press Ctrl+C to stop")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# *******************************************************************************************
+#  File:  pipeline_benchmark.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+# Measures how forecast decoding scales with the number of parse processes, using synthetic documents so that the
+# network plays no part. Run from the repository root:
+#
+#     python -m benchmarks.pipeline_benchmark --locations 20000
+
+import argparse
+import datetime
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from wtw.core import pipeline
+from wtw.core import weather_service
+
+
+def _payload(days: int) -> bytes:
+    start = datetime.date(2022, 9, 14)
+    dates = [(start + datetime.timedelta(days=i)).isoformat() for i in range(days)]
+    daily = {'time': dates}
+    for field, upstream in weather_service.FORECAST_VARIABLES.items():
+        if field in ('sunrise', 'sunset'):
+            daily[upstream] = [f"{day}T0{random.randint(5, 7)}:{random.randint(10, 59)}" for day in dates]
+        else:
+            daily[upstream] = [round(random.uniform(0, 40), 1) for _ in dates]
+    return json.dumps({'daily': daily}).encode()
+
+
+def _serial(payloads: list[bytes], fields: tuple[str, ...]) -> float:
+    start = time.perf_counter()
+    for payload in payloads:
+        pipeline.decode_forecast('Bench', payload, fields)
+    return time.perf_counter() - start
+
+
+def _parallel(payloads: list[bytes], fields: tuple[str, ...], workers: int) -> float:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Start the workers and import the pipeline in each before the clock starts
+        for _ in pool.map(pipeline.decode_forecast, ['Bench'] * workers, payloads[:1] * workers, [fields] * workers):
+            pass
+
+        start = time.perf_counter()
+        columns = pool.map(pipeline.decode_forecast, ['Bench'] * len(payloads), payloads,
+                           [fields] * len(payloads), chunksize=64)
+        for _ in columns:
+            pass
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Forecast decoding benchmark')
+    parser.add_argument('--locations', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=16)
+    args = parser.parse_args()
+
+    fields = tuple(weather_service.FORECAST_VARIABLES.keys())
+    payloads = [_payload(args.days) for _ in range(args.locations)]
+
+    print(f"{args.locations} locations x {args.days} days")
+    print(f"serial decode:             {_serial(payloads, fields):8.3f}s")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        print(f"process pool, {workers:2} workers: {_parallel(payloads, fields, workers):8.3f}s")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,10 @@ setup(
         'Rich',
         'Related'
     ],
+    extras_require={
+        'export': ['pyarrow'],
+        'brotli': ['brotli']
+    },
     entry_points={
         'console_scripts': [
             'wtw = wtw.core.commands:main',
@@ -0,0 +1,48 @@
+# *******************************************************************************************
+#  File:  aggregate_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import datetime
+import json
+from wtw.core import aggregate
+from wtw.core import pipeline
+
+
+def _forecast(name: str, temperatures: list) -> pipeline.ForecastColumns:
+    payload = json.dumps({'daily': {'time': ['2022-09-14', '2022-09-15'], 'temperature_2m_max': temperatures}})
+    return pipeline.decode_forecast(name, payload.encode(), ('temp_max',))
+
+
+def test_percentile_interpolates() -> None:
+    assert aggregate.percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert aggregate.percentile([1.0, 2.0, 3.0, 4.0], 100) == 4.0
+    assert aggregate.percentile([5.0], 90) == 5.0
+
+
+def test_summarise_per_day() -> None:
+    forecasts = [_forecast('Bern', [20.0, None]), _forecast('Thun', [22.0, 18.0]), _forecast('Biel', [24.0, 19.0])]
+
+    statistics = aggregate.summarise(forecasts, ('temp_max',))
+
+    assert [(stats.day, stats.count) for stats in statistics] == [(datetime.date(2022, 9, 14), 3),
+                                                                   (datetime.date(2022, 9, 15), 2)]
+    assert statistics[0].minimum == 20.0
+    assert statistics[0].maximum == 24.0
+    assert statistics[0].mean == 22.0
+    assert statistics[0].p50 == 22.0
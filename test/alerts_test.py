@@ -0,0 +1,69 @@
+# *******************************************************************************************
+#  File:  alerts_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import json
+import sys
+from pathlib import Path
+import pytest
+from wtw.core import alerts
+from wtw.core import pipeline
+from wtw.core.commands import _alerts
+
+_PAYLOAD = json.dumps({'daily': {'time': ['2022-09-14', '2022-09-15', '2022-09-16'],
+                                 'weathercode': [3, 96, None], 'snowfall_sum': [0.0, 7.5, 5.0],
+                                 'windspeed_10m_max': [12.0, None, 75.0]}}).encode()
+
+
+def test_compile_rule() -> None:
+    rule = alerts.compile_rule('Snow', 'snowfall > 5cm')
+
+    assert rule.field == 'snowfall'
+    assert rule.predicate(5.5)
+    assert not rule.predicate(5.0)
+    assert not rule.predicate(float('nan'))
+
+
+@pytest.mark.parametrize('expression', ['snowfall > 5mm', 'hail > 1', 'wind_speed >> 60'])
+def test_compile_rule_rejects_invalid(expression: str) -> None:
+    with pytest.raises(ValueError):
+        alerts.compile_rule('Bad', expression)
+
+
+def test_evaluate(tmp_path: Path) -> None:
+    rules_file = tmp_path.joinpath('alerts.conf')
+    rules_file.write_text("# Alerts\nSnow: snowfall > 5cm\nWind: wind_speed >= 60 km/h\n\n"
+                          "Thunderstorm: weather_code in 95..99\n", encoding='utf-8')
+    rules = alerts.load_rules(rules_file)
+    forecast = pipeline.decode_forecast('Bern', _PAYLOAD, ('weather_code', 'snowfall', 'wind_speed'))
+
+    raised = sorted((alert['rule'], alert['day']) for alert in alerts.evaluate(rules, [forecast]))
+
+    assert raised == [('Snow', '2022-09-15'), ('Thunderstorm', '2022-09-15'), ('Wind', '2022-09-16')]
+
+    thunderstorm = next(alert for alert in alerts.evaluate(rules, [forecast]) if alert['rule'] == 'Thunderstorm')
+    assert json.dumps(thunderstorm['value']) == '96'
+
+
+def test_diagnostics_kept_off_the_output(tmp_path: Path, capsys) -> None:
+    _alerts.alerts(tmp_path.joinpath('missing.conf'), sys.stdout, None)
+
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert 'Unable to read the alert rules' in captured.err
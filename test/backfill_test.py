@@ -0,0 +1,90 @@
+# *******************************************************************************************
+#  File:  backfill_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import datetime
+import json
+import sqlite3
+from unittest import mock
+from wtw.core import backfill
+from wtw.core import weather_service
+from wtw.core.model import Location
+
+_BERN = Location("Bern", "Bern", 7.4, 46.9, "Bern", "CH", "Switzerland", "Europe/Zurich")
+
+
+def _archive(lat, long, timezone, start, end, variables) -> bytes:
+    days = [(start + datetime.timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+    daily = dict((weather_service.ARCHIVE_VARIABLES[field], [None] * len(days)) for field in variables)
+    daily['time'] = days
+    daily['temperature_2m_max'] = [float(i) for i in range(len(days))]
+    return json.dumps({'daily': daily}).encode()
+
+
+def test_chunk_range() -> None:
+    chunks = backfill.chunk_range(datetime.date(2022, 1, 1), datetime.date(2022, 1, 25), 10)
+
+    assert chunks == [(datetime.date(2022, 1, 1), datetime.date(2022, 1, 10)),
+                      (datetime.date(2022, 1, 11), datetime.date(2022, 1, 20)),
+                      (datetime.date(2022, 1, 21), datetime.date(2022, 1, 25))]
+
+
+def test_backfill_resumes_failed_chunks(tmp_path) -> None:
+    db_file = tmp_path.joinpath('data.sqlite')
+    start, end = datetime.date(2022, 1, 1), datetime.date(2022, 1, 25)
+
+    def flaky(lat, long, timezone, first, last, variables):
+        return None if first == datetime.date(2022, 1, 11) else _archive(lat, long, timezone, first, last, variables)
+
+    with mock.patch('wtw.core.weather_service.download_archive', side_effect=flaky):
+        report = backfill.backfill([_BERN], start, end, workers=2, chunk_days=10, file=db_file)
+
+    assert (report.chunks, report.days, len(report.failed)) == (2, 15, 1)
+
+    with mock.patch('wtw.core.weather_service.download_archive', side_effect=_archive) as download:
+        report = backfill.backfill([_BERN], start, end, workers=2, chunk_days=10, file=db_file)
+
+    assert download.call_count == 1
+    assert (report.chunks, report.skipped, report.days) == (1, 2, 10)
+
+    con = sqlite3.connect(db_file)
+    assert con.execute("SELECT COUNT(*), MIN(day), MAX(day) FROM observation").fetchone() == (25, '2022-01-01',
+                                                                                             '2022-01-25')
+    assert con.execute("SELECT temp_max, rain FROM observation WHERE day = '2022-01-12'").fetchone() == (1.0, None)
+    assert con.execute("SELECT COUNT(*) FROM observation WHERE showers IS NOT NULL").fetchone() == (0,)
+    con.close()
+
+
+def test_archive_request_excludes_showers() -> None:
+    with mock.patch.object(weather_service, '_download') as download:
+        weather_service.download_archive(46.9, 7.4, 'Europe/Zurich', datetime.date(2022, 1, 1),
+                                         datetime.date(2022, 1, 31))
+
+    assert 'showers_sum' not in download.call_args.args[1]['daily']
+    assert 'rain_sum' in download.call_args.args[1]['daily']
+
+
+def test_backfill_stops_at_archive_end(tmp_path) -> None:
+    start = backfill.archive_end() - datetime.timedelta(days=2)
+
+    with mock.patch('wtw.core.weather_service.download_archive', side_effect=_archive) as download:
+        report = backfill.backfill([_BERN], start, datetime.date.today(), file=tmp_path.joinpath('data.sqlite'))
+
+    assert download.call_args.args[3:5] == (start, backfill.archive_end())
+    assert report.days == 3
@@ -0,0 +1,129 @@
+# *******************************************************************************************
+#  File:  batch_geocoding_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import csv
+from unittest import mock
+from wtw.core import data
+from wtw.core import errors
+from wtw.core import model
+from wtw.core import providers
+from wtw.core import weather_service
+from wtw.core.commands import _add_location
+from wtw.core.response_cache import ResponseCache
+
+_PLACES = {
+    'Springfield': model.Locations([
+        model.Location('Springfield', 'Springfield', -89.6, 39.8, 'Illinois', 'US', 'United States', 'America/Chicago',
+                       population=114000),
+        model.Location('Springfield', 'Springfield', -72.6, 42.1, 'Massachusetts', 'US', 'United States',
+                       'America/New_York', population=155000)]),
+    'Bern': model.Locations([
+        model.Location('Bern', 'Bern', 7.4, 46.9, 'Bern', 'CH', 'Switzerland', 'Europe/Zurich', population=121000)])
+}
+
+
+def test_select_by_population() -> None:
+    location, candidates = _add_location._select(_PLACES['Springfield'], 'population', None)
+    assert location.region == 'Massachusetts'
+    assert candidates == 2
+
+
+def test_select_with_country_filter() -> None:
+    assert _add_location._select(_PLACES['Bern'], 'first', 'us') == (None, 0)
+
+
+def test_add_batch(tmp_path) -> None:
+    names = tmp_path.joinpath('names.txt')
+    names.write_text('springfield\nBern\nAtlantis\nBern\n')
+
+    with mock.patch('wtw.core.weather_service.get_locations', side_effect=lambda name, **kwargs: _PLACES.get(name)), \
+            mock.patch('wtw.core.data.insert_location_records', return_value=[]) as insert:
+        result = _add_location.add_batch(names, policy='population')
+
+    assert result == model.Result.Success
+    assert [record.region for record in insert.call_args.args[0]] == ['Massachusetts', 'Bern']
+
+    with names.with_suffix('.report.csv').open() as file:
+        rows = [(row['name'], row['status']) for row in csv.DictReader(file)]
+    assert rows == [('Springfield', 'ambiguous'), ('Atlantis', 'unresolved')]
+
+
+def test_add_batch_carries_on_after_errors(tmp_path) -> None:
+    names = tmp_path.joinpath('names.txt')
+    names.write_text('bern\nAtlantis\nBern\n')
+    calls = list()
+
+    def geocode(name, **kwargs):
+        calls.append(name)
+        if name == 'Atlantis':
+            raise errors.RateLimitExceededError(30)
+        return _PLACES.get(name)
+
+    with mock.patch('wtw.core.weather_service.get_locations', side_effect=geocode), \
+            mock.patch('wtw.core.data.insert_location_records', return_value=[]) as insert:
+        result = _add_location.add_batch(names)
+
+    assert result == model.Result.Success
+    assert sorted(calls) == ['Atlantis', 'Bern']
+    assert [record.name for record in insert.call_args.args[0]] == ['Bern']
+
+    with names.with_suffix('.report.csv').open() as file:
+        rows = [(row['name'], row['status']) for row in csv.DictReader(file)]
+    assert rows == [('Atlantis', 'error')]
+
+
+class _Unavailable(providers.StubProvider):
+    name = 'unavailable'
+
+    def geocode(self, params: dict, cached: providers.Response | None = None) -> providers.Response:
+        if params['name'] == 'Atlantis':
+            raise errors.ProviderError(self.name, 'connection refused')
+        return super().geocode(params, cached)
+
+
+def test_add_batch_reports_provider_failures(tmp_path) -> None:
+    names = tmp_path.joinpath('names.txt')
+    names.write_text('Bern\nAtlantis\n')
+
+    with mock.patch.object(weather_service, '_router', providers.Router([_Unavailable()])), \
+            mock.patch.object(weather_service, '_store', ResponseCache(tmp_path.joinpath('responses.sqlite'))), \
+            mock.patch.dict(weather_service._cache, clear=True), \
+            mock.patch('wtw.core.data.insert_location_records', return_value=[]) as insert:
+        assert weather_service.get_locations('Atlantis', show_status=False) is None
+        _add_location.add_batch(names)
+
+    assert [record.name for record in insert.call_args.args[0]] == ['Bern']
+
+    with names.with_suffix('.report.csv').open() as file:
+        rows = [(row['name'], row['status']) for row in csv.DictReader(file)]
+    assert rows == [('Bern', 'ambiguous'), ('Atlantis', 'error')]
+
+
+def test_insert_batch_skips_duplicates(tmp_path) -> None:
+    db_file = tmp_path.joinpath('data.sqlite')
+    bern = _PLACES['Bern'][0]
+    springfield = _PLACES['Springfield'][0]
+    basel = model.Location('Basel', 'Basel', 7.6, 47.6, 'Basel-Stadt', 'CH', 'Switzerland', 'Europe/Zurich')
+    assert data.insert_location_record(bern, db_file)
+
+    assert data.insert_location_records([springfield, bern, basel], db_file) == ['Bern']
+
+    assert [record.name for record in data.iter_locations(file=db_file)] == ['Basel', 'Bern', 'Springfield']
+    assert data.get_location_record('Bern', db_file).region == 'Bern'
@@ -0,0 +1,63 @@
+# *******************************************************************************************
+#  File:  export_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import csv
+import json
+import pytest
+from wtw.core import export
+from wtw.core import pipeline
+
+_PAYLOAD = json.dumps({'daily': {'time': ['2022-09-14', '2022-09-15'], 'weathercode': [3, 61],
+                                 'temperature_2m_max': [21.5, None], 'sunrise': ['2022-09-14T06:58', None]}}).encode()
+_FIELDS = ('weather_code', 'temp_max', 'sunrise')
+
+
+def test_export_csv(tmp_path) -> None:
+    path = tmp_path.joinpath('forecasts.csv')
+    with export.open_writer('csv', path, batch_size=1) as writer:
+        writer.add(pipeline.decode_forecast('Bern', _PAYLOAD, _FIELDS))
+        writer.add(pipeline.decode_forecast('Basel', _PAYLOAD, _FIELDS))
+
+    with path.open() as file:
+        rows = list(csv.DictReader(file))
+
+    assert writer.rows == 4
+    assert rows[0]['location'] == 'Bern'
+    assert rows[0]['day'] == '2022-09-14'
+    assert rows[0]['sunrise'] == '2022-09-14T06:58'
+    assert rows[1]['weather_summary'] == 'Rain: Slight, moderate and heavy intensity'
+    assert rows[1]['temp_max'] == ''
+
+
+def test_export_parquet_row_groups(tmp_path) -> None:
+    parquet = pytest.importorskip('pyarrow.parquet')
+
+    path = tmp_path.joinpath('forecasts.parquet')
+    with export.open_writer('parquet', path, batch_size=1) as writer:
+        for name in ('Bern', 'Basel', 'Thun'):
+            writer.add(pipeline.decode_forecast(name, _PAYLOAD, _FIELDS))
+
+    file = parquet.ParquetFile(path)
+    table = file.read()
+
+    assert file.num_row_groups == 3
+    assert table.num_rows == 6
+    assert str(table.schema.field('day').type) == 'date32[day]'
+    assert table.column('temp_max').to_pylist()[:2] == [21.5, None]
@@ -0,0 +1,98 @@
+# *******************************************************************************************
+#  File:  forecast_cache_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import datetime
+import json
+import math
+import pytest
+from wtw.core import pipeline
+from wtw.core.forecast_cache import ForecastCache, write_cache
+
+_PAYLOAD = json.dumps({'daily': {'time': ['2022-09-14', '2022-09-15'], 'weathercode': [3, 61],
+                                 'temperature_2m_max': [21.5, None], 'sunrise': ['2022-09-14T06:58', None]}}).encode()
+_FIELDS = ('weather_code', 'temp_max', 'sunrise')
+
+
+@pytest.fixture()
+def cache_file(tmp_path):
+    file = tmp_path.joinpath('forecasts.bin')
+    write_cache(file, [pipeline.decode_forecast(f"Site-{i}", _PAYLOAD, _FIELDS) for i in range(100)], days=7,
+                fields=_FIELDS)
+    return file
+
+
+def test_lookup_location(cache_file) -> None:
+    with ForecastCache(cache_file) as cache:
+        forecasts = cache.get("Site-42").to_forecasts()
+
+    assert len(forecasts) == 2
+    assert forecasts[0].location == "Site-42"
+    assert forecasts[0].day == datetime.date(2022, 9, 14)
+    assert forecasts[0].temp_max == 21.5
+    assert forecasts[0].sunrise == datetime.datetime(2022, 9, 14, 6, 58)
+    assert forecasts[1].temp_max is None
+    assert forecasts[1].sunrise is None
+
+
+def test_missing_and_expired_locations(cache_file) -> None:
+    with ForecastCache(cache_file) as cache:
+        assert cache.get("Nowhere") is None
+        assert cache.get("Site-1", max_age=-1) is None
+
+
+def test_scan_column(cache_file) -> None:
+    with ForecastCache(cache_file) as cache:
+        column = cache.column('temp_max')
+        assert len(column) == 100 * 7
+        assert sum(value for value in column if not math.isnan(value)) == 100 * 21.5
+        column.release()
+
+
+def test_reject_other_files(tmp_path) -> None:
+    file = tmp_path.joinpath('other.bin')
+    file.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        ForecastCache(file)
+
+
+@pytest.mark.parametrize('length', [40, 'half', 'short'])
+def test_reject_truncated_files(cache_file, length) -> None:
+    content = cache_file.read_bytes()
+    cache_file.write_bytes(content[:{'half': len(content) // 2, 'short': len(content) - 8}.get(length, length)])
+
+    with pytest.raises(ValueError):
+        ForecastCache(cache_file)
+
+
+def test_locations_sharing_a_label(tmp_path) -> None:
+    file = tmp_path.joinpath('forecasts.bin')
+    other = json.dumps({'daily': {'time': ['2022-09-14'], 'weathercode': [0], 'temperature_2m_max': [30.0],
+                                  'sunrise': [None]}}).encode()
+    long_name = 'Springfield ' * 10
+    write_cache(file, [pipeline.decode_forecast('Springfield', _PAYLOAD, _FIELDS, 'Springfield Illinois'),
+                       pipeline.decode_forecast('Springfield', other, _FIELDS, 'Springfield Oregon'),
+                       pipeline.decode_forecast('Springfield', other, _FIELDS, long_name)], fields=_FIELDS)
+
+    with ForecastCache(file) as cache:
+        assert cache.get('Springfield Illinois').to_forecasts()[0].temp_max == 21.5
+        forecast = cache.get('Springfield Oregon', location='Springfield').to_forecasts()[0]
+        assert (forecast.location, forecast.temp_max) == ('Springfield', 30.0)
+        assert cache.get(long_name).name == long_name
+        assert cache.get('Springfield') is None
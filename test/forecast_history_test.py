@@ -0,0 +1,88 @@
+# *******************************************************************************************
+#  File:  forecast_history_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import math
+import time
+from array import array
+from wtw.core import forecast_history
+from wtw.core import pipeline
+
+
+def _forecast(issue: int) -> pipeline.ForecastColumns:
+    # Each issue starts a day later and revises only the last day of the previous one
+    days = array('l', range(738000 + issue, 738016 + issue))
+    temperatures = array('d', (20.0 + (day % 7) + (0.5 if day == 738015 + issue else 0.0) for day in days))
+    sunrise = array('q', (day * 86400 + 25000 for day in days))
+    rain = array('d', [math.nan] * len(days))
+    return pipeline.ForecastColumns('Bern', days, {'temp_max': temperatures, 'sunrise': sunrise, 'rain': rain})
+
+
+def _equal(left: pipeline.ForecastColumns, right: pipeline.ForecastColumns) -> bool:
+    return list(left.days) == list(right.days) and left.columns.keys() == right.columns.keys() and \
+        all(left.columns[field].tobytes() == right.columns[field].tobytes() for field in left.columns)
+
+
+def test_block_round_trip_and_size() -> None:
+    snapshots = [forecast_history.Snapshot(1000.0 + issue, _forecast(issue)) for issue in range(32)]
+
+    block = forecast_history.encode_block(snapshots, 9)
+    decoded = forecast_history.decode_block('Bern', block)
+
+    assert [snapshot.issued for snapshot in decoded] == [snapshot.issued for snapshot in snapshots]
+    assert all(_equal(left.forecast, right.forecast) for left, right in zip(decoded, snapshots))
+
+    raw = sum(len(column.tobytes()) for snapshot in snapshots for column in snapshot.forecast.columns.values())
+    independent = sum(len(forecast_history.encode_block([snapshot], 9)) for snapshot in snapshots)
+    assert len(block) * 10 < raw
+    assert len(block) * 5 < independent
+
+
+def test_append_and_compact(tmp_path) -> None:
+    history = forecast_history.ForecastHistory(tmp_path.joinpath('history.sqlite'), block_size=4)
+    now = time.time()
+
+    for issue in range(10):
+        history.append([_forecast(issue)], issued=now - (9 - issue) * 86400)
+
+    snapshots = list(history.snapshots('Bern'))
+    assert len(snapshots) == 10
+    assert _equal(snapshots[7].forecast, _forecast(7))
+    assert len(list(history.snapshots('Bern', since=now - 2.5 * 86400))) == 3
+
+    report = history.compact(keep_days=5)
+
+    assert (report.snapshots, report.pruned) == (5, 5)
+    assert [snapshot.forecast.days[0] for snapshot in history.snapshots('Bern')] == list(range(738005, 738010))
+
+
+def test_locations_sharing_a_label(tmp_path) -> None:
+    history = forecast_history.ForecastHistory(tmp_path.joinpath('history.sqlite'))
+    first, second = _forecast(0), _forecast(1)
+    illinois = pipeline.ForecastColumns('Springfield', first.days, first.columns, 'Springfield Illinois')
+    oregon = pipeline.ForecastColumns('Springfield', second.days, second.columns, 'Springfield Oregon')
+
+    history.append([illinois, oregon], issued=1000.0)
+    history.append([illinois], issued=2000.0)
+
+    snapshots = list(history.snapshots('Springfield Illinois'))
+    assert [snapshot.issued for snapshot in snapshots] == [1000.0, 2000.0]
+    assert all(_equal(snapshot.forecast, illinois) for snapshot in snapshots)
+    assert _equal(next(history.snapshots('Springfield Oregon')).forecast, oregon)
+    assert list(history.snapshots('Springfield')) == []
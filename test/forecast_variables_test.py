@@ -0,0 +1,66 @@
+# *******************************************************************************************
+#  File:  forecast_variables_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import json
+from unittest import mock
+import pytest
+import wtw.core.weather_service as service
+from wtw.core.response_cache import ResponseCache
+
+
+class _Response:
+    status_code = 200
+    headers = {}
+    content = json.dumps({'daily': {'time': ['2022-09-14', '2022-09-15'], 'weathercode': [3, 61],
+                                    'temperature_2m_max': [21.5, 18.0], 'temperature_2m_min': [9.1, 10.4]}}).encode()
+
+
+@pytest.fixture()
+def session(tmp_path):
+    with mock.patch.object(service, '_limiter', mock.Mock()), \
+            mock.patch.object(service, '_router', None), \
+            mock.patch.object(service, '_store', ResponseCache(tmp_path.joinpath('responses.sqlite'))), \
+            mock.patch.dict('os.environ', {'WTW_PROVIDERS': 'open-meteo'}), \
+            mock.patch.object(service._session, 'get', return_value=_Response()) as get:
+        yield get
+
+
+def test_forecast_requests_only_selected_variables(session) -> None:
+    forecasts = service.get_forecast('Bern', 46.94809, 7.44744, 'Europe/Zurich', show_status=False,
+                                     variables=['weather_code', 'temp_max', 'temp_min'])
+
+    assert session.call_args.kwargs['params']['daily'] == ['weathercode', 'temperature_2m_max',
+                                                           'temperature_2m_min']
+    assert forecasts[1].weather_code == 61
+    assert forecasts[1].weather_summary == 'Rain: Slight, moderate and heavy intensity'
+    assert forecasts[0].temp_max == 21.5
+    assert forecasts[0].sunrise is None
+
+
+def test_forecast_rejects_unknown_variable(session) -> None:
+    with pytest.raises(ValueError):
+        service.get_forecast('Bern', 46.94809, 7.44744, 'Europe/Zurich', variables=['humidity'])
+
+
+def test_forecast_variables_from_generator(session) -> None:
+    service.get_forecast('Bern', 46.94809, 7.44744, 'Europe/Zurich', show_status=False,
+                         variables=(field for field in ('temp_max', 'temp_min')))
+
+    assert session.call_args.kwargs['params']['daily'] == ['temperature_2m_max', 'temperature_2m_min']
@@ -0,0 +1,67 @@
+# *******************************************************************************************
+#  File:  location_listing_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import click
+import pytest
+from wtw.core import errors
+from wtw.core.commands import _core
+from wtw.core.model import Location
+from wtw.core.data import LOCATION_FILTERS, insert_location_record, iter_locations
+
+
+@pytest.fixture()
+def db_file(tmp_path):
+    db_file = tmp_path.joinpath('data.sqlite')
+    for name, country_code, country in (("Zurich", "CH", "Switzerland"), ("Bern", "CH", "Switzerland"),
+                                        ("Berlin", "DE", "Germany"), ("Basel", "CH", "Switzerland"),
+                                        ("Aachen", "DE", "Germany")):
+        location = Location(name, name, 7.4, 46.9, "", country_code, country, "Europe/Zurich", [])
+        assert insert_location_record(location, db_file)
+    return db_file
+
+
+def test_iterate_in_location_order(db_file) -> None:
+    names = [record.name for record in iter_locations(batch_size=2, file=db_file)]
+    assert names == ["Aachen", "Basel", "Berlin", "Bern", "Zurich"]
+
+
+def test_keyset_pages(db_file) -> None:
+    first = [record.name for record in iter_locations(limit=2, file=db_file)]
+    second = [record.name for record in iter_locations(after=first[-1], limit=2, file=db_file)]
+    assert first == ["Aachen", "Basel"]
+    assert second == ["Berlin", "Bern"]
+
+
+def test_filter(db_file) -> None:
+    names = [record.name for record in iter_locations(filters={'country_code': 'DE'}, file=db_file)]
+    assert names == ["Aachen", "Berlin"]
+
+
+def test_unknown_after(db_file) -> None:
+    with pytest.raises(errors.RecordNotFoundError):
+        list(iter_locations(after="Nowhere", file=db_file))
+
+
+def test_filter_option_accepts_data_filters() -> None:
+    filters = tuple(f"{column}=x" for column in LOCATION_FILTERS)
+    assert _core._parse_filters(None, None, filters) == dict.fromkeys(LOCATION_FILTERS, 'x')
+
+    with pytest.raises(click.BadParameter):
+        _core._parse_filters(None, None, ('latitude=46',))
@@ -0,0 +1,60 @@
+# *******************************************************************************************
+#  File:  location_search_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import pytest
+from wtw.core.model import Location
+from wtw.core.data import insert_location_record, delete_location_record, get_location_record, search_locations
+
+
+@pytest.fixture()
+def db_file(tmp_path):
+    db_file = tmp_path.joinpath('data.sqlite')
+    for name, region in (("New York City", "New York"), ("Langenthal", "Bern"), ("Bern", "Bern"),
+                         ("Berlin", "Berlin")):
+        location = Location(name, name, 7.79607, 47.21526, region, "CH", "Switzerland", "Europe/Zurich", ["4900"])
+        assert insert_location_record(location, db_file)
+    return db_file
+
+
+def test_search_partial_name(db_file) -> None:
+    records = search_locations("new york", file=db_file)
+    assert records[0].name == "New York City"
+
+
+def test_search_misspelt_name(db_file) -> None:
+    records = search_locations("Lagenthal", file=db_file)
+    assert records[0].name == "Langenthal"
+
+
+def test_search_short_prefix(db_file) -> None:
+    records = search_locations("Be", file=db_file)
+    assert [record.name for record in records] == ["Berlin", "Bern"]
+
+
+def test_search_index_follows_deletes(db_file) -> None:
+    assert delete_location_record("Berlin", db_file)
+    records = search_locations("Berlin", file=db_file)
+    assert all(record.name != "Berlin" for record in records)
+
+
+def test_get_location_keeps_coordinates(db_file) -> None:
+    record = get_location_record("Bern", db_file)
+    assert record.latitude == 47.21526
+    assert record.longitude == 7.79607
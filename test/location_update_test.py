@@ -0,0 +1,78 @@
+# *******************************************************************************************
+#  File:  location_update_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import attr
+import pytest
+from wtw.core import model
+from wtw.core import utils
+from wtw.core.commands import _update_location
+from wtw.core.model import Location
+from wtw.core.data import insert_location_record, get_location_record, update_location_record, \
+    update_location_records
+
+
+@pytest.fixture()
+def db_file(tmp_path):
+    db_file = tmp_path.joinpath('data.sqlite')
+    for name in ("Bern", "Basel"):
+        location = Location(name, name, 7.4, 46.9, "", "CH", "Switzerland", "Europe/Zurich", [])
+        assert insert_location_record(location, db_file)
+    return db_file
+
+
+def test_update_bumps_lock_version(db_file) -> None:
+    record = get_location_record("Bern", db_file)
+    assert update_location_record(attr.evolve(record, region="Bern"), db_file)
+
+    updated = get_location_record("Bern", db_file)
+    assert updated.region == "Bern"
+    assert updated.lock_version == record.lock_version + 1
+
+
+def test_stale_update_is_rejected(db_file) -> None:
+    first = get_location_record("Bern", db_file)
+    second = get_location_record("Bern", db_file)
+
+    assert update_location_record(attr.evolve(first, region="Bern"), db_file)
+    assert not update_location_record(attr.evolve(second, region="BE"), db_file)
+    assert get_location_record("Bern", db_file).region == "Bern"
+
+
+def test_batch_update_reports_stale_records(db_file) -> None:
+    bern = get_location_record("Bern", db_file)
+    basel = get_location_record("Basel", db_file)
+
+    stale = update_location_records([attr.evolve(bern, region="Bern"),
+                                     attr.evolve(basel, region="Basel-Stadt", lock_version=99)], db_file)
+
+    assert stale == ["Basel"]
+    assert get_location_record("Bern", db_file).region == "Bern"
+    assert get_location_record("Basel", db_file).region == ""
+
+
+def test_update_file_skips_invalid_rows(db_file, tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(utils, 'app_folder', lambda: db_file.parent)
+    changes = tmp_path.joinpath('changes.csv')
+    changes.write_text('name,region,latitude\nbern,Bern,46.95\nbasel,Basel-Stadt,north\n')
+
+    assert _update_location.update_batch(changes) == model.Result.Fail
+
+    assert get_location_record("Bern", db_file).latitude == 46.95
+    assert get_location_record("Basel", db_file).region == ""
@@ -0,0 +1,39 @@
+# *******************************************************************************************
+#  File:  name_index_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+from wtw.core.model import Location
+from wtw.core.data import insert_location_record, delete_location_record
+from wtw.core.name_index import lookup
+
+
+def test_index_follows_inserts_and_deletes(tmp_path) -> None:
+    db_file = tmp_path.joinpath('data.sqlite')
+    for name in ("Bern", "Berlin", "Basel"):
+        assert insert_location_record(Location(name, name, 7.4, 46.9, "Bern", "CH", "Switzerland", "Europe/Zurich"),
+                                      db_file)
+
+    assert lookup("ber", db_file=db_file) == ["Berlin", "Bern"]
+
+    assert delete_location_record("Berlin", db_file)
+    assert lookup("ber", db_file=db_file) == ["Bern"]
+
+
+def test_lookup_without_index(tmp_path) -> None:
+    assert lookup("ber", db_file=tmp_path.joinpath('data.sqlite')) == []
@@ -0,0 +1,87 @@
+# *******************************************************************************************
+#  File:  pager_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import io
+from rich.console import Console
+from wtw.core import pager
+from wtw.core import ui
+
+
+def _pager(count: int, drawn: list, formatted: list) -> pager.Pager:
+    def items():
+        for i in range(count):
+            drawn.append(i)
+            yield f"Town {i}"
+
+    def row(index, item):
+        formatted.append(index)
+        return str(index), item
+
+    console = Console(file=io.StringIO(), width=60, height=16, theme=ui.theme)
+    return pager.Pager((("Id", "right"), ("Name", "left")), items(), row, title="towns", console=console)
+
+
+def test_first_screen_is_lazy() -> None:
+    drawn, formatted = list(), list()
+    view = _pager(10000, drawn, formatted)
+
+    view.console.print(view)
+
+    assert view.height == 10
+    assert len(drawn) == 10
+    assert formatted == list(range(10))
+    assert "Rows 1-10 of 10+" in view.console.file.getvalue()
+
+
+def test_scrolling() -> None:
+    drawn, formatted = list(), list()
+    view = _pager(25, drawn, formatted)
+
+    view.handle('pagedown')
+    assert view.top == 10
+    view.handle('pagedown')
+    assert view.top == 15
+    view.handle('up')
+    assert view.top == 14
+    view.handle('home')
+    assert view.top == 0
+    view.handle('end')
+    assert view.top == 15
+    assert not view.handle('q')
+
+
+def test_search() -> None:
+    drawn, formatted = list(), list()
+    view = _pager(1000, drawn, formatted)
+
+    for key in ['/', 'T', 'o', 'w', 'n', ' ', '4', '2', 'enter']:
+        view.handle(key)
+
+    assert view.match == 42
+    assert view.top == 42
+    assert len(drawn) == 52
+
+    view.handle('n')
+    assert view.match == 420
+
+    view.handle('/')
+    for key in ['x', 'y', 'enter']:
+        view.handle(key)
+    assert view.message == "Not found: xy"
@@ -0,0 +1,60 @@
+# *******************************************************************************************
+#  File:  pipeline_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import datetime
+import json
+from unittest import mock
+from wtw.core import pipeline
+from wtw.core.model import Location
+
+_PAYLOAD = json.dumps({'daily': {'time': ['2022-09-14', '2022-09-15'], 'weathercode': [3, None],
+                                 'temperature_2m_max': [21.5, 18.0], 'sunrise': ['2022-09-14T06:58', None]}}).encode()
+_FIELDS = ('weather_code', 'temp_max', 'sunrise')
+
+
+def test_decode_round_trip() -> None:
+    forecasts = pipeline.decode_forecast('Bern', _PAYLOAD, _FIELDS).to_forecasts()
+
+    assert forecasts[0].day == datetime.date(2022, 9, 14)
+    assert forecasts[0].weather_code == 3
+    assert forecasts[0].temp_max == 21.5
+    assert forecasts[0].sunrise == datetime.datetime(2022, 9, 14, 6, 58)
+    assert forecasts[1].weather_code is None
+    assert forecasts[1].sunrise is None
+
+
+def test_fetch_forecasts_decodes_in_worker_processes() -> None:
+    locations = [Location(f"Site-{i}", f"Site-{i}", 7.4, 46.9, "Bern", "CH", "Switzerland", "Europe/Zurich")
+                 for i in range(10)]
+
+    with mock.patch('wtw.core.weather_service.download_forecast', return_value=_PAYLOAD):
+        results = list(pipeline.fetch_forecasts(locations, _FIELDS, io_workers=2, parse_workers=2))
+
+    assert sorted(record.name for record, _ in results) == sorted(record.name for record in locations)
+    assert all(len(columns) == 2 for _, columns in results)
+
+
+def test_fetch_forecasts_reports_failed_downloads() -> None:
+    locations = [Location("Bern", "Bern", 7.4, 46.9, "Bern", "CH", "Switzerland", "Europe/Zurich")]
+
+    with mock.patch('wtw.core.weather_service.download_forecast', side_effect=OSError('offline')):
+        results = list(pipeline.fetch_forecasts(locations, _FIELDS, io_workers=1, parse_workers=1))
+
+    assert results == [(locations[0], None)]
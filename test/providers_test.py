@@ -0,0 +1,168 @@
+# *******************************************************************************************
+#  File:  providers_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import json
+import time
+import pytest
+import requests
+from wtw.core import errors
+from wtw.core import providers
+from wtw.core import weather_service
+
+_PARAMS = {'latitude': 46.9, 'longitude': 7.4, 'timezone': 'Europe/Zurich', 'daily': ['temperature_2m_max']}
+
+
+class _Failing(providers.Provider):
+    def __init__(self, name: str, status_code: int | None = None) -> None:
+        self.name = name
+        self.status_code = status_code
+        self.calls = 0
+
+    def forecast(self, params: dict, cached: providers.Response | None = None) -> providers.Response:
+        self.calls += 1
+        raise errors.ProviderError(self.name, 'unavailable', self.status_code)
+
+    current = archive = geocode = forecast
+
+
+class _Named(providers.StubProvider):
+    def __init__(self, name: str) -> None:
+        super().__init__()
+        self.name = name
+        self.calls = 0
+
+    def forecast(self, params: dict, cached: providers.Response | None = None) -> providers.Response:
+        self.calls += 1
+        return super().forecast(params, cached)
+
+
+def test_stub_documents() -> None:
+    stub = providers.StubProvider()
+
+    response = stub.forecast(_PARAMS)
+    forecast = json.loads(response.body)
+    assert len(forecast['daily']['time']) == 7
+    assert len(forecast['daily']['temperature_2m_max']) == 7
+    assert stub.forecast(_PARAMS).body == response.body
+    assert stub.forecast(_PARAMS, response).not_modified
+
+    archive = json.loads(stub.archive(dict(_PARAMS, start_date='2022-01-01', end_date='2022-01-31')).body)
+    assert archive['daily']['time'][0] == '2022-01-01'
+    assert len(archive['daily']['time']) == 31
+
+    places = json.loads(stub.geocode({'name': 'bern', 'count': 2}).body)
+    assert [place['name'] for place in places['results']] == ['Bern', 'Bern']
+
+
+def test_failover() -> None:
+    failing, backup = _Failing('failing'), _Named('backup')
+    router = providers.Router([failing, backup])
+
+    response = router.call('forecast', _PARAMS)
+
+    assert 'daily' in json.loads(response.body)
+    assert failing.calls == 1 and backup.calls == 1
+    stats = router.stats()
+    assert stats['failing'].errors == 1
+    assert stats['backup'].latency is not None
+
+
+def test_all_providers_fail() -> None:
+    router = providers.Router([_Failing('one'), _Failing('two')])
+
+    with pytest.raises(errors.ProviderError):
+        router.call('forecast', _PARAMS)
+
+
+def test_invalid_request_not_retried() -> None:
+    rejecting, backup = _Failing('rejecting', 400), _Named('backup')
+    router = providers.Router([rejecting, backup])
+
+    with pytest.raises(errors.ProviderError):
+        router.call('forecast', _PARAMS)
+    assert backup.calls == 0
+
+
+def test_ranked_by_latency() -> None:
+    slow, fast = _Named('slow'), _Named('fast')
+    router = providers.Router([slow, fast])
+
+    # Both are untried, so both get called once before the latencies decide
+    router.call('forecast', _PARAMS)
+    assert [provider.name for provider in router.ranked()] == ['fast', 'slow']
+
+    router._stats['slow'].latency = 0.5
+    router._stats['fast'].latency = 0.01
+    assert [provider.name for provider in router.ranked()] == ['fast', 'slow']
+
+    router._stats['fast'].latency = 1.0
+    assert [provider.name for provider in router.ranked()] == ['slow', 'fast']
+
+
+def test_cooldown() -> None:
+    failing, backup = _Failing('failing'), _Named('backup')
+    router = providers.Router([failing, backup], max_failures=2, cooldown=60)
+    router._stats['backup'].latency = 10.0
+
+    router.call('forecast', _PARAMS)
+    router.call('forecast', _PARAMS)
+    assert not router.stats()['failing'].healthy(providers.time.monotonic())
+
+    # Left out, though it is still ranked first on latency
+    router._stats['failing'].latency = 0.001
+    router.call('forecast', _PARAMS)
+    assert failing.calls == 2
+    assert [provider.name for provider in router.ranked()] == ['backup', 'failing']
+
+
+class _Session:
+    def get(self, **kwargs) -> requests.Response:
+        time.sleep(0.01)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"daily": {}}'
+        return response
+
+
+def test_quota_wait_not_counted_as_latency() -> None:
+    provider = providers.OpenMeteoProvider(session=_Session(), acquire=lambda: time.sleep(0.3))
+    router = providers.Router([provider])
+
+    response = router.call('forecast', _PARAMS)
+
+    assert 0.01 <= response.elapsed < 0.3
+    assert router.stats()['open-meteo'].latency == response.elapsed
+
+
+def test_provider_interface_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        providers.Provider()
+
+
+def test_configure_from_environment(monkeypatch) -> None:
+    monkeypatch.setattr(weather_service, '_router', None)
+    monkeypatch.setenv('WTW_PROVIDERS', 'stub, http://localhost:8080/')
+
+    names = [provider.name for provider in weather_service._get_router().providers]
+
+    assert names == ['stub', 'http://localhost:8080']
+    weather_service.configure_providers([providers.StubProvider()])
+    assert list(weather_service.provider_stats().keys()) == ['stub']
+    monkeypatch.setattr(weather_service, '_router', None)
@@ -0,0 +1,49 @@
+# *******************************************************************************************
+#  File:  rate_limit_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import pytest
+from wtw.core import errors
+from wtw.core.rate_limit import Mode, RateLimiter, Window
+
+
+def test_fail_fast_when_quota_exhausted(tmp_path) -> None:
+    limiter = RateLimiter((Window('minute', 3, 60),), Mode.FailFast, file=tmp_path.joinpath('limit.sqlite'))
+    for _ in range(3):
+        limiter.acquire()
+
+    with pytest.raises(errors.RateLimitExceededError) as e:
+        limiter.acquire()
+    assert e.value.retry_after > 0
+
+
+def test_quota_shared_between_limiters(tmp_path) -> None:
+    file = tmp_path.joinpath('limit.sqlite')
+    windows = (Window('minute', 10, 60), Window('day', 2, 86400))
+    RateLimiter(windows, Mode.FailFast, file=file).acquire()
+    RateLimiter(windows, Mode.FailFast, file=file).acquire()
+
+    with pytest.raises(errors.RateLimitExceededError):
+        RateLimiter(windows, Mode.FailFast, file=file).acquire()
+
+
+def test_queue_waits_for_refill(tmp_path) -> None:
+    limiter = RateLimiter((Window('second', 1, 1),), Mode.Queue, max_wait=5, file=tmp_path.joinpath('limit.sqlite'))
+    limiter.acquire()
+    limiter.acquire()
@@ -0,0 +1,116 @@
+# *******************************************************************************************
+#  File:  refresh_lock_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import pytest
+import wtw.core.weather_service as service
+from wtw.core.providers import Response
+from wtw.core.response_cache import ResponseCache
+
+_KEY = ('forecast', 'Bern', (('latitude', 46.9),))
+
+
+class _Provider:
+    """
+    Answers slowly, counting the requests, like an upstream many processes call at once
+    """
+
+    def __init__(self, delay: float = 0.3) -> None:
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, method: str, params: dict, message: str, show_status: bool,
+                 cached: Response | None = None) -> Response:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return Response(b'fresh')
+
+
+@pytest.fixture()
+def provider(tmp_path):
+    fake = _Provider()
+    with mock.patch.object(service, '_store', ResponseCache(tmp_path.joinpath('responses.sqlite'))), \
+            mock.patch.object(service, '_download', fake), \
+            mock.patch.object(service, '_cache', dict()):
+        yield fake
+
+
+def _fetch() -> object:
+    return service._fetch('forecast', {}, _KEY, '', False, lambda body: body.decode())
+
+
+def test_lease_taken_by_one_owner(tmp_path) -> None:
+    store = ResponseCache(tmp_path.joinpath('responses.sqlite'))
+
+    assert store.lock('key', 'first', 60)
+    assert not store.lock('key', 'second', 60)
+    assert store.lock('key', 'first', 60)
+
+    store.unlock('key', 'second')
+    assert not store.lock('key', 'second', 60)
+
+    store.unlock('key', 'first')
+    assert store.lock('key', 'second', 60)
+
+
+def test_lapsed_lease_taken_over(tmp_path) -> None:
+    store = ResponseCache(tmp_path.joinpath('responses.sqlite'))
+
+    # The first owner crashed without giving the lease up
+    assert store.lock('key', 'crashed', -1)
+    assert store.lock('key', 'second', 60)
+
+
+def test_one_refresh_for_concurrent_callers(provider) -> None:
+    # Each thread stands for a process, the in-process request coalescing being bypassed
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        values = list(pool.map(lambda _: _fetch(), range(8)))
+
+    assert provider.calls == 1
+    assert values == ['fresh'] * 8
+
+
+def test_stale_response_served_during_refresh(provider) -> None:
+    service._store.put(repr(_KEY), 'forecast', Response(b'stale'), -10)
+    assert service._store.lock(repr(_KEY), 'other process', 60)
+
+    assert _fetch() == 'stale'
+    assert provider.calls == 0
+
+
+def test_gives_up_waiting(provider) -> None:
+    assert service._store.lock(repr(_KEY), 'hung process', 60)
+
+    with mock.patch.object(service, 'REFRESH_WAIT', 0.2):
+        assert _fetch() == 'fresh'
+    assert provider.calls == 1
+
+
+def test_stale_value_from_older_body_not_served(provider) -> None:
+    service._cache_put(_KEY, 'parsed earlier', -10, Response(b'older', '"v1"'))
+    service._store.put(repr(_KEY), 'forecast', Response(b'stale', '"v2"'), -10)
+    assert service._store.lock(repr(_KEY), 'other process', 60)
+
+    assert _fetch() == 'stale'
@@ -0,0 +1,165 @@
+# *******************************************************************************************
+#  File:  response_cache_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import json
+from unittest import mock
+import pytest
+import wtw.core.weather_service as service
+from wtw.core.response_cache import ResponseCache
+
+_BODY = json.dumps({'daily': {'time': ['2022-09-14'], 'weathercode': [3], 'temperature_2m_max': [21.5],
+                              'temperature_2m_min': [9.1]}}).encode()
+
+
+class _Raw:
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    def tell(self) -> int:
+        return self.size
+
+
+class _Response:
+    def __init__(self, status_code: int, content: bytes, headers: dict, received: int) -> None:
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode()
+        self.headers = headers
+        self.raw = _Raw(received)
+
+
+class _Session:
+    """
+    Answers like a server supporting validators and compression, the body being a third of its size on the wire
+    """
+
+    def __init__(self) -> None:
+        self.requests: list[dict] = list()
+
+    def get(self, url: str, params: dict, headers: dict, timeout: float) -> _Response:
+        self.requests.append(headers)
+        if headers.get('If-None-Match') in ('"v1"', '"v2"'):
+            return _Response(304, b'', {'ETag': headers['If-None-Match']}, 0)
+        return _Response(200, _BODY, {'ETag': '"v1"', 'Last-Modified': 'Wed, 14 Sep 2022 06:00:00 GMT'},
+                         len(_BODY) // 3)
+
+
+@pytest.fixture()
+def session(tmp_path):
+    fake = _Session()
+    with mock.patch.object(service, '_limiter', mock.Mock()), \
+            mock.patch.object(service, '_router', None), \
+            mock.patch.object(service, '_store', ResponseCache(tmp_path.joinpath('responses.sqlite'))), \
+            mock.patch.object(service, '_session', fake), \
+            mock.patch.object(service, '_cache', dict()), \
+            mock.patch.dict('os.environ', {'WTW_PROVIDERS': 'open-meteo'}):
+        yield fake
+
+
+def _forecast():
+    return service.get_forecast('Bern', 46.94809, 7.44744, 'Europe/Zurich', show_status=False,
+                                variables=['weather_code', 'temp_max', 'temp_min'])
+
+
+def _expire() -> None:
+    con = service._store._connect()
+    con.execute("UPDATE response SET expires = 0")
+    con.close()
+    for key, (_, value, validators) in service._cache.items():
+        service._cache[key] = (0, value, validators)
+
+
+def test_compressed_bodies_requested(session) -> None:
+    _forecast()
+
+    assert 'gzip' in session.requests[0]['Accept-Encoding']
+    assert 'If-None-Match' not in session.requests[0]
+
+
+def test_fresh_response_shared_between_processes(session) -> None:
+    first = _forecast()
+
+    # A new process starts with an empty in-memory cache, but finds the response stored by the first one
+    service._cache.clear()
+    second = _forecast()
+
+    assert len(session.requests) == 1
+    assert second[0].temp_max == first[0].temp_max
+
+
+def test_unchanged_response_reused_without_parsing(session) -> None:
+    first = _forecast()
+    _expire()
+
+    with mock.patch.object(service, '_parse_forecast') as parse:
+        second = _forecast()
+
+    assert session.requests[1]['If-None-Match'] == '"v1"'
+    assert session.requests[1]['If-Modified-Since'] == 'Wed, 14 Sep 2022 06:00:00 GMT'
+    assert parse.call_count == 0
+    assert second is first
+    assert service._store.get(repr(next(iter(service._cache))))[0] > 0
+
+    # The refreshed response is fresh again, so the next request is answered without asking
+    service._cache.clear()
+    _forecast()
+    assert len(session.requests) == 2
+
+
+def test_unchanged_response_parsed_from_store(session) -> None:
+    _forecast()
+    _expire()
+    service._cache.clear()
+
+    forecasts = _forecast()
+
+    assert len(session.requests) == 2
+    assert forecasts[0].temp_max == 21.5
+
+
+def test_transfers_counted_per_endpoint(session) -> None:
+    _forecast()
+    _expire()
+    _forecast()
+    service.get_locations('Bern', show_status=False)
+
+    transfers = dict((item.endpoint, item) for item in service.transfer_stats())
+
+    assert transfers['forecast'].requests == 2
+    assert transfers['forecast'].not_modified == 1
+    assert transfers['forecast'].received == len(_BODY) // 3
+    assert transfers['forecast'].decoded == len(_BODY)
+    assert transfers['geocode'].requests == 1
+
+
+def test_value_from_older_body_not_reused(session) -> None:
+    first = _forecast()
+    _expire()
+
+    # Another process stored a newer response in the meantime
+    key = repr(next(iter(service._cache)))
+    newer = _BODY.replace(b'21.5', b'25.0')
+    service._store.put(key, 'forecast', service.providers.Response(newer, '"v2"'), -1)
+
+    second = _forecast()
+
+    assert session.requests[1]['If-None-Match'] == '"v2"'
+    assert second is not first
+    assert second[0].temp_max == 25.0
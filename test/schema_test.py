@@ -0,0 +1,77 @@
+# *******************************************************************************************
+#  File:  schema_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import sqlite3
+from wtw.core import schema
+from wtw.core.data import database_status, migrate_database, get_location_record, search_locations
+
+
+def _legacy_database(db_file) -> None:
+    con = sqlite3.connect(db_file)
+    con.execute(schema.MIGRATIONS[0].statements[0])
+    con.execute("""INSERT INTO location(name, location, latitude, longitude, timezone, region, country_code, country,
+                        post_codes) VALUES ('Bern', 'Bern', '46.94809', '7.44744', 'Europe/Zurich', 'Bern', 'CH',
+                        'Switzerland', '3000')""")
+    con.commit()
+    con.close()
+
+
+def test_status_of_legacy_database(tmp_path) -> None:
+    db_file = tmp_path.joinpath('data.sqlite')
+    _legacy_database(db_file)
+
+    version, pending = database_status(db_file)
+    assert version == 0
+    assert [migration.version for migration in pending] == [migration.version for migration in schema.MIGRATIONS]
+
+
+def test_migrate_legacy_database(tmp_path) -> None:
+    db_file = tmp_path.joinpath('data.sqlite')
+    _legacy_database(db_file)
+
+    applied = migrate_database(db_file)
+    assert len(applied) == len(schema.MIGRATIONS)
+    assert database_status(db_file) == (schema.LATEST_VERSION, [])
+    assert migrate_database(db_file) == []
+
+    con = sqlite3.connect(db_file)
+    assert con.execute("SELECT typeof(latitude), typeof(longitude) FROM location").fetchone() == ('real', 'real')
+    con.close()
+
+    record = get_location_record('Bern', db_file)
+    assert record.latitude == 46.94809
+    assert search_locations('ber', file=db_file)[0].name == 'Bern'
+
+
+def test_migrate_without_trigram_tokenizer(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(schema, '_trigram_available', lambda db_con: False)
+    db_file = tmp_path.joinpath('data.sqlite')
+    _legacy_database(db_file)
+
+    migrate_database(db_file)
+    assert database_status(db_file) == (schema.LATEST_VERSION, [])
+
+    con = sqlite3.connect(db_file)
+    assert con.execute("SELECT name FROM sqlite_master WHERE name LIKE 'location_search%'").fetchall() == []
+    con.close()
+
+    assert search_locations('ber', file=db_file)[0].name == 'Bern'
+    assert search_locations('switz', file=db_file)[0].name == 'Bern'
+    assert search_locations('zurich', file=db_file) is None
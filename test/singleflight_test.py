@@ -0,0 +1,72 @@
+# *******************************************************************************************
+#  File:  singleflight_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from wtw.core.singleflight import FlightStats, SingleFlight
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    flights = SingleFlight()
+    release = threading.Event()
+    executions = list()
+
+    def work() -> str:
+        executions.append(1)
+        release.wait(5)
+        return 'result'
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flights.do, 'key', work) for _ in range(8)]
+        deadline = time.monotonic() + 5
+        while flights.stats().get('key', FlightStats()).calls < 8 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == ['result'] * 8
+    assert len(executions) == 1
+    assert flights.stats()['key'].saved == 7
+
+
+def test_error_is_shared_and_key_released() -> None:
+    flights = SingleFlight()
+
+    def fail() -> None:
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        flights.do('key', fail)
+
+    assert flights.do('key', lambda: 'ok') == 'ok'
+    assert flights.stats()['key'].executed == 2
+
+
+def test_stats_keep_recent_keys_only() -> None:
+    flights = SingleFlight(max_keys=3)
+
+    for key in ('a', 'b', 'c', 'a', 'd'):
+        flights.do(key, lambda: None)
+
+    stats = flights.stats()
+    assert list(stats) == ['c', 'a', 'd']
+    assert stats['a'].calls == 2
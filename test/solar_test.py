@@ -0,0 +1,101 @@
+# *******************************************************************************************
+#  File:  solar_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import datetime
+from wtw.core import model
+from wtw.core import solar
+from wtw.core.model import Location
+
+_BERN = Location("Bern", "Bern", 7.44744, 46.94809, "Bern", "CH", "Switzerland", "Europe/Zurich")
+_SYDNEY = Location("Sydney", "Sydney", 151.20732, -33.86785, "New South Wales", "AU", "Australia",
+                   "Australia/Sydney")
+_TROMSO = Location("Tromsø", "Tromsø", 18.9553, 69.6496, "Troms og Finnmark", "NO", "Norway", "Europe/Oslo")
+
+
+def _minutes(value: datetime.datetime) -> int:
+    return value.hour * 60 + value.minute
+
+
+def test_sun_times_match_published_times() -> None:
+    # Published times: Bern 05:34 - 21:29 and Sydney 07:00 - 16:54 on the June solstice, Bern 08:13 - 16:43 and
+    # Sydney 05:41 - 20:05 on the December solstice, in local time with daylight saving where it applies
+    summer = datetime.date(2022, 6, 21).toordinal()
+    winter = datetime.date(2022, 12, 21).toordinal()
+    bern, sydney = solar.sun_times([_BERN, _SYDNEY], [summer, winter])
+
+    expected = [(bern, 0, (5, 34), (21, 29)), (sydney, 0, (7, 0), (16, 54)),
+                (bern, 1, (8, 13), (16, 43)), (sydney, 1, (5, 41), (20, 5))]
+    for times, index, sunrise, sunset in expected:
+        rise, set_ = times.times(index)
+        assert abs(_minutes(rise) - (sunrise[0] * 60 + sunrise[1])) <= 3
+        assert abs(_minutes(set_) - (sunset[0] * 60 + sunset[1])) <= 3
+        assert abs(times.day_length[index] - (set_ - rise).total_seconds()) <= 1
+
+
+def test_polar_day_and_night() -> None:
+    days = [datetime.date(2022, 6, 21).toordinal(), datetime.date(2022, 12, 21).toordinal()]
+    times = solar.sun_times([_TROMSO], days)[0]
+
+    assert times.times(0) == (None, None)
+    assert times.day_length[0] == 86400
+    assert times.times(1) == (None, None)
+    assert times.day_length[1] == 0
+
+
+def test_unknown_time_zone_uses_solar_time() -> None:
+    # Sydney keeps the time of its meridian, UTC+10, outside daylight saving
+    record = Location("Nowhere", "Nowhere", 151.20732, -33.86785, "", "XX", "", "Not/AZone")
+    day = datetime.date(2022, 6, 21).toordinal()
+
+    rise, _ = solar.sun_times([record], [day])[0].times(0)
+    zoned, _ = solar.sun_times([_SYDNEY], [day])[0].times(0)
+
+    assert rise == zoned
+
+
+def test_add_sun_times_keeps_downloaded_times() -> None:
+    downloaded = datetime.datetime(2022, 9, 14, 7, 7)
+    forecasts = model.Forecasts([
+        model.Forecast(location='Bern', day=datetime.date(2022, 9, 14), sunrise=downloaded,
+                       sunset=datetime.datetime(2022, 9, 14, 19, 44)),
+        model.Forecast(location='Bern', day=datetime.date(2022, 9, 15), temp_max=18.0)])
+
+    result = solar.add_sun_times(_BERN, forecasts)
+
+    assert result[0].sunrise == downloaded
+    assert result[1].sunrise.date() == datetime.date(2022, 9, 15)
+    assert result[1].temp_max == 18.0
+    assert model.Forecasts.row(result[1])[6].startswith('12h')
+
+
+def test_sun_forecasts_offline() -> None:
+    forecasts = solar.sun_forecasts(_BERN, datetime.date(2022, 9, 14))
+
+    assert len(forecasts) == 7
+    assert forecasts[6].day == datetime.date(2022, 9, 20)
+    assert all(forecast.sunrise is not None and forecast.weather_code is None for forecast in forecasts)
+
+
+def test_polar_day_length_shown() -> None:
+    forecasts = solar.sun_forecasts(_TROMSO, datetime.date(2022, 6, 21), 1) + \
+        solar.sun_forecasts(_TROMSO, datetime.date(2022, 12, 21), 1)
+
+    assert [model.Forecasts.row(forecast)[4:7] for forecast in forecasts] == [('-', '-', '24h 00m'),
+                                                                              ('-', '-', '0h 00m')]
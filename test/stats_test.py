@@ -0,0 +1,75 @@
+# *******************************************************************************************
+#  File:  stats_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import datetime
+from array import array
+import pytest
+from wtw.core import data
+
+
+def _store(db_file, year: int, values: list[float]) -> None:
+    start = datetime.date(year, 1, 1)
+    days = array('l', (start.toordinal() + i for i in range(len(values))))
+    data.insert_observation_chunk('Bern', start, start + datetime.timedelta(days=len(values) - 1), days,
+                                  {'temp_max': array('d', values)}, db_file)
+
+
+def test_rolling_statistics_and_anomalies(tmp_path) -> None:
+    db_file = tmp_path.joinpath('data.sqlite')
+    _store(db_file, 2020, [0.0, 2.0, 4.0, 6.0])
+    _store(db_file, 2021, [2.0, 4.0, 6.0, 8.0])
+
+    statistics = data.observation_statistics('Bern', 'temp_max', datetime.date(2021, 1, 2),
+                                             datetime.date(2021, 1, 4), 2, db_file)
+
+    assert [item.day for item in statistics] == [datetime.date(2021, 1, day) for day in (2, 3, 4)]
+    assert [item.rolling_mean for item in statistics] == [3.0, 5.0, 7.0]
+    assert statistics[0].rolling_min == 2.0
+    assert statistics[0].normal == 3.0
+    assert statistics[0].anomaly == 1.0
+
+
+def test_climatology_follows_replaced_observations(tmp_path) -> None:
+    db_file = tmp_path.joinpath('data.sqlite')
+    _store(db_file, 2020, [0.0, 2.0])
+    _store(db_file, 2021, [2.0, 4.0])
+    _store(db_file, 2021, [4.0, 6.0])
+
+    statistics = data.observation_statistics('Bern', 'temp_max', datetime.date(2021, 1, 1),
+                                             datetime.date(2021, 1, 2), 1, db_file)
+
+    assert [item.normal for item in statistics] == [2.0, 4.0]
+    assert data.observation_range('Bern', db_file) == (datetime.date(2020, 1, 1), datetime.date(2021, 1, 2))
+
+
+def test_unknown_metric(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        data.observation_statistics('Bern', 'sunrise', datetime.date(2021, 1, 1), datetime.date(2021, 1, 2), 1,
+                                    tmp_path.joinpath('data.sqlite'))
+
+
+def test_wind_direction_not_averaged(tmp_path) -> None:
+    db_file = tmp_path.joinpath('data.sqlite')
+    start = datetime.date(2021, 1, 1)
+    data.insert_observation_chunk('Bern', start, start, array('l', [start.toordinal()]),
+                                  {'wind_direction': array('d', [350.0])}, db_file)
+
+    with pytest.raises(ValueError):
+        data.observation_statistics('Bern', 'wind_direction', start, start, 1, db_file)
@@ -0,0 +1,52 @@
+# *******************************************************************************************
+#  File:  watch_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import datetime
+from unittest import mock
+from wtw.core import model
+from wtw.core.commands import _weather
+
+_BERN = model.Location("Bern", "Bern", 7.44744, 46.94809, "Bern", "CH", "Switzerland", "Europe/Zurich")
+_WEATHER = model.CurrentWeather(18.0, 10.0, 270.0, 1, 'Mainly clear', datetime.datetime(2022, 9, 14, 12), 'Bern')
+
+
+def test_watch_keeps_last_good_row() -> None:
+    updates = list()
+    polls = [_WEATHER, None, ValueError('bad document')]
+
+    def current_weather(*args, **kwargs) -> model.CurrentWeather | None:
+        value = polls.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    def sleep(seconds: int) -> None:
+        if not polls:
+            raise KeyboardInterrupt()
+
+    with mock.patch.object(_weather, '_find_location', return_value=_BERN), \
+            mock.patch('wtw.core.weather_service.get_current_weather', side_effect=current_weather), \
+            mock.patch('rich.live.Live') as live, mock.patch('time.sleep', side_effect=sleep), \
+            mock.patch('wtw.core.ui.console'):
+        live.return_value.__enter__.return_value.update.side_effect = \
+            lambda board, refresh: updates.append(list(board))
+        _weather.watch(('bern',), 1)
+
+    assert updates == [[model.CurrentWeatherBoard.format_row(_BERN, _WEATHER)]]
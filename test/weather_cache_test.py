@@ -0,0 +1,36 @@
+# *******************************************************************************************
+#  File:  weather_cache_test.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = []
+
+import wtw.core.weather_service as service
+
+
+def test_cache_key_ignores_parameter_order() -> None:
+    first = service._cache_key('url', {'latitude': 1.0, 'daily': ['a', 'b']})
+    second = service._cache_key('url', {'daily': ['a', 'b'], 'latitude': 1.0})
+    assert first == second
+
+
+def test_cache_entry_expires() -> None:
+    key = service._cache_key('url', {'name': 'Langenthal'})
+    service._cache_put(key, 'value', ttl=-1)
+    assert service._cache_get(key) is None
+
+    service._cache_put(key, 'value')
+    assert service._cache_get(key) == 'value'
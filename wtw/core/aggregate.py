@@ -0,0 +1,75 @@
+# *******************************************************************************************
+#  File:  aggregate.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['METRICS', 'percentile', 'summarise']
+
+import datetime
+import math
+from array import array
+from typing import Iterable
+from . import model
+from . import pipeline
+
+# The forecast fields summarised across the sites of a region
+METRICS = ('temp_max', 'temp_min', 'precipitation_sum', 'wind_speed')
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Returns the q-th percentile of sorted values, interpolating linearly between the closest ranks
+
+    :param values: The values, sorted in ascending order
+    :param q: The percentile, between 0 and 100
+    :return: The percentile
+    """
+    position = (len(values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarise(forecasts: Iterable[pipeline.ForecastColumns],
+              metrics: tuple[str, ...] = METRICS) -> list[model.DailyStatistics]:
+    """
+    Computes the per-day statistics of each metric across many locations. The forecast columns are gathered into
+    one packed array per day and metric, then each array is sorted once and reduced.
+
+    :param forecasts: The forecasts of the locations
+    :param metrics: The forecast fields to summarise
+    :return: The statistics ordered by day then metric
+    """
+    gathered: dict[tuple[int, str], array] = dict()
+
+    for forecast in forecasts:
+        for metric in metrics:
+            column = forecast.columns.get(metric)
+            if column is None:
+                continue
+            for day, value in zip(forecast.days, column):
+                if not math.isnan(value):
+                    gathered.setdefault((day, metric), array('d')).append(value)
+
+    statistics = list()
+    for (day, metric), values in sorted(gathered.items(), key=lambda item: (item[0][0], metrics.index(item[0][1]))):
+        values = sorted(values)
+        statistics.append(model.DailyStatistics(datetime.date.fromordinal(day), metric, len(values), values[0],
+                                                values[-1], math.fsum(values) / len(values),
+                                                percentile(values, 10), percentile(values, 50),
+                                                percentile(values, 90)))
+
+    return statistics
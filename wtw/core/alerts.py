@@ -0,0 +1,162 @@
+# *******************************************************************************************
+#  File:  alerts.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['Rule', 'compile_rule', 'load_rules', 'evaluate']
+
+import datetime
+import functools
+import itertools
+import operator
+import re
+from array import array
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+from . import pipeline
+from . import weather_service
+
+# The unit each forecast field is reported in by Open-Meteo, a threshold may be written with or without it
+UNITS: dict[str, tuple[str, ...]] = {
+    'weather_code': (),
+    'temp_max': ('°c', 'c'),
+    'temp_min': ('°c', 'c'),
+    'precipitation_sum': ('mm',),
+    'rain': ('mm',),
+    'showers': ('mm',),
+    'snowfall': ('cm',),
+    'precipitation_hours': ('h',),
+    'wind_speed': ('km/h', 'kmh'),
+    'wind_direction': ('°',)
+}
+
+# Each comparison is bound to its threshold up front, the threshold being the left operand
+_OPERATORS: dict[str, Callable[[float, float], bool]] = {
+    '>': operator.lt,
+    '>=': operator.le,
+    '<': operator.gt,
+    '<=': operator.ge,
+    '==': operator.eq
+}
+
+_COMPARISON = re.compile(r"^(\w+)\s*(>=|<=|==|>|<)\s*(-?[\d.]+)\s*(\S*)$")
+_RANGE = re.compile(r"^(\w+)\s+in\s+(-?[\d.]+)\s*\.\.\s*(-?[\d.]+)\s*(\S*)$")
+
+
+class Rule:
+    """
+    This class holds an alert rule compiled to a predicate over the values of one forecast field
+    """
+
+    def __init__(self, name: str, field: str, expression: str, predicate: Callable[[float], bool]) -> None:
+        self.name = name
+        self.field = field
+        self.expression = expression
+        self.predicate = predicate
+
+    def matches(self, column: array) -> Iterator[int]:
+        """
+        Returns the positions of the values in the column that trigger the rule
+        """
+        return itertools.compress(range(len(column)), map(self.predicate, column))
+
+
+def _check_unit(field: str, unit: str) -> None:
+    """
+    Raises a ValueError when a threshold is written in a unit other than the one the field is reported in
+    """
+    if unit and unit.lower() not in UNITS[field]:
+        expected = UNITS[field][0] if UNITS[field] else 'no unit'
+        raise ValueError(f"{field} is reported in {expected}, not {unit}")
+
+
+def compile_rule(name: str, expression: str) -> Rule:
+    """
+    Compiles an alert rule such as "snowfall > 5cm" or "weather_code in 95..99"
+
+    :param name: The name reported when the rule triggers
+    :param expression: The rule
+    :return: The compiled rule
+    """
+    expression = expression.strip()
+
+    if match := _RANGE.match(expression):
+        field, low, high, unit = match.groups()
+        low, high = float(low), float(high)
+        predicate = functools.partial(lambda a, b, value: a <= value <= b, low, high)
+    elif match := _COMPARISON.match(expression):
+        field, op, threshold, unit = match.groups()
+        predicate = functools.partial(_OPERATORS[op], float(threshold))
+    else:
+        raise ValueError(f"expected FIELD OP VALUE or FIELD in LOW..HIGH, got: {expression}")
+
+    if field not in weather_service.FORECAST_VARIABLES or field not in UNITS:
+        raise ValueError(f"unknown forecast field: {field}")
+    _check_unit(field, unit)
+
+    return Rule(name, field, expression, predicate)
+
+
+def load_rules(path: Path) -> list[Rule]:
+    """
+    Reads the alert rules from a file holding one "NAME: EXPRESSION" rule per line, blank lines and those
+    starting with # being ignored
+
+    :param path: The rules file
+    :return: The compiled rules
+    """
+    rules = list()
+
+    for number, line in enumerate(path.read_text(encoding='utf-8').splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        name, sep, expression = line.partition(':')
+        if not sep or not name.strip():
+            raise ValueError(f"{path.name} line {number}: expected NAME: EXPRESSION")
+        try:
+            rules.append(compile_rule(name.strip(), expression))
+        except ValueError as e:
+            raise ValueError(f"{path.name} line {number}: {e}") from None
+
+    return rules
+
+
+def evaluate(rules: list[Rule], forecasts: Iterable[pipeline.ForecastColumns]) -> Iterator[dict]:
+    """
+    Evaluates the rules against the forecasts, each field's column being scanned once per rule on it
+
+    :param rules: The compiled rules
+    :param forecasts: The forecasts of the locations
+    :return: One record per rule triggered on a day at a location
+    """
+    by_field: dict[str, list[Rule]] = dict()
+    for rule in rules:
+        by_field.setdefault(rule.field, list()).append(rule)
+
+    for forecast in forecasts:
+        for field, field_rules in by_field.items():
+            column = forecast.columns.get(field)
+            if column is None:
+                continue
+            for rule in field_rules:
+                for index in rule.matches(column):
+                    # Weather codes are held as floats in the columns but are integers
+                    value = int(column[index]) if field == 'weather_code' else column[index]
+                    yield {'location': forecast.location, 'rule': rule.name, 'expression': rule.expression,
+                           'day': datetime.date.fromordinal(forecast.days[index]).isoformat(),
+                           'field': field, 'value': value}
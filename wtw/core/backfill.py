@@ -0,0 +1,153 @@
+# *******************************************************************************************
+#  File:  backfill.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['CHUNK_DAYS', 'ARCHIVE_LAG_DAYS', 'BackfillReport', 'archive_end', 'chunk_range', 'backfill']
+
+import datetime
+import math
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Iterable
+from loguru import logger
+from . import data
+from . import model
+from . import pipeline
+from . import weather_service
+
+# The number of days requested at a time, small enough that a failed chunk costs little to download again
+CHUNK_DAYS: int = 90
+
+# The days the archive trails today by. Later days come back empty, and being checkpointed would never be filled.
+ARCHIVE_LAG_DAYS: int = 5
+
+
+class BackfillReport:
+    """
+    This class counts the work done by a backfill run
+    """
+
+    def __init__(self) -> None:
+        self.chunks = 0
+        self.skipped = 0
+        self.days = 0
+        self.failed: list[tuple[str, datetime.date, datetime.date]] = list()
+
+
+def archive_end() -> datetime.date:
+    """
+    Returns the last day the archive holds observations for
+    """
+    return datetime.date.today() - datetime.timedelta(days=ARCHIVE_LAG_DAYS)
+
+
+def chunk_range(start: datetime.date, end: datetime.date,
+                days: int = CHUNK_DAYS) -> list[tuple[datetime.date, datetime.date]]:
+    """
+    Splits a date range into consecutive chunks of at most the given number of days
+
+    :param start: The first day of the range
+    :param end: The last day of the range
+    :param days: The length of the chunks
+    :return: The first and last day of each chunk
+    """
+    chunks = list()
+    while start <= end:
+        last = min(start + datetime.timedelta(days=days - 1), end)
+        chunks.append((start, last))
+        start = last + datetime.timedelta(days=1)
+    return chunks
+
+
+def _download(record: model.Location, start: datetime.date, end: datetime.date,
+              fields: tuple[str, ...]) -> bytes | None:
+    """
+    Downloads one chunk, logging rather than raising failures so that one bad chunk does not stop the run
+    """
+    try:
+        return weather_service.download_archive(record.latitude, record.longitude, record.timezone, start, end,
+                                                fields)
+    except Exception as e:
+        logger.warning(f"Backfill download failed for {record.name} {start} - {end}: {e}")
+
+
+def backfill(locations: Iterable[model.Location], start: datetime.date, end: datetime.date,
+             workers: int = 4, chunk_days: int = CHUNK_DAYS, file: Path | None = None,
+             progress: Callable[[BackfillReport], None] | None = None) -> BackfillReport:
+    """
+    Downloads the daily observations of the locations for a date range into the observation store. The range is
+    split into chunks that are downloaded in parallel and stored as they complete, each with a checkpoint, so a
+    run that is interrupted or has failures resumes where it left off when repeated. The range is cut short at
+    the last day the archive holds.
+
+    :param locations: The locations to backfill
+    :param start: The first day of the range
+    :param end: The last day of the range
+    :param workers: The number of concurrent downloads
+    :param chunk_days: The number of days downloaded at a time
+    :param file: The database file
+    :param progress: Called with the report after each chunk
+    :return: The report of the run
+    """
+    # The observations the archive does not serve are stored as NULL
+    fields = tuple(field for field in data.OBSERVATION_FIELDS if field in weather_service.ARCHIVE_VARIABLES)
+    missing = tuple(field for field in data.OBSERVATION_FIELDS if field not in fields)
+    report = BackfillReport()
+    work = list()
+
+    if end > archive_end():
+        logger.info(f"Backfill range cut short from {end} to {archive_end()}, the last day in the archive")
+        end = archive_end()
+
+    for record in locations:
+        done = data.completed_chunks(record.name, file)
+        for chunk in chunk_range(start, end, chunk_days):
+            if chunk in done:
+                report.skipped += 1
+            else:
+                work.append((record, *chunk))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = dict((pool.submit(_download, record, first, last, fields), (record, first, last))
+                       for record, first, last in work)
+
+        # The downloads run in the pool, the decoding and the database writes happen here one at a time
+        for future in as_completed(pending):
+            record, first, last = pending.pop(future)
+            payload = future.result()
+
+            try:
+                if payload is None:
+                    raise ValueError('no data returned')
+                columns = pipeline.decode_forecast(record.name, payload, fields)
+                for field in missing:
+                    columns.columns[field] = array('d', [math.nan] * len(columns.days))
+                report.days += data.insert_observation_chunk(record.name, first, last, columns.days,
+                                                             columns.columns, file)
+                report.chunks += 1
+            except Exception as e:
+                logger.warning(f"Backfill failed for {record.name} {first} - {last}: {e}")
+                report.failed.append((record.name, first, last))
+
+            if progress is not None:
+                progress(report)
+
+    logger.info(f"Backfill finished: chunks={report.chunks}, skipped={report.skipped}, days={report.days}, "
+                f"failed={len(report.failed)}")
+
+    return report
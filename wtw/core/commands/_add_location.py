@@ -16,10 +16,14 @@ __version__ = "1.0.0"
 __maintainer__ = "James Dooley"
 __status__ = "Production"
 
-__all__ = ['add']
+__all__ = ['add', 'add_batch', 'POLICIES']
 
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import rich.prompt
 import rich.text
+from loguru import logger
 from .. import ui
 from .. import weather_service
 from .. import data
@@ -75,3 +79,88 @@ def add() -> model.Result:
     ui.end_feature()
 
     return model.Result.Success
+
+
+# The ways of choosing between several geocoding results for the same name
+POLICIES = ('first', 'population')
+
+
+def _select(locations: model.Locations | None, policy: str, country: str | None) -> tuple[model.Location | None, int]:
+    """
+    This function picks a location from the geocoding results, returning it with the number of candidates
+    """
+    candidates = [location for location in locations or [] if country is None or
+                  location.country_code.upper() == country.upper()]
+    if not candidates:
+        return None, 0
+
+    if policy == 'population':
+        # max keeps the first of equal populations, so the choice stays deterministic
+        return max(candidates, key=lambda location: location.population or 0), len(candidates)
+
+    return candidates[0], len(candidates)
+
+
+def _geocode(name: str) -> tuple[model.Locations | None, str | None]:
+    """
+    This function geocodes one name of a batch, returning the error rather than raising it so that one failure
+    does not stop the batch
+    """
+    try:
+        return weather_service.get_locations(name, show_status=False, raise_errors=True), None
+    except Exception as e:
+        logger.warning(f"Failed to geocode {name}: {e}")
+        return None, str(e) or e.__class__.__name__
+
+
+def add_batch(path: Path, policy: str = 'first', country: str | None = None, workers: int = 4,
+              report: Path | None = None) -> model.Result:
+    """
+    This function geocodes the names listed in a file, one per line, and adds the locations found in one
+    transaction. The names that could not be resolved, matched several places or failed to geocode are listed in a
+    report file.
+    """
+    ui.start_feature('Add Locations')
+
+    names = [line.strip().title() for line in path.read_text(encoding='utf-8').splitlines() if line.strip()]
+    names = list(dict.fromkeys(names))
+    if not names:
+        ui.system_message('The file does not contain any names.')
+        return model.Result.NoOperation
+
+    with ui.console.status(f'Geocoding {len(names)} names...'), ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_geocode, names))
+
+    records = list()
+    rows = list()
+    for name, (locations, error) in zip(names, results):
+        if error is not None:
+            rows.append((name, 'error', error))
+            continue
+
+        location, candidates = _select(locations, policy, country)
+        if location is None:
+            rows.append((name, 'unresolved', ''))
+            continue
+
+        records.append(location)
+        if candidates > 1:
+            rows.append((name, 'ambiguous', f"{candidates} candidates, chose {location.name}, {location.region}, "
+                                            f"{location.country_code}"))
+
+    duplicates = data.insert_location_records(records) if records else list()
+    rows.extend((name, 'duplicate', 'a location with this name already exists') for name in duplicates)
+
+    if report is None:
+        report = path.with_suffix('.report.csv')
+    with report.open('w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(('name', 'status', 'detail'))
+        writer.writerows(rows)
+
+    added = len(records) - len(duplicates)
+    ui.message(f"Added {added} of {len(names)} locations, see {report} for the names needing attention.")
+
+    ui.end_feature()
+
+    return model.Result.Success if added > 0 else model.Result.NoOperation
@@ -0,0 +1,80 @@
+# *******************************************************************************************
+#  File:  _alerts.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['alerts']
+
+import json
+from pathlib import Path
+from typing import TextIO
+from loguru import logger
+from rich.text import Text
+from .. import ui
+from .. import alerts as alert_rules
+from .. import data
+from .. import model
+from .. import pipeline
+
+
+def _report(value: str, style: str) -> None:
+    """
+    This function displays a message on stderr, as the alerts may be written to stdout
+    """
+    ui.error_console.print(Text(f"\t{value}", style=style, tab_size=4))
+
+
+def alerts(rules_file: Path, output: TextIO, workers: int | None) -> model.Result:
+    """
+    This function evaluates the alert rules against the forecasts of all the saved locations, writing each alert
+    raised as one JSON document per line
+    """
+    try:
+        rules = alert_rules.load_rules(rules_file)
+    except (OSError, ValueError) as e:
+        _report(f"Unable to read the alert rules: {e}", "error_message")
+        return model.Result.Fail
+
+    if not rules:
+        _report(f"There are no alert rules in {rules_file}.", "system_message")
+        return model.Result.NoOperation
+
+    locations = list(data.iter_locations())
+    if not locations:
+        _report('There are no locations to check.', "system_message")
+        return model.Result.NoOperation
+
+    fields = tuple(sorted(set(rule.field for rule in rules)))
+    forecasts = list()
+    failed = list()
+
+    for record, columns in pipeline.fetch_forecasts(locations, fields, parse_workers=workers):
+        if columns is None:
+            failed.append(record.name)
+        else:
+            forecasts.append(columns)
+
+    raised = 0
+    for alert in alert_rules.evaluate(rules, forecasts):
+        output.write(json.dumps(alert) + '\n')
+        raised += 1
+    output.flush()
+
+    logger.info(f"Alerts evaluated: rules={len(rules)}, locations={len(forecasts)}, raised={raised}")
+    if failed:
+        logger.warning(f"No forecast could be obtained for: {', '.join(sorted(failed))}")
+
+    return model.Result.Success if len(failed) < len(locations) else model.Result.Fail
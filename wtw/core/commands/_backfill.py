@@ -0,0 +1,72 @@
+# *******************************************************************************************
+#  File:  _backfill.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['backfill']
+
+import datetime
+from .. import ui
+from .. import backfill as archive
+from .. import data
+from .. import model
+
+
+def backfill(name: str | None, start: datetime.date, end: datetime.date, workers: int,
+             chunk_days: int) -> model.Result:
+    """
+    This function downloads the historical observations of one or all of the saved locations
+    """
+    ui.start_feature('Backfill Observations')
+
+    if end < start:
+        ui.error_message("The end of the range is before its start.")
+        return model.Result.Fail
+
+    if end > archive.archive_end():
+        end = archive.archive_end()
+        ui.message(f"The archive holds observations up to {end}, the range ends there.")
+        if end < start:
+            ui.system_message('There are no observations in the archive for the range yet.')
+            return model.Result.NoOperation
+
+    if name is None:
+        locations = list(data.iter_locations())
+        if not locations:
+            ui.system_message('There are no locations to backfill.')
+            return model.Result.NoOperation
+    else:
+        record = data.get_location_record(name.title())
+        if record is None:
+            ui.error_message(f"Location not found: {name}")
+            return model.Result.Fail
+        locations = [record]
+
+    with ui.console.status(f'Backfilling {len(locations)} locations...') as status:
+        def progress(report: archive.BackfillReport) -> None:
+            status.update(f'Backfilling {len(locations)} locations: {report.chunks} chunks stored, '
+                          f'{len(report.failed)} failed...')
+
+        report = archive.backfill(locations, start, end, workers, chunk_days, progress=progress)
+
+    ui.message(f"Stored {report.days} days in {report.chunks} chunks, {report.skipped} chunks were already stored")
+    if report.failed:
+        ui.warning_message(f"{len(report.failed)} chunks failed, run the command again to retry them: " +
+                           ', '.join(sorted(set(failed[0] for failed in report.failed))))
+
+    ui.end_feature()
+
+    return model.Result.Fail if report.failed else model.Result.Success
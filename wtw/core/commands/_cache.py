@@ -0,0 +1,73 @@
+# *******************************************************************************************
+#  File:  _cache.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['refresh', 'traffic']
+
+from .. import ui
+from .. import data
+from .. import forecast_cache
+from .. import forecast_history
+from .. import model
+from .. import pipeline
+from .. import weather_service
+
+
+def refresh(workers: int | None, history: bool = False) -> model.Result:
+    """
+    This function downloads the forecasts of all the saved locations into the binary forecast cache, optionally
+    adding them to the forecast history
+    """
+    ui.start_feature('Refresh Forecast Cache')
+
+    locations = data.all_locations()
+    if locations is None:
+        ui.system_message('There are no locations to cache.')
+        return model.Result.NoOperation
+
+    with ui.console.status(f'Downloading forecasts for {len(locations)} locations...'):
+        forecasts = [columns for _, columns in pipeline.fetch_forecasts(locations, parse_workers=workers)
+                     if columns is not None]
+
+    if not forecasts:
+        return model.Result.Fail
+
+    count = forecast_cache.write_cache(forecast_cache.cache_file(), forecasts)
+    ui.message(f"Cached the forecasts of {count} of {len(locations)} locations.")
+
+    if history:
+        count = forecast_history.ForecastHistory().append(forecasts)
+        ui.message(f"Added {count} forecasts to the history.")
+
+    ui.end_feature()
+
+    return model.Result.Success
+
+
+def traffic() -> None:
+    """
+    This function displays the requests made and the bytes received per upstream endpoint
+    """
+    transfers = weather_service.transfer_stats()
+    if not transfers:
+        ui.console.line(1)
+        ui.system_message('No upstream requests have been made yet.')
+        ui.console.line(1)
+        return
+
+    ui.console.line(1)
+    ui.console.print(transfers)
@@ -18,52 +18,189 @@ __status__ = "Production"
 
 __all__ = ['main']
 
+# This module is also loaded for shell completion, which must answer in a few milliseconds. The modules that pull
+# in rich, requests or related are therefore imported by the commands that use them rather than at the top.
 import atexit
-import rich.traceback
+import os
+import pathlib
 import click
 import loguru
 from .. import utils
-from .. import ui
-from .. import model
-from . import _add_location
-from . import _list_locations
-from . import _delete_location
-from . import _weather
+from .. import errors
+from .. import name_index
 
 
 @click.group(context_settings={'help_option_names': ('-h', '--help')})
 @click.version_option(__version__, '--version', '-v')
-def app(**kwargs) -> None:
+@click.option('--fail-fast', is_flag=True, default=False,
+              help='Fail immediately instead of waiting when the Open-Meteo call quota is exhausted')
+def app(fail_fast: bool, **kwargs) -> None:
     """
     This app produces current and daily weather reports for a given city.
     """
-    pass
+    from .. import rate_limit
+    from .. import weather_service
+
+    weather_service.configure_rate_limit(rate_limit.Mode.FailFast if fail_fast else rate_limit.Mode.Queue)
 
 
 @app.command('current')
 @click.pass_context
-@click.argument("location", type=click.STRING, required=True)
-@loguru.logger.catch(reraise=True, message='Logged while getting current weather')
-def current_weather(ctx: click.Context, location: str) -> None:
+@click.argument("location", type=click.STRING, nargs=-1, required=True, shell_complete=name_index.complete)
+@click.option('--watch', '-w', is_flag=True, default=False, help='Keep the display open and refresh it periodically')
+@click.option('--interval', '-i', type=click.IntRange(min=1), default=60, show_default=True,
+              help='Seconds between refreshes in watch mode')
+@utils.log_command('current')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while getting current weather')
+def current_weather(ctx: click.Context, location: tuple[str, ...], watch: bool, interval: int) -> None:
     """
     Displays the current weather
 
-    LOCATION The weather location
+    LOCATION The weather location(s)
     """
-    _weather.current(location)
+    from . import _weather
+
+    if watch:
+        _weather.watch(location, interval)
+        return
+
+    for index, name in enumerate(location):
+        _weather.current(name, clear=(index == 0))
 
 
 @app.command('forecast')
 @click.pass_context
-@click.argument("location", type=click.STRING, required=True)
-@loguru.logger.catch(reraise=True, message='Logged while getting forecast')
-def forecast_weather(ctx: click.Context, location: str) -> None:
+@click.argument("location", type=click.STRING, required=True, shell_complete=name_index.complete)
+@click.option('--pager', '-p', 'page', is_flag=True, default=False, help='Display the forecast in a scrollable pager')
+@utils.log_command('forecast')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while getting forecast')
+def forecast_weather(ctx: click.Context, location: str, page: bool) -> None:
     """
     Displays the weather forecast
 
     LOCATION The forecast location
     """
-    _weather.forecast(location)
+    from . import _weather
+
+    _weather.forecast(location, page)
+
+
+@app.command('region')
+@click.pass_context
+@click.option('--country', '-c', 'country_code', type=click.STRING, required=True,
+              help='The country code of the locations, e.g. CH')
+@click.option('--region', '-r', 'region_name', type=click.STRING, default=None,
+              help='The region of the locations, e.g. Bern')
+@click.option('--workers', type=click.IntRange(min=1), default=None,
+              help='The number of parse processes, one per CPU by default')
+@utils.log_command('region')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while getting region forecast')
+def region_weather(ctx: click.Context, country_code: str, region_name: str | None, workers: int | None) -> None:
+    """
+    Displays the forecast statistics across the locations of a country or region
+    """
+    from . import _region
+
+    _region.region(country_code, region_name, workers)
+
+
+@app.command('alerts')
+@click.pass_context
+@click.option('--rules', '-r', 'rules_file', type=click.Path(dir_okay=False, path_type=pathlib.Path), default=None,
+              help='The alert rules file, alerts.conf in the application folder by default')
+@click.option('--output', '-o', type=click.File('w'), default='-',
+              help='Where to write the alerts, one JSON document per line, standard output by default')
+@click.option('--workers', type=click.IntRange(min=1), default=None,
+              help='The number of parse processes, one per CPU by default')
+@utils.log_command('alerts')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while evaluating alerts')
+def alerts(ctx: click.Context, rules_file: pathlib.Path | None, output, workers: int | None) -> None:
+    """
+    Evaluates the alert rules against the forecasts of all the locations
+    """
+    from .. import model
+    from . import _alerts
+
+    if rules_file is None:
+        rules_file = utils.app_folder().joinpath('alerts.conf')
+
+    result = _alerts.alerts(rules_file, output, workers)
+    ctx.exit(1 if result == model.Result.Fail else 0)
+
+
+@app.command('backfill')
+@click.pass_context
+@click.argument("location", type=click.STRING, required=False, shell_complete=name_index.complete)
+@click.option('--from', 'start', type=click.DateTime(formats=['%Y-%m-%d']), required=True,
+              help='The first day to download, e.g. 2020-01-01')
+@click.option('--to', 'end', type=click.DateTime(formats=['%Y-%m-%d']), required=True,
+              help='The last day to download, e.g. 2022-12-31')
+@click.option('--all', 'all_locations', is_flag=True, default=False, help='Backfill all the saved locations')
+@click.option('--workers', type=click.IntRange(min=1, max=32), default=4, show_default=True,
+              help='The number of concurrent downloads')
+@click.option('--chunk-days', type=click.IntRange(min=1), default=90, show_default=True,
+              help='The number of days downloaded at a time')
+@utils.log_command('backfill')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while backfilling observations')
+def backfill(ctx: click.Context, location: str | None, start, end, all_locations: bool, workers: int,
+             chunk_days: int) -> None:
+    """
+    Downloads the historical daily observations of a location into the local store
+
+    LOCATION The location to backfill
+    """
+    from .. import ui
+    from .. import model
+    from . import _backfill
+
+    if (location is None) == (not all_locations):
+        raise click.UsageError("Give either a LOCATION or the --all option.")
+
+    result = _backfill.backfill(location, start.date(), end.date(), workers, chunk_days)
+    if result == model.Result.Success:
+        ui.success_message("Observations backfilled successfully.")
+        ctx.exit(0)
+    elif result == model.Result.Fail:
+        ui.error_message("Failed to backfill observations, see log for details.")
+        ctx.exit(1)
+    else:
+        ctx.exit(0)
+
+
+def _parse_window(ctx: click.Context, param: click.Parameter, value: str) -> int:
+    """
+    Converts a window such as 30d or 4w into a number of days
+    """
+    units = {'d': 1, 'w': 7}
+    count, unit = (value[:-1], value[-1].lower()) if value[-1:].isalpha() else (value, 'd')
+    if unit not in units or not count.isdigit() or int(count) < 1:
+        raise click.BadParameter(f"expected a number of days or weeks such as 30d or 4w, got: {value}")
+    return int(count) * units[unit]
+
+
+@app.command('stats')
+@click.pass_context
+@click.argument("location", type=click.STRING, required=True, shell_complete=name_index.complete)
+@click.option('--metric', '-m', type=click.Choice(('temp_max', 'temp_min', 'precipitation_sum', 'rain', 'showers',
+                                                   'snowfall', 'precipitation_hours', 'wind_speed')),
+              default='temp_max', show_default=True, help='The observed value')
+@click.option('--window', '-w', type=click.STRING, callback=_parse_window, default='30d', show_default=True,
+              help='The period the rolling statistics cover, e.g. 30d or 4w')
+@click.option('--from', 'start', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='The first day to report, 30 days before the last by default')
+@click.option('--to', 'end', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='The last day to report, the last day observed by default')
+@utils.log_command('stats')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while getting statistics')
+def statistics(ctx: click.Context, location: str, metric: str, window: int, start, end) -> None:
+    """
+    Displays rolling statistics and anomalies of the observations stored for a location
+
+    LOCATION The observed location
+    """
+    from . import _stats
+
+    _stats.stats(location, metric, window, start and start.date(), end and end.date())
 
 
 @app.group('location')
@@ -74,26 +211,69 @@ def loc(**kwargs) -> None:
     pass
 
 
+def _parse_filters(ctx: click.Context, param: click.Parameter, value: tuple[str, ...]) -> dict[str, str]:
+    """
+    Converts the column=value filter options into a dictionary
+    """
+    from .. import data
+
+    filters = dict()
+    for item in value:
+        column, sep, text = item.partition('=')
+        if not sep or column not in data.LOCATION_FILTERS:
+            raise click.BadParameter(f"expected COLUMN=VALUE with COLUMN one of {', '.join(data.LOCATION_FILTERS)}, "
+                                     f"got: {item}")
+        filters[column] = text
+    return filters
+
+
 @loc.command('list')
 @click.pass_context
-def location_list(ctx: click.Context) -> None:
+@click.option('--limit', '-l', type=click.IntRange(min=1), default=None, help='The maximum number of locations to list')
+@click.option('--after', '-a', type=click.STRING, default=None, shell_complete=name_index.complete,
+              help='List the locations following the one with this name')
+@click.option('--filter', '-f', 'filters', multiple=True, callback=_parse_filters,
+              help='Only list locations matching COLUMN=VALUE, e.g. country=Switzerland')
+@click.option('--pager', '-p', 'page', is_flag=True, default=False,
+              help='Display the locations in a scrollable, searchable pager')
+@utils.log_command('location list')
+def location_list(ctx: click.Context, limit: int | None, after: str | None, filters: dict[str, str],
+                  page: bool) -> None:
     """
-    Displays the weather forecast
-
-    LOCATION The forecast location
+    Displays the saved locations
     """
-    _list_locations.list()
+    from . import _list_locations
+
+    _list_locations.list(limit, after, filters, page=page)
     ctx.exit(0)
 
 
 @loc.command('add')
 @click.pass_context
-@loguru.logger.catch(reraise=True, message='Logged while adding location')
-def location_add(ctx: click.Context) -> None:
+@click.option('--batch', 'batch', type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+              help='File with one place name per line, added without prompting')
+@click.option('--policy', type=click.Choice(('first', 'population')), default='first', show_default=True,
+              help='How to choose between places with the same name in batch mode')
+@click.option('--country', type=click.STRING, default=None, help='Only accept places in this country code')
+@click.option('--workers', type=click.IntRange(min=1, max=32), default=4, show_default=True,
+              help='The number of concurrent geocoding requests')
+@click.option('--report', type=click.Path(dir_okay=False, writable=True, path_type=pathlib.Path), default=None,
+              help='Where to write the summary of unresolved and ambiguous names')
+@utils.log_command('location add')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while adding location')
+def location_add(ctx: click.Context, batch: pathlib.Path | None, policy: str, country: str | None, workers: int,
+                 report: pathlib.Path | None) -> None:
     """
-    Adds a new location
+    Adds a new location, or the locations listed in a batch file
     """
-    result = _add_location.add()
+    from .. import ui
+    from .. import model
+    from . import _add_location
+
+    if batch is not None:
+        result = _add_location.add_batch(batch, policy, country, workers, report)
+    else:
+        result = _add_location.add()
     if result == model.Result.Success:
         ui.success_message("Location added successfully.")
         ctx.exit(0)
@@ -106,14 +286,19 @@ def location_add(ctx: click.Context) -> None:
 
 @loc.command('delete')
 @click.pass_context
-@click.argument("location", type=click.STRING, required=True)
-@loguru.logger.catch(reraise=True, message='Logged while deleting location')
+@click.argument("location", type=click.STRING, required=True, shell_complete=name_index.complete)
+@utils.log_command('location delete')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while deleting location')
 def location_delete(ctx: click.Context, location: str) -> None:
     """
     Delete the given location
 
     LOCATION The location to delete
     """
+    from .. import ui
+    from .. import model
+    from . import _delete_location
+
     result = _delete_location.delete(location)
     if result == model.Result.Success:
         ui.success_message("Location deleted successfully.")
@@ -125,6 +310,232 @@ def location_delete(ctx: click.Context, location: str) -> None:
         ctx.exit(0)
 
 
+@app.group('export')
+def export_group(**kwargs) -> None:
+    """
+    Exports weather data for analysis.
+    """
+    pass
+
+
+@export_group.command('forecasts')
+@click.pass_context
+@click.argument("path", type=click.Path(dir_okay=False, writable=True, path_type=pathlib.Path), required=True)
+@click.option('--format', '-f', 'file_format', type=click.Choice(('csv', 'parquet', 'arrow')), default='csv',
+              show_default=True, help='The file format')
+@click.option('--workers', type=click.IntRange(min=1), default=None,
+              help='The number of parse processes, one per CPU by default')
+@utils.log_command('export forecasts')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while exporting forecasts')
+def export_forecasts(ctx: click.Context, path: pathlib.Path, file_format: str, workers: int | None) -> None:
+    """
+    Exports the forecasts of all the locations
+
+    PATH The file to write
+    """
+    from .. import ui
+    from .. import model
+    from . import _export
+
+    result = _export.forecasts(file_format, path, workers)
+    if result == model.Result.Success:
+        ui.success_message("Forecasts exported successfully.")
+        ctx.exit(0)
+    elif result == model.Result.Fail:
+        ui.error_message("Failed to export forecasts, see log for details.")
+        ctx.exit(1)
+    else:
+        ctx.exit(0)
+
+
+@app.group('cache')
+def cache_group(**kwargs) -> None:
+    """
+    Manages the binary forecast cache.
+    """
+    pass
+
+
+@cache_group.command('refresh')
+@click.pass_context
+@click.option('--workers', type=click.IntRange(min=1), default=None,
+              help='The number of parse processes, one per CPU by default')
+@click.option('--history', is_flag=True, default=False, help='Also add the forecasts to the forecast history')
+@utils.log_command('cache refresh')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while refreshing the cache')
+def cache_refresh(ctx: click.Context, workers: int | None, history: bool) -> None:
+    """
+    Downloads the forecasts of all the locations into the cache
+    """
+    from .. import ui
+    from .. import model
+    from . import _cache
+
+    result = _cache.refresh(workers, history)
+    if result == model.Result.Success:
+        ui.success_message("Forecast cache refreshed successfully.")
+        ctx.exit(0)
+    elif result == model.Result.Fail:
+        ui.error_message("Failed to refresh the forecast cache, see log for details.")
+        ctx.exit(1)
+    else:
+        ctx.exit(0)
+
+
+@cache_group.command('traffic')
+@utils.log_command('cache traffic')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while showing upstream traffic')
+def cache_traffic() -> None:
+    """
+    Displays the requests made and the bytes received per upstream endpoint
+    """
+    from . import _cache
+
+    _cache.traffic()
+
+
+@app.group('history')
+def history_group(**kwargs) -> None:
+    """
+    Manages the history of issued forecasts.
+    """
+    pass
+
+
+@history_group.command('show')
+@click.pass_context
+@click.argument("location", type=click.STRING, required=True, shell_complete=name_index.complete)
+@click.option('--issued', type=click.DateTime(formats=['%Y-%m-%d', '%Y-%m-%d %H:%M']), default=None,
+              help='Show the forecast issued at or before this time, the latest by default')
+@utils.log_command('history show')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while showing forecast history')
+def history_show(ctx: click.Context, location: str, issued) -> None:
+    """
+    Displays a forecast issued in the past
+
+    LOCATION The forecast location
+    """
+    from . import _history
+
+    _history.show(location, issued)
+
+
+@history_group.command('compact')
+@click.pass_context
+@click.option('--keep-days', type=click.IntRange(min=1), default=None,
+              help='Drop the forecasts issued more than this many days ago')
+@utils.log_command('history compact')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while compacting forecast history')
+def history_compact(ctx: click.Context, keep_days: int | None) -> None:
+    """
+    Recompresses the forecast history and drops the old forecasts
+    """
+    from .. import ui
+    from .. import model
+    from . import _history
+
+    result = _history.compact(keep_days)
+    if result == model.Result.Success:
+        ui.success_message("Forecast history compacted successfully.")
+        ctx.exit(0)
+    elif result == model.Result.Fail:
+        ui.error_message("Failed to compact the forecast history, see log for details.")
+        ctx.exit(1)
+    else:
+        ctx.exit(0)
+
+
+@app.group('db')
+def database_group(**kwargs) -> None:
+    """
+    Manages the location database.
+    """
+    pass
+
+
+@database_group.command('status')
+@click.pass_context
+@utils.log_command('db status')
+def database_status(ctx: click.Context) -> None:
+    """
+    Displays the schema version and the pending migrations
+    """
+    from . import _database
+
+    _database.status()
+    ctx.exit(0)
+
+
+@database_group.command('migrate')
+@click.pass_context
+@utils.log_command('db migrate')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while migrating the database')
+def database_migrate(ctx: click.Context) -> None:
+    """
+    Applies the pending migrations
+    """
+    from .. import ui
+    from .. import model
+    from . import _database
+
+    result = _database.migrate()
+    if result == model.Result.Success:
+        ui.success_message("Database migrated successfully.")
+        ctx.exit(0)
+    elif result == model.Result.Fail:
+        ui.error_message("Failed to migrate the database, see log for details.")
+        ctx.exit(1)
+    else:
+        ctx.exit(0)
+
+
+@loc.command('update')
+@click.pass_context
+@click.argument("location", type=click.STRING, required=False, shell_complete=name_index.complete)
+@click.option('--batch', 'batch', type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+              help='CSV file with a name column and the columns to change')
+@click.option('--location', 'new_location', type=click.STRING, help='The new location label')
+@click.option('--latitude', type=click.FLOAT, help='The new latitude')
+@click.option('--longitude', type=click.FLOAT, help='The new longitude')
+@click.option('--timezone', type=click.STRING, help='The new time zone')
+@click.option('--region', type=click.STRING, help='The new region')
+@click.option('--country-code', type=click.STRING, help='The new country code')
+@click.option('--country', type=click.STRING, help='The new country')
+@click.option('--post-codes', type=click.STRING, help='The new post codes')
+@utils.log_command('location update')
+@loguru.logger.catch(reraise=True, exclude=click.exceptions.Exit, message='Logged while updating location')
+def location_update(ctx: click.Context, location: str | None, batch: pathlib.Path | None, new_location: str | None,
+                    **kwargs) -> None:
+    """
+    Updates the given location, or those listed in a batch file
+
+    LOCATION The location to update
+    """
+    from .. import ui
+    from .. import model
+    from . import _update_location
+
+    if (location is None) == (batch is None):
+        raise click.UsageError("Give either a LOCATION or the --batch option.")
+
+    if batch is not None:
+        result = _update_location.update_batch(batch)
+    else:
+        changes = dict((field, value) for field, value in kwargs.items() if value is not None)
+        if new_location is not None:
+            changes['location'] = new_location
+        result = _update_location.update(location, changes)
+
+    if result == model.Result.Success:
+        ui.success_message("Location updated successfully.")
+        ctx.exit(0)
+    elif result == model.Result.Fail:
+        ui.error_message("Failed to update location, see log for details.")
+        ctx.exit(1)
+    else:
+        ctx.exit(0)
+
+
 # noinspection PyBroadException
 def exit_routine() -> None:
     """
@@ -133,6 +544,7 @@ def exit_routine() -> None:
     try:
         loguru.logger.info("*** Application Ended ***")
     except:
+        from .. import ui
         ui.system_message('Failed to log application exit!')
 
 
@@ -140,6 +552,14 @@ def main():
     """
     The application entry point
     """
+    # Shell completion is answered by click before any command runs, so skip the application setup
+    if '_WTW_COMPLETE' in os.environ:
+        app(prog_name='wtw')
+        return
+
+    import rich.traceback
+    from .. import ui
+
     # Configure traceback support
     rich.traceback.install(show_locals=True, max_frames=5)
 
@@ -150,4 +570,8 @@ def main():
 
     # Run application
     loguru.logger.info("*** Application Started ***")
-    app()
+    try:
+        app()
+    except errors.RateLimitExceededError as e:
+        ui.error_message(str(e))
+        raise SystemExit(1)
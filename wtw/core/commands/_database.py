@@ -0,0 +1,65 @@
+# *******************************************************************************************
+#  File:  _database.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['status', 'migrate']
+
+from .. import ui
+from .. import data
+from .. import model
+from .. import schema
+
+
+def status() -> None:
+    """
+    This function displays the schema version of the database and the pending migrations
+    """
+    ui.start_feature('Database Status')
+
+    version, pending = data.database_status()
+
+    ui.message(f"Schema version {version} of {schema.LATEST_VERSION}", pad=False)
+    if pending:
+        ui.console.line(1)
+        for migration in pending:
+            ui.message(f"Pending: {migration.version} - {migration.description}", pad=False)
+    else:
+        ui.console.line(1)
+        ui.message("The database is up to date.", pad=False)
+
+    ui.end_feature()
+
+
+def migrate() -> model.Result:
+    """
+    This function applies the pending migrations to the database
+    """
+    ui.start_feature('Database Migration')
+
+    with ui.console.status('Migrating database...'):
+        applied = data.migrate_database()
+
+    if not applied:
+        ui.system_message('The database is already up to date.')
+        return model.Result.NoOperation
+
+    for migration in applied:
+        ui.message(f"Applied: {migration.version} - {migration.description}", pad=False)
+
+    ui.end_feature()
+
+    return model.Result.Success
@@ -32,6 +32,15 @@ def delete(location: str) -> model.Result:
     location = location.title()
     record = data.get_location_record(location)
 
+    if record is None:
+        matches = data.search_locations(location, limit=1)
+        if matches:
+            record = matches[0]
+            ui.console.print(record)
+            if not ui.confirm_message(f"Did you mean {record.name}, delete it", default=False):
+                ui.system_message('Delete location aborted.')
+                return model.Result.NoOperation
+
     if record is None:
         ui.console.line(1)
         ui.system_message(f"The location ({location}) was not found in the database")
@@ -40,7 +49,7 @@ def delete(location: str) -> model.Result:
 
     ui.end_feature()
 
-    if data.delete_location_record(location):
+    if data.delete_location_record(record.name):
         return model.Result.Success
 
     return model.Result.Fail
@@ -0,0 +1,61 @@
+# *******************************************************************************************
+#  File:  _export.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['forecasts']
+
+from pathlib import Path
+from .. import ui
+from .. import data
+from .. import export
+from .. import model
+from .. import pipeline
+
+
+def forecasts(file_format: str, path: Path, workers: int | None) -> model.Result:
+    """
+    This function exports the forecasts of all the saved locations to a file
+    """
+    ui.start_feature('Export Forecasts')
+
+    locations = data.all_locations()
+    if locations is None:
+        ui.system_message('There are no locations to export.')
+        return model.Result.NoOperation
+
+    failed = list()
+
+    try:
+        writer = export.open_writer(file_format, path)
+    except RuntimeError as e:
+        ui.error_message(str(e))
+        return model.Result.Fail
+
+    with writer, ui.console.status(f'Exporting forecasts for {len(locations)} locations...'):
+        for record, columns in pipeline.fetch_forecasts(locations, parse_workers=workers):
+            if columns is None:
+                failed.append(record.name)
+            else:
+                writer.add(columns)
+
+    ui.message(f"Wrote {writer.rows} forecast rows to {path}")
+    if failed:
+        ui.warning_message(f"No forecast could be obtained for: {', '.join(sorted(failed))}")
+
+    ui.end_feature()
+
+    return model.Result.Success if len(failed) < len(locations) else model.Result.Fail
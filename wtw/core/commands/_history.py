@@ -0,0 +1,64 @@
+# *******************************************************************************************
+#  File:  _history.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['show', 'compact']
+
+import datetime
+from .. import ui
+from .. import forecast_history
+from .. import model
+
+
+def show(name: str, issued: datetime.datetime | None) -> None:
+    """
+    This function displays the forecast issued for a location at or before the given time, the latest by default
+    """
+    name = name.title()
+    until = None if issued is None else issued.timestamp()
+    snapshots = list(forecast_history.ForecastHistory().snapshots(name, until=until))
+
+    if not snapshots:
+        ui.console.line(1)
+        ui.system_message(f"No forecast history stored for {name}.")
+        ui.console.line(1)
+        return
+
+    snapshot = snapshots[-1]
+    issued_at = datetime.datetime.fromtimestamp(snapshot.issued).strftime('%d-%m-%Y %H:%M')
+
+    ui.console.clear()
+    ui.console.line(1)
+    ui.console.print(snapshot.forecast.to_forecasts())
+    ui.message(f"Issued {issued_at}, one of {len(snapshots)} forecasts stored up to then")
+
+
+def compact(keep_days: int | None) -> model.Result:
+    """
+    This function compacts the forecast history, optionally dropping the old forecasts
+    """
+    ui.start_feature('Compact Forecast History')
+
+    with ui.console.status('Compacting the forecast history...'):
+        report = forecast_history.ForecastHistory().compact(keep_days)
+
+    ui.message(f"Kept {report.snapshots} forecasts, dropped {report.pruned}, "
+               f"{report.size_before:,} bytes reduced to {report.size_after:,} bytes")
+
+    ui.end_feature()
+
+    return model.Result.Success
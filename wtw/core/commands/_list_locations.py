@@ -18,18 +18,69 @@ __status__ = "Production"
 
 __all__ = ['list']
 
+import itertools
 from .. import ui
 from .. import data
+from .. import errors
+from .. import model
+from .. import pager
 
 
-def list() -> None:
+def list(limit: int | None = None, after: str | None = None, filters: dict[str, str] | None = None,
+         page_size: int = 50, page: bool = False) -> None:
     """
-    Display the list of locations
+    Display the list of locations, one page at a time as the rows are read, or in the pager when asked to and
+    the terminal allows
     """
+    if page and pager.interactive():
+        _page(limit, after, filters)
+        return
+
     ui.start_feature('List Locations')
-    locations = data.all_locations()
 
-    ui.console.line(1)
-    ui.console.print(locations)
+    records = data.iter_locations(after=after, limit=limit, filters=filters)
+    count = 0
+    last = None
+
+    try:
+        while True:
+            page = model.Locations(itertools.islice(records, page_size), offset=count,
+                                   title="locations" if count == 0 else None)
+            if not page:
+                break
+
+            ui.console.line(1)
+            ui.console.print(page)
+
+            count += len(page)
+            last = page[-1].name
+    except errors.RecordNotFoundError:
+        ui.system_message(f"The location ({after}) was not found in the database")
+        return
+
+    if count == 0:
+        ui.system_message('No locations found.')
+    elif limit is not None and count == limit:
+        ui.system_message(f'To see the next locations, add: --after "{last}"')
 
     ui.end_feature()
+
+
+def _page(limit: int | None, after: str | None, filters: dict[str, str] | None) -> None:
+    """
+    Displays the locations in the pager, reading them from the database as the reader scrolls
+    """
+    records = data.iter_locations(after=after, limit=limit, filters=filters)
+
+    try:
+        first = next(records, None)
+    except errors.RecordNotFoundError:
+        ui.system_message(f"The location ({after}) was not found in the database")
+        return
+
+    if first is None:
+        ui.system_message('No locations found.')
+        return
+
+    pager.Pager(model.Locations.columns, itertools.chain([first], records),
+                lambda index, item: model.Locations.row(item, index), title="locations").run()
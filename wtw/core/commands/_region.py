@@ -0,0 +1,60 @@
+# *******************************************************************************************
+#  File:  _region.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['region']
+
+from .. import ui
+from .. import aggregate
+from .. import data
+from .. import model
+from .. import pipeline
+
+
+def region(country_code: str, region_name: str | None, workers: int | None) -> None:
+    """
+    This function displays the daily weather statistics across all the saved locations of a country or region
+    """
+    filters = {'country_code': country_code.upper()}
+    if region_name is not None:
+        filters['region'] = region_name
+
+    locations = list(data.iter_locations(filters=filters))
+    title = ", ".join(reversed(filters.values()))
+
+    if not locations:
+        ui.console.line(1)
+        ui.system_message(f"No locations found in {title}.")
+        ui.console.line(1)
+        return
+
+    with ui.console.status(f'Downloading forecasts for {len(locations)} locations...'):
+        forecasts = [columns for _, columns in pipeline.fetch_forecasts(locations, aggregate.METRICS,
+                                                                        parse_workers=workers)
+                     if columns is not None]
+
+    if not forecasts:
+        ui.console.line(1)
+        ui.system_message(f"Unable to obtain weather forecasts for {title}.")
+        ui.console.line(1)
+        return
+
+    summary = model.RegionSummary(aggregate.summarise(forecasts),
+                                  title=f"Weather Forecast - {title} ({len(forecasts)} sites)")
+    ui.console.clear()
+    ui.console.line(1)
+    ui.console.print(summary)
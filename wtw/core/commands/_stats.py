@@ -0,0 +1,54 @@
+# *******************************************************************************************
+#  File:  _stats.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['stats']
+
+import datetime
+from .. import ui
+from .. import data
+
+
+def stats(name: str, metric: str, window: int, start: datetime.date | None, end: datetime.date | None) -> None:
+    """
+    This function displays the rolling statistics and anomalies of an observed metric at a location. The range
+    defaults to the last 30 days observed.
+    """
+    name = name.title()
+
+    observed = data.observation_range(name)
+    if observed is None:
+        ui.console.line(1)
+        ui.system_message(f"No observations stored for {name}, use the backfill command to download them.")
+        ui.console.line(1)
+        return
+
+    if end is None:
+        end = observed[1]
+    if start is None:
+        start = end - datetime.timedelta(days=29)
+
+    statistics = data.observation_statistics(name, metric, start, end, window)
+    if not statistics:
+        ui.console.line(1)
+        ui.system_message(f"No observations stored for {name} between {start} and {end}.")
+        ui.console.line(1)
+        return
+
+    ui.console.clear()
+    ui.console.line(1)
+    ui.console.print(statistics)
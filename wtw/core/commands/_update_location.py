@@ -0,0 +1,122 @@
+# *******************************************************************************************
+#  File:  _update_location.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['update', 'update_batch', 'FIELDS']
+
+import csv
+from pathlib import Path
+import attr
+from .. import ui
+from .. import data
+from .. import model
+
+# The fields that can be changed, the name being the key of the record
+FIELDS = ('location', 'latitude', 'longitude', 'timezone', 'region', 'country_code', 'country', 'post_codes')
+
+
+def _apply(record: model.Location, changes: dict[str, str]) -> model.Location:
+    """
+    This function returns a copy of the record with the changes applied, converting them to the field types. It
+    raises a ValueError when a latitude or longitude is not a number.
+    """
+    values = dict()
+    for field, value in changes.items():
+        if field in ('latitude', 'longitude'):
+            values[field] = float(value)
+        elif field == 'post_codes':
+            values[field] = [value]
+        else:
+            values[field] = value
+    return attr.evolve(record, **values)
+
+
+def update(name: str, changes: dict[str, str]) -> model.Result:
+    """
+    This function updates a location, failing if it was changed by someone else while being updated
+    """
+    ui.start_feature('Update Location')
+
+    if not changes:
+        ui.system_message('Nothing to update.')
+        return model.Result.NoOperation
+
+    record = data.get_location_record(name.title())
+    if record is None:
+        ui.system_message(f"The location ({name}) was not found in the database")
+        return model.Result.NoOperation
+
+    try:
+        record = _apply(record, changes)
+    except ValueError as e:
+        ui.error_message(f"Invalid value: {e}")
+        return model.Result.Fail
+    ui.console.print(record)
+
+    if not data.update_location_record(record):
+        ui.warning_message('The location was changed by someone else, please try again.')
+        return model.Result.Fail
+
+    ui.end_feature()
+
+    return model.Result.Success
+
+
+def update_batch(path: Path) -> model.Result:
+    """
+    This function applies the updates listed in a CSV file in one transaction. The file has a name column, the
+    columns to change and optionally a lock_version column; rows without a version update the current one. Rows
+    with values that cannot be converted are reported by line and skipped.
+    """
+    ui.start_feature('Update Locations')
+
+    with path.open(newline='', encoding='utf-8') as file:
+        rows = [row for row in csv.DictReader(file)]
+
+    records = list()
+    missing = list()
+    invalid = list()
+    # The header is the first line of the file, so the rows start on the second
+    for line, row in enumerate(rows, start=2):
+        name = row.pop('name', None)
+        version = row.pop('lock_version', None)
+        record = data.get_location_record(name.title()) if name else None
+        if record is None:
+            missing.append(name or '?')
+            continue
+
+        try:
+            if version:
+                record = attr.evolve(record, lock_version=int(version))
+            records.append(_apply(record, dict((field, value) for field, value in row.items()
+                                               if field in FIELDS and value != '')))
+        except ValueError as e:
+            invalid.append(f"line {line} ({e})")
+
+    stale = data.update_location_records(records)
+
+    ui.message(f"Updated {len(records) - len(stale)} of {len(rows)} locations.")
+    if missing:
+        ui.warning_message(f"Not found: {', '.join(missing)}")
+    if invalid:
+        ui.warning_message(f"Invalid values, not updated: {', '.join(invalid)}")
+    if stale:
+        ui.warning_message(f"Changed by someone else, not updated: {', '.join(stale)}")
+
+    ui.end_feature()
+
+    return model.Result.Success if not missing and not invalid and not stale else model.Result.Fail
@@ -16,21 +16,59 @@ __version__ = "1.0.0"
 __maintainer__ = "James Dooley"
 __status__ = "Production"
 
-__all__ = ['current', 'forecast']
+__all__ = ['current', 'forecast', 'watch']
 
+import datetime
+import struct
+import time
+import rich.live
+from loguru import logger
 from .. import ui
 from .. import data
 from .. import weather_service
 from .. import model
+from .. import forecast_cache
+from .. import pager
+from .. import solar
 
 
-def current(location: str) -> None:
+def _find_location(location: str) -> model.Location | None:
+    """
+    This function returns the saved location with the given name, or failing that, the closest match
+    """
+    record = data.get_location_record(location)
+    if record is not None:
+        return record
+
+    matches = data.search_locations(location, limit=1)
+    if matches:
+        return matches[0]
+
+
+def _cached_forecast(record: model.Location) -> model.Forecasts | None:
+    """
+    This function returns the forecast from the binary cache, if it holds a recent one for the location
+    """
+    file = forecast_cache.cache_file()
+    if not file.exists():
+        return None
+
+    try:
+        with forecast_cache.ForecastCache(file) as cache:
+            columns = cache.get(record.name, max_age=weather_service.CACHE_TTL, location=record.location)
+            if columns is not None:
+                return columns.to_forecasts()
+    except (OSError, ValueError, struct.error) as e:
+        logger.warning(f"Failed to read the forecast cache: {e}")
+
+
+def current(location: str, clear: bool = True) -> None:
     """
     This function gets the current weather at the given location
     """
     location = location.title()
 
-    record = data.get_location_record(location)
+    record = _find_location(location)
     if record is None:
         ui.console.line(1)
         ui.system_message(f"Location ({location}) not found, add it before requesting current weather.")
@@ -45,32 +83,92 @@ def current(location: str) -> None:
         return
 
     screen = model.CurrentWeatherScreen(record, weather)
-    ui.console.clear()
+    if clear:
+        ui.console.clear()
     ui.console.line(1)
     ui.console.print(screen)
 
 
-def forecast(location: str) -> None:
+def forecast(location: str, page: bool = False) -> None:
     """
-    This function gets the weather forecast for a given location
+    This function gets the weather forecast for a given location, displaying it in the pager when asked to and
+    the terminal allows
     """
     location = location.title()
 
-    record = data.get_location_record(location)
+    record = _find_location(location)
     if record is None:
         ui.console.line(1)
         ui.system_message(f"Location ({location}) not found, add it before requesting weather forecast")
         ui.console.line(1)
         return
 
-    forecasts = weather_service.get_forecast(record.location, record.latitude, record.longitude, record.timezone)
+    forecasts = _cached_forecast(record)
     if forecasts is None:
+        forecasts = weather_service.get_forecast(record.location, record.latitude, record.longitude, record.timezone,
+                                                 variables=model.Forecasts.variables)
+    if forecasts is None:
+        # The sun times need no download, so they can be shown even when the forecast cannot be obtained
         ui.console.line(1)
-        ui.system_message(f"Unable to obtain weather forecast for location ({location}).")
-        ui.console.line(1)
+        ui.system_message(f"Unable to obtain weather forecast for location ({location}), showing the sun times only.")
+        forecasts = solar.sun_forecasts(record, datetime.date.today())
+    else:
+        forecasts = solar.add_sun_times(record, forecasts)
+
+    if page and pager.interactive():
+        pager.Pager(model.Forecasts.columns, forecasts, lambda index, item: model.Forecasts.row(item),
+                    title=f"Forecast for: {record.name}").run()
         return
 
     screen = model.WeatherForecastScreen(record, forecasts)
     ui.console.clear()
     ui.console.line(1)
     ui.console.print(screen)
+
+
+def watch(locations: tuple[str, ...], interval: int) -> None:
+    """
+    This function keeps the current weather for the given locations on screen, refreshing it periodically.
+    The board is only redrawn when one of its cells has changed.
+    """
+    records = list()
+    for location in locations:
+        location = location.title()
+        record = _find_location(location)
+        if record is None:
+            ui.console.line(1)
+            ui.system_message(f"Location ({location}) not found, add it before requesting current weather.")
+            ui.console.line(1)
+            return
+        records.append(record)
+
+    board = model.CurrentWeatherBoard()
+    ui.console.clear()
+
+    with rich.live.Live(board, console=ui.console, auto_refresh=False) as live:
+        try:
+            while True:
+                rows = list()
+                for index, record in enumerate(records):
+                    try:
+                        weather = weather_service.get_current_weather(record.location, record.latitude,
+                                                                      record.longitude, record.timezone,
+                                                                      show_status=False)
+                    except Exception as e:
+                        # One failing location must not bring the board down
+                        logger.warning(f"Watch refresh failed for {record.location}: {e}")
+                        weather = None
+
+                    # Keep the last good row until the weather can be obtained again
+                    if weather is None and index < len(board):
+                        rows.append(board[index])
+                    else:
+                        rows.append(model.CurrentWeatherBoard.format_row(record, weather))
+
+                if rows != board:
+                    board[:] = rows
+                    live.update(board, refresh=True)
+
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
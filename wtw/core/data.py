@@ -17,49 +17,49 @@ __maintainer__ = "James Dooley"
 __status__ = "Production"
 
 __all__ = ['get_location_record', 'insert_location_record', 'update_location_record',
-           'delete_location_record', 'all_locations']
+           'delete_location_record', 'all_locations', 'iter_locations', 'search_locations', 'database_status',
+           'migrate_database', 'update_location_records', 'insert_location_records', 'LOCATION_FILTERS',
+           'OBSERVATION_FIELDS', 'insert_observation_chunk', 'completed_chunks', 'observation_range',
+           'observation_statistics']
 
+import datetime
+import difflib
+import math
 import sqlite3
+from array import array
 from pathlib import Path
+from typing import Iterable, Iterator
 from loguru import logger
 from . import errors
 from . import model
+from . import name_index
+from . import schema
 from . import utils
 
 
-# noinspection SqlDialectInspection,SqlNoDataSourceInspection
-def _init_database(db_con: sqlite3.Connection) -> None:
-    sql = """
-        CREATE TABLE location(
-            name TEXT NOT NULL,
-            location TEXT NOT NULL,
-            latitude TEXT NOT NULL,
-            longitude TEXT NOT NULL,
-            timezone TEXT NOT NULL,
-            region TEXT,
-            country_code TEXT NOT NULL,
-            country TEXT,
-            post_codes TEXT,
-            lock_version INTEGER NOT NULL DEFAULT 1,
-            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            PRIMARY KEY(name));"""
-
-    try:
-        with db_con:
-            cursor = db_con.cursor()
-            cursor.execute(sql)
-    except Exception as e:
-        logger.error(f"Failed to create the application database: {e}")
-        raise
+def _to_location(row: sqlite3.Row) -> model.Location:
+    """
+    This function converts a location row to a location record, matching the columns by name
+    """
+    audit = [row[column] for column in ('lock_version', 'created_at', 'updated_at') if column in row.keys()]
+    return model.Location(row['name'], row['location'], row['longitude'], row['latitude'], row['region'],
+                          row['country_code'], row['country'], row['timezone'], row['post_codes'], *audit)
 
 
-def _get_connection(file: Path | None = None) -> sqlite3.Connection:
+def _db_file(file: Path | None) -> Path:
     """
-    This function gets the database connection
+    This function returns the database file, defaulting to the one in the application folder
     """
     if file is None:
         file = utils.app_folder().joinpath("data.sqlite")
+    return file
+
+
+def _get_connection(file: Path | None = None, migrate: bool = True) -> sqlite3.Connection:
+    """
+    This function gets the database connection, bringing the schema up to date unless told otherwise
+    """
+    file = _db_file(file)
 
     init = False
     if not file.exists():
@@ -68,34 +68,119 @@ def _get_connection(file: Path | None = None) -> sqlite3.Connection:
     db_con = sqlite3.connect(file)
     db_con.row_factory = sqlite3.Row
 
-    if init:
-        _init_database(db_con)
+    if migrate and schema.current_version(db_con) < schema.LATEST_VERSION:
+        try:
+            schema.migrate(db_con)
+        except Exception as e:
+            logger.error(f"Failed to migrate the application database: {e}")
+            db_con.close()
+            raise
+
+    if migrate and (init or not name_index.index_file(file).exists()):
+        _refresh_name_index(db_con, file)
 
     return db_con
 
 
+def database_status(file: Path | None = None) -> tuple[int, list[schema.Migration]]:
+    """
+    This function returns the schema version of the database and the migrations waiting to be applied
+    """
+    con = _get_connection(file, migrate=False)
+
+    try:
+        return schema.current_version(con), schema.pending_migrations(con)
+    finally:
+        con.close()
+
+
+def migrate_database(file: Path | None = None) -> list[schema.Migration]:
+    """
+    This function applies the pending migrations to the database
+    """
+    con = _get_connection(file, migrate=False)
+
+    try:
+        return schema.migrate(con)
+    finally:
+        con.close()
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+def _refresh_name_index(db_con: sqlite3.Connection, file: Path | None = None) -> None:
+    """
+    This function rewrites the name index used by shell completion
+    """
+    try:
+        name_index.write_index((row[0] for row in db_con.execute("SELECT name FROM location")), _db_file(file))
+    except OSError as e:
+        logger.warning(f"Failed to write the location name index: {e}")
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+_INSERT_SQL = """INSERT INTO location(name, location, latitude, longitude, timezone, region,
+                                        country_code, country, post_codes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);"""
+
+
+def _insert_params(record: model.Location) -> tuple:
+    return (record.name, record.location, record.latitude, record.longitude, record.timezone, record.region,
+            record.country_code, record.country, ''.join(record.post_codes))
+
+
+def insert_location_records(records: Iterable[model.Location], file: Path | None = None) -> list[str]:
+    """
+    This function inserts many records in one transaction, skipping those whose name is already taken
+
+    :param records: The records to insert
+    :param file: The database file
+    :return: The names of the records skipped as duplicates
+    """
+    duplicates = list()
+    con = _get_connection(file)
+
+    try:
+        with con:
+            cursor = con.cursor()
+            cursor.execute("BEGIN")
+            for record in records:
+                try:
+                    cursor.execute("SAVEPOINT insert_location")
+                    cursor.execute(_INSERT_SQL, _insert_params(record))
+                    cursor.execute("RELEASE insert_location")
+                except sqlite3.IntegrityError:
+                    cursor.execute("ROLLBACK TO insert_location")
+                    cursor.execute("RELEASE insert_location")
+                    duplicates.append(record.name)
+        _refresh_name_index(con, file)
+        return duplicates
+    except Exception as e:
+        logger.error(f"Failed to insert records - {e}")
+        raise
+    finally:
+        con.close()
+
+
 # noinspection SqlDialectInspection,SqlNoDataSourceInspection
 def insert_location_record(record: model.Location, file: Path | None = None) -> bool:
     """
     This function inserts a record in the database
     """
-    sql = """INSERT INTO location(name, location, latitude, longitude, timezone, region, 
-                                    country_code, country, post_codes) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);"""
+    sql = _INSERT_SQL
 
     con = _get_connection(file)
 
     try:
         with con:
             cursor = con.cursor()
-            cursor.execute(sql, (record.name, record.location, record.latitude, record.longitude, record.timezone,
-                                 record.region, record.country_code, record.country, ''.join(record.post_codes)))
+            cursor.execute(sql, _insert_params(record))
     except sqlite3.IntegrityError:
         return False
     except Exception as e:
         logger.error(f"Failed to insert record: {record.name} - {e}")
         raise
     else:
+        _refresh_name_index(con, file)
         return cursor.lastrowid > 0
     finally:
         con.close()
@@ -114,6 +199,7 @@ def delete_location_record(name: str, file: Path | None = None) -> bool:
         with con:
             cursor = con.cursor()
             cursor.execute(sql, (name,))
+        _refresh_name_index(con, file)
         return cursor.rowcount == 1
     except Exception as e:
         logger.error(f"Failed to delete record: {name} - {e}")
@@ -122,13 +208,76 @@ def delete_location_record(name: str, file: Path | None = None) -> bool:
         con.close()
 
 
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+_UPDATE_SQL = """UPDATE location SET location = ?, latitude = ?, longitude = ?, timezone = ?, region = ?,
+                        country_code = ?, country = ?, post_codes = ?, lock_version = lock_version + 1,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE (name = ?) AND (lock_version = ?);"""
+
+
+def _update_params(record: model.Location) -> tuple:
+    return (record.location, record.latitude, record.longitude, record.timezone, record.region, record.country_code,
+            record.country, ''.join(record.post_codes), record.name, record.lock_version)
+
+
+def update_location_record(record: model.Location, file: Path | None = None) -> bool:
+    """
+    This function updates a record, provided nobody else has updated it since it was read. The record's
+    lock_version must be the one read from the database; the update and the version check are one statement,
+    so concurrent writers never overwrite each other's changes.
+
+    :param record: The record with its new values
+    :param file: The database file
+    :return: True if the record was updated, False if it was changed or deleted in the meantime
+    """
+    con = _get_connection(file)
+
+    try:
+        with con:
+            cursor = con.cursor()
+            cursor.execute(_UPDATE_SQL, _update_params(record))
+        return cursor.rowcount == 1
+    except Exception as e:
+        logger.error(f"Failed to update record: {record.name} - {e}")
+        raise
+    finally:
+        con.close()
+
+
+def update_location_records(records: Iterable[model.Location], file: Path | None = None) -> list[str]:
+    """
+    This function updates many records in one transaction, each with the same version check as
+    update_location_record. Records that fail the check are skipped, the others are still updated.
+
+    :param records: The records with their new values
+    :param file: The database file
+    :return: The names of the records that were changed or deleted in the meantime
+    """
+    stale = list()
+    con = _get_connection(file)
+
+    try:
+        with con:
+            cursor = con.cursor()
+            for record in records:
+                cursor.execute(_UPDATE_SQL, _update_params(record))
+                if cursor.rowcount != 1:
+                    stale.append(record.name)
+        return stale
+    except Exception as e:
+        logger.error(f"Failed to update records - {e}")
+        raise
+    finally:
+        con.close()
+
+
 # noinspection SqlDialectInspection,SqlNoDataSourceInspection
 def get_location_record(name: str, file: Path | None = None) -> model.Location | None:
     """
     Gets the location record for a given name
     """
-    sql = """SELECT name, location, latitude, longitude, region, country_code, country, timezone, post_codes 
-                 FROM location WHERE (name = ?)"""
+    sql = """SELECT name, location, latitude, longitude, region, country_code, country, timezone, post_codes,
+                    lock_version, created_at, updated_at FROM location WHERE (name = ?)"""
 
     con = _get_connection(file)
 
@@ -137,7 +286,7 @@ def get_location_record(name: str, file: Path | None = None) -> model.Location |
         cursor.execute(sql, (name,))
         row = cursor.fetchone()
         if row:
-            return model.Location(*row)
+            return _to_location(row)
     except Exception as e:
         logger.error(f"Failed to get location record: {name} - {e}")
         raise
@@ -145,27 +294,290 @@ def get_location_record(name: str, file: Path | None = None) -> model.Location |
         con.close()
 
 
+# The columns location listings can be filtered on
+LOCATION_FILTERS = ('location', 'region', 'country_code', 'country', 'timezone')
+
+
 # noinspection SqlDialectInspection,SqlNoDataSourceInspection
+def iter_locations(after: str | None = None, limit: int | None = None, filters: dict[str, str] | None = None,
+                   batch_size: int = 500, file: Path | None = None) -> Iterator[model.Location]:
+    """
+    This function yields the location records ordered by location, reading them from the database in batches
+    rather than all at once
+
+    :param after: The name of the last location already seen, the listing continues with the one following it
+    :param limit: The maximum number of records to yield
+    :param filters: Column values the records must match, the columns being those in LOCATION_FILTERS
+    :param batch_size: The number of rows fetched from the database at a time
+    :param file: The database file
+    :return: The location records
+    """
+    filters = filters or dict()
+    unknown = set(filters) - set(LOCATION_FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown location filters: {', '.join(sorted(unknown))}")
+
+    conditions = [f"({column} = ?)" for column in filters]
+    params = list(filters.values())
+
+    con = _get_connection(file)
+
+    try:
+        cursor = con.cursor()
+
+        if after is not None:
+            # Keyset pagination: continue after the (location, name) key of the given record
+            row = cursor.execute("SELECT location FROM location WHERE (name = ?)", (after,)).fetchone()
+            if row is None:
+                raise errors.RecordNotFoundError(after)
+            conditions.append("((location, name) > (?, ?))")
+            params.extend((row['location'], after))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"""SELECT name, location, latitude, longitude, region, country_code, country, timezone, post_codes,
+                    lock_version, created_at, updated_at FROM location {where} ORDER BY location, name LIMIT ?"""
+        params.append(-1 if limit is None else limit)
+
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield _to_location(row)
+    except errors.RecordNotFoundError:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get location records - {e}")
+        raise
+    finally:
+        con.close()
+
+
 def all_locations(file: Path | None = None) -> model.Locations | None:
     """
     This function returns all the location records in the database
     """
-    sql = """SELECT name, location, latitude, longitude, region, country_code, country, timezone, post_codes, 
-                lock_version, created_at, updated_at FROM location ORDER BY location"""
+    records = model.Locations(iter_locations(file=file))
+    if records:
+        return records
+
+
+def _similarity(query: str, row: sqlite3.Row) -> float:
+    """
+    This function scores how closely the name or location of a row resembles the search term
+    """
+    term = query.lower()
+    return max(difflib.SequenceMatcher(None, term, row['name'].lower()).ratio(),
+               difflib.SequenceMatcher(None, term, row['location'].lower()).ratio())
+
+
+def _trigram_query(value: str) -> str:
+    """
+    This function converts a search term into a full text query matching any of its trigrams
+    """
+    value = value.lower()
+    trigrams = dict.fromkeys(value[i:i + 3] for i in range(0, len(value) - 2))
+    return ' OR '.join('"' + trigram.replace('"', '""') + '"' for trigram in trigrams)
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+def search_locations(query: str, limit: int = 10, file: Path | None = None) -> model.Locations | None:
+    """
+    This function returns the locations best matching a partial or misspelt name. Substring matches on the name,
+    location, region or country come first, followed by the closest fuzzy matches. Where SQLite lacks the trigram
+    tokenizer only the substring matches are found.
+
+    :param query: The text to search for
+    :param limit: The maximum number of locations to return
+    :param file: The database file
+    :return: The matching locations, best match first
+    """
+    columns = """l.name, l.location, l.latitude, l.longitude, l.region, l.country_code, l.country, l.timezone,
+                 l.post_codes"""
+
+    query = query.strip()
+    if len(query) == 0:
+        return None
 
     con = _get_connection(file)
 
     try:
         cursor = con.cursor()
-        cursor.execute(sql)
-        rows = cursor.fetchall()
+        pattern = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        indexed = cursor.execute("""SELECT 1 FROM sqlite_master
+                                        WHERE (type = 'table') AND (name = 'location_search')""").fetchone()
+
+        if len(query) < 3:
+            # Too short for trigrams, fall back on a name prefix match
+            cursor.execute(f"""SELECT {columns} FROM location l WHERE (l.name LIKE ? ESCAPE '\\')
+                                    ORDER BY l.name LIMIT ?""", (pattern + '%', limit))
+            rows = cursor.fetchall()
+        elif indexed is None:
+            # No trigram index where SQLite lacks the tokenizer, fall back on a substring match
+            cursor.execute(f"""SELECT {columns} FROM location l
+                                    WHERE (l.name LIKE ?1 ESCAPE '\\') OR (l.location LIKE ?1 ESCAPE '\\')
+                                        OR (l.region LIKE ?1 ESCAPE '\\') OR (l.country LIKE ?1 ESCAPE '\\')
+                                    ORDER BY l.name LIMIT ?2""", ('%' + pattern + '%', limit))
+            rows = cursor.fetchall()
+        else:
+            phrase = '"' + query.replace('"', '""') + '"'
+            cursor.execute(f"""SELECT {columns} FROM location_search s JOIN location l ON (l.rowid = s.rowid)
+                                    WHERE (location_search MATCH ?) ORDER BY s.rank LIMIT ?""", (phrase, limit))
+            rows = cursor.fetchall()
+
+            if len(rows) < limit:
+                # Rank the rows sharing the most trigrams with the query by their similarity to it
+                cursor.execute(f"""SELECT {columns} FROM location_search s JOIN location l ON (l.rowid = s.rowid)
+                                        WHERE (location_search MATCH ?) ORDER BY s.rank LIMIT ?""",
+                               (_trigram_query(query), limit * 10))
+                found = set(row['name'] for row in rows)
+                scored = [(_similarity(query, row), row) for row in cursor.fetchall() if row['name'] not in found]
+                scored.sort(key=lambda item: item[0], reverse=True)
+                rows.extend(row for score, row in scored[:limit - len(rows)] if score >= 0.5)
+
         if rows:
-            records = model.Locations()
-            for row in rows:
-                records.append(model.Location(*row))
-            return records
+            return model.Locations(_to_location(row) for row in rows)
     except Exception as e:
-        logger.error(f"Failed to get location records - {e}")
+        logger.error(f"Failed to search location records: {query} - {e}")
+        raise
+    finally:
+        con.close()
+
+
+# The observation columns, the same as the model.Forecast fields with sunrise and sunset held as seconds since the
+# epoch of the naive local time
+OBSERVATION_FIELDS = ('weather_code', 'temp_max', 'temp_min', 'sunrise', 'sunset', 'precipitation_sum', 'rain',
+                      'showers', 'snowfall', 'precipitation_hours', 'wind_speed', 'wind_direction')
+
+
+def _observation_value(column: array, index: int) -> float | int | None:
+    """
+    Returns a value of a packed column, mapping the NaN and -1 markers of missing values to None
+    """
+    value = column[index]
+    if column.typecode == 'd':
+        return None if math.isnan(value) else value
+    return None if value < 0 else value
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+def insert_observation_chunk(name: str, start: datetime.date, end: datetime.date, days: array,
+                             columns: dict[str, array], file: Path | None = None) -> int:
+    """
+    This function stores the daily observations of a location downloaded for a date range, together with the
+    checkpoint marking the range as done, in one transaction. Observations already stored are replaced.
+
+    :param name: The location name
+    :param start: The first day of the range
+    :param end: The last day of the range
+    :param days: The days observed, as ordinals
+    :param columns: The observed values, one packed array per field in OBSERVATION_FIELDS
+    :param file: The database file
+    :return: The number of days stored
+    """
+    unknown = set(columns.keys()) - set(OBSERVATION_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown observation fields: {', '.join(sorted(unknown))}")
+
+    fields = list(columns.keys())
+    # An upsert rather than INSERT OR REPLACE, as replacing a row does not fire the triggers maintaining the
+    # climatology table
+    sql = f"""INSERT INTO observation(name, day, {', '.join(fields)})
+                VALUES (?, ?{', ?' * len(fields)})
+                ON CONFLICT(name, day) DO UPDATE SET {', '.join(f'{field} = excluded.{field}' for field in fields)};"""
+
+    rows = ((name, datetime.date.fromordinal(day).isoformat(),
+             *(_observation_value(columns[field], index) for field in fields)) for index, day in enumerate(days))
+
+    con = _get_connection(file)
+
+    try:
+        with con:
+            cursor = con.cursor()
+            cursor.executemany(sql, rows)
+            cursor.execute("INSERT OR REPLACE INTO backfill_chunk(name, start_day, end_day) VALUES (?, ?, ?);",
+                           (name, start.isoformat(), end.isoformat()))
+        return len(days)
+    except Exception as e:
+        logger.error(f"Failed to store observations: {name} {start} - {end} - {e}")
+        raise
+    finally:
+        con.close()
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+def completed_chunks(name: str, file: Path | None = None) -> set[tuple[datetime.date, datetime.date]]:
+    """
+    This function returns the date ranges already backfilled for a location
+    """
+    con = _get_connection(file)
+
+    try:
+        return set((datetime.date.fromisoformat(row['start_day']), datetime.date.fromisoformat(row['end_day']))
+                   for row in con.execute("SELECT start_day, end_day FROM backfill_chunk WHERE (name = ?)", (name,)))
+    finally:
+        con.close()
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+def observation_range(name: str, file: Path | None = None) -> tuple[datetime.date, datetime.date] | None:
+    """
+    This function returns the first and last day observed at a location, None when nothing has been stored
+    """
+    con = _get_connection(file)
+
+    try:
+        first, last = con.execute("SELECT MIN(day), MAX(day) FROM observation WHERE (name = ?)", (name,)).fetchone()
+        if first is not None:
+            return datetime.date.fromisoformat(first), datetime.date.fromisoformat(last)
+    finally:
+        con.close()
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+def observation_statistics(name: str, metric: str, start: datetime.date, end: datetime.date, window: int,
+                           file: Path | None = None) -> model.ObservationStatistics:
+    """
+    This function returns the daily value of a metric at a location with its rolling mean, minimum and maximum
+    over the preceding days and its anomaly against the multi-year average for the calendar day. The rolling
+    values are computed by SQLite window functions and the averages are read from the climatology table, so only
+    the rows of the range and its leading window are read.
+
+    :param name: The location name
+    :param metric: The observation column, one of schema.CLIMATOLOGY_METRICS
+    :param start: The first day to report
+    :param end: The last day to report
+    :param window: The number of days the rolling values cover, including the day itself
+    :param file: The database file
+    :return: The statistics, one per day observed
+    """
+    if metric not in schema.CLIMATOLOGY_METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+
+    sql = f"""SELECT day, value, rolling_mean, rolling_min, rolling_max, normal, value - normal AS anomaly FROM (
+                SELECT observation.day, observation.{metric} AS value,
+                       AVG(observation.{metric}) OVER rolling AS rolling_mean,
+                       MIN(observation.{metric}) OVER rolling AS rolling_min,
+                       MAX(observation.{metric}) OVER rolling AS rolling_max,
+                       climatology.total / NULLIF(climatology.count, 0) AS normal
+                    FROM observation LEFT JOIN climatology ON (climatology.name = observation.name)
+                        AND (climatology.metric = ?) AND (climatology.month_day = substr(observation.day, 6))
+                    WHERE (observation.name = ?) AND (observation.day BETWEEN ? AND ?)
+                    WINDOW rolling AS (ORDER BY julianday(observation.day) RANGE BETWEEN {window - 1:d} PRECEDING
+                                       AND CURRENT ROW))
+                WHERE (day >= ?) ORDER BY day;"""
+
+    lead = start - datetime.timedelta(days=window - 1)
+
+    con = _get_connection(file)
+
+    try:
+        rows = con.execute(sql, (metric, name, lead.isoformat(), end.isoformat(), start.isoformat()))
+        return model.ObservationStatistics((model.ObservationStatistic(**dict(row)) for row in rows),
+                                           title=f"{name} - {metric} ({window}-day window)")
+    except Exception as e:
+        logger.error(f"Failed to get observation statistics: {name} {metric} - {e}")
         raise
     finally:
         con.close()
@@ -16,7 +16,7 @@ __version__ = "1.0.0"
 __maintainer__ = "James Dooley"
 __status__ = "Production"
 
-__all__ = ['DuplicateRecordError', 'RecordNotFoundError']
+__all__ = ['DuplicateRecordError', 'RecordNotFoundError', 'RateLimitExceededError', 'ProviderError']
 
 
 class DuplicateRecordError(Exception):
@@ -31,3 +31,24 @@ class RecordNotFoundError(Exception):
     Raised when a record can't be found in the database
     """
     pass
+
+
+class RateLimitExceededError(Exception):
+    """
+    Raised when the upstream call quota is exhausted and the caller chose not to wait
+    """
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Call quota exhausted, retry in {retry_after:.1f} seconds")
+        self.retry_after = retry_after
+
+
+class ProviderError(Exception):
+    """
+    Raised when a weather provider cannot answer a request
+    """
+
+    def __init__(self, provider: str, message: str, status_code: int | None = None) -> None:
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status_code = status_code
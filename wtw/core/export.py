@@ -0,0 +1,211 @@
+# *******************************************************************************************
+#  File:  export.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['FORMATS', 'ForecastWriter', 'open_writer']
+
+import abc
+import csv
+import datetime
+import math
+from pathlib import Path
+from . import pipeline
+from . import weather_service
+
+FORMATS = ('csv', 'parquet', 'arrow')
+
+# The column order of the export, matching the fields of model.Forecast
+_COLUMNS = ('location', 'day', 'weather_code', 'weather_summary', 'temp_max', 'temp_min', 'sunrise', 'sunset',
+            'precipitation_sum', 'rain', 'showers', 'snowfall', 'precipitation_hours', 'wind_speed', 'wind_direction')
+_UNIX_DAY = datetime.date(1970, 1, 1).toordinal()
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class ForecastWriter(abc.ABC):
+    """
+    This class writes forecasts to a file in batches, so that only one batch is held in memory at a time
+    """
+
+    def __init__(self, path: Path, batch_size: int = 256) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.rows = 0
+        self._batch: list[pipeline.ForecastColumns] = list()
+
+    def __enter__(self) -> 'ForecastWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def add(self, forecast: pipeline.ForecastColumns) -> None:
+        """
+        Adds the forecast of one location, writing the batch once it is full
+        """
+        self._batch.append(forecast)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the pending forecasts
+        """
+        if self._batch:
+            self._write(self._batch)
+            self.rows += sum(len(forecast) for forecast in self._batch)
+            self._batch = list()
+
+    def close(self) -> None:
+        """
+        Writes the pending forecasts and closes the file
+        """
+        self.flush()
+
+    @abc.abstractmethod
+    def _write(self, batch: list[pipeline.ForecastColumns]) -> None:
+        """
+        Writes a batch of forecasts to the file
+        """
+        raise NotImplementedError()
+
+
+def _values(forecast: pipeline.ForecastColumns, field: str) -> list:
+    """
+    Returns the values of one column of a forecast, with missing values as None. Times are returned as epoch
+    seconds and days as days since the epoch.
+    """
+    count = len(forecast)
+
+    match field:
+        case 'location':
+            return [forecast.location] * count
+        case 'day':
+            return [day - _UNIX_DAY for day in forecast.days]
+        case 'weather_summary':
+            codes = forecast.columns.get('weather_code')
+            if codes is None:
+                return [None] * count
+            return [None if math.isnan(code) else weather_service.get_summary(int(code)) for code in codes]
+        case 'sunrise' | 'sunset':
+            column = forecast.columns.get(field)
+            if column is None:
+                return [None] * count
+            return [None if value < 0 else value for value in column]
+        case 'weather_code':
+            column = forecast.columns.get(field)
+            if column is None:
+                return [None] * count
+            return [None if math.isnan(value) else int(value) for value in column]
+        case _:
+            column = forecast.columns.get(field)
+            if column is None:
+                return [None] * count
+            return [None if math.isnan(value) else value for value in column]
+
+
+class _CsvWriter(ForecastWriter):
+    """
+    This class writes the forecasts as comma separated values with a header row
+    """
+
+    def __init__(self, path: Path, batch_size: int = 256) -> None:
+        super().__init__(path, batch_size)
+        self._file = path.open('w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(_COLUMNS)
+
+    def _write(self, batch: list[pipeline.ForecastColumns]) -> None:
+        for forecast in batch:
+            columns = [_values(forecast, field) for field in _COLUMNS]
+            columns[1] = [datetime.date.fromordinal(day + _UNIX_DAY).isoformat() for day in columns[1]]
+            for index in (6, 7):
+                columns[index] = [None if value is None else
+                                  (_EPOCH + datetime.timedelta(seconds=value)).isoformat(timespec='minutes')
+                                  for value in columns[index]]
+            self._writer.writerows(zip(*columns))
+
+    def close(self) -> None:
+        super().close()
+        self._file.close()
+
+
+class _ArrowWriter(ForecastWriter):
+    """
+    This class writes the forecasts as Parquet row groups or Arrow IPC record batches, one per batch
+    """
+
+    def __init__(self, path: Path, file_format: str, batch_size: int = 256) -> None:
+        super().__init__(path, batch_size)
+
+        try:
+            import pyarrow
+        except ImportError:
+            raise RuntimeError("The parquet and arrow formats need pyarrow, install it with: pip install pyarrow")
+
+        self._pa = pyarrow
+        self._schema = pyarrow.schema([
+            ('location', pyarrow.string()),
+            ('day', pyarrow.date32()),
+            ('weather_code', pyarrow.int32()),
+            ('weather_summary', pyarrow.string()),
+            ('temp_max', pyarrow.float64()),
+            ('temp_min', pyarrow.float64()),
+            ('sunrise', pyarrow.timestamp('s')),
+            ('sunset', pyarrow.timestamp('s')),
+            ('precipitation_sum', pyarrow.float64()),
+            ('rain', pyarrow.float64()),
+            ('showers', pyarrow.float64()),
+            ('snowfall', pyarrow.float64()),
+            ('precipitation_hours', pyarrow.float64()),
+            ('wind_speed', pyarrow.float64()),
+            ('wind_direction', pyarrow.float64())])
+
+        if file_format == 'parquet':
+            import pyarrow.parquet
+            self._writer = pyarrow.parquet.ParquetWriter(str(path), self._schema)
+        else:
+            import pyarrow.ipc
+            self._writer = pyarrow.ipc.new_file(str(path), self._schema)
+
+    def _write(self, batch: list[pipeline.ForecastColumns]) -> None:
+        arrays = list()
+        for field in self._schema:
+            values = [value for forecast in batch for value in _values(forecast, field.name)]
+            arrays.append(self._pa.array(values, type=field.type))
+
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        super().close()
+        self._writer.close()
+
+
+def open_writer(file_format: str, path: Path, batch_size: int = 256) -> ForecastWriter:
+    """
+    Opens a forecast writer for the given format
+
+    :param file_format: One of csv, parquet or arrow
+    :param path: The file to write
+    :param batch_size: The number of locations per row group
+    :return: The writer
+    """
+    if file_format == 'csv':
+        return _CsvWriter(path, batch_size)
+    if file_format in ('parquet', 'arrow'):
+        return _ArrowWriter(path, file_format, batch_size)
+
+    raise ValueError(f"Unknown export format: {file_format}")
@@ -0,0 +1,256 @@
+# *******************************************************************************************
+#  File:  forecast_cache.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['ForecastCache', 'cache_file', 'write_cache']
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import time
+from array import array
+from pathlib import Path
+from typing import Iterable
+from . import pipeline
+from . import utils
+from . import weather_service
+
+# File layout, all values little-endian and every block a multiple of 8 bytes long so the arrays stay aligned:
+#
+#   header      magic, version, field count, location count, days, slot count, size of the name text
+#   fields      field count x 24 byte names
+#   slots       slot count x (8 byte name hash, 4 byte location index + 1, 4 bytes padding), open addressing
+#   names       location count x (4 byte offset, 4 byte length) into the name text
+#   name text   the unique location names, UTF-8, one after the other, padded to a multiple of 8 bytes
+#   fetched     location count x float64, the time each forecast was downloaded
+#   days        location count x days x int64 day ordinals, zero for missing days
+#   columns     field count x location count x days x float64, NaN (or -1 for times) for missing values
+#
+# The locations are keyed on their unique name, not on their label, as several locations can share a label. Each
+# field is one contiguous block, so scanning a field over all the locations reads memory sequentially.
+_MAGIC = b'WTWFCST1'
+_VERSION = 2
+_HEADER = struct.Struct('<8sHHIIII4x')
+_SLOT = struct.Struct('<QI4x')
+_NAME = struct.Struct('<II')
+_FIELD_SIZE = 24
+_TIME_FIELDS = ('sunrise', 'sunset')
+
+
+def cache_file() -> Path:
+    """
+    Returns the location of the binary forecast cache
+    """
+    return utils.app_folder().joinpath("forecasts.bin")
+
+
+def _hash(name: str) -> int:
+    return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def write_cache(path: Path, forecasts: Iterable[pipeline.ForecastColumns], days: int = 7,
+                fields: tuple[str, ...] = tuple(weather_service.FORECAST_VARIABLES.keys())) -> int:
+    """
+    Writes the forecasts to a new cache file, replacing the old one atomically
+
+    :param path: The cache file
+    :param forecasts: The forecasts, one per location
+    :param days: The number of days stored per location, longer forecasts are truncated
+    :param fields: The fields stored
+    :return: The number of locations written
+    """
+    forecasts = list(forecasts)
+    count = len(forecasts)
+    slot_count = max(8, 1 << (count * 2 - 1).bit_length())
+    now = time.time()
+
+    slots = [(0, 0)] * slot_count
+    for index, forecast in enumerate(forecasts):
+        key = _hash(forecast.name)
+        slot = key % slot_count
+        while slots[slot][1] != 0:
+            slot = (slot + 1) % slot_count
+        slots[slot] = (key, index + 1)
+
+    names = [forecast.name.encode('utf-8') for forecast in forecasts]
+    text = b''.join(names)
+    text += b'\0' * (-len(text) % 8)
+
+    temp_file = path.with_suffix(f".{os.getpid()}.tmp")
+    with temp_file.open('wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, len(fields), count, days, slot_count, len(text)))
+        file.write(b''.join(field.encode('ascii').ljust(_FIELD_SIZE, b'\0') for field in fields))
+        file.write(b''.join(_SLOT.pack(key, index) for key, index in slots))
+
+        offset = 0
+        for name in names:
+            file.write(_NAME.pack(offset, len(name)))
+            offset += len(name)
+        file.write(text)
+
+        array('d', [now] * count).tofile(file)
+
+        day_block = array('q')
+        for forecast in forecasts:
+            values = list(forecast.days[:days])
+            day_block.extend(values + [0] * (days - len(values)))
+        day_block.tofile(file)
+
+        for field in fields:
+            missing = -1.0 if field in _TIME_FIELDS else math.nan
+            block = array('d')
+            for forecast in forecasts:
+                column = forecast.columns.get(field)
+                values = [missing] * days if column is None else [float(value) for value in column[:days]]
+                block.extend(values + [missing] * (days - len(values)))
+            block.tofile(file)
+
+    os.replace(temp_file, path)
+    return count
+
+
+class ForecastCache:
+    """
+    This class gives read access to a cache file through a memory map. Nothing is parsed when a location is looked
+    up; the returned columns are views over the mapped file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        with path.open('rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < _HEADER.size:
+            self._map.close()
+            raise ValueError(f"Not a forecast cache file: {path}")
+
+        magic, version, field_count, self.count, self.days, self._slot_count, text_size = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._map.close()
+            raise ValueError(f"Not a forecast cache file: {path}")
+
+        # A file cut short by a full disk or a crashed writer must not be read past its end
+        size = _HEADER.size + _FIELD_SIZE * field_count + _SLOT.size * self._slot_count + _NAME.size * self.count + \
+            text_size + 8 * self.count + 8 * self.count * self.days * (1 + field_count)
+        if self._slot_count == 0 or len(self._map) < size:
+            self._map.close()
+            raise ValueError(f"Truncated forecast cache file: {path}")
+
+        offset = _HEADER.size
+        self.fields = tuple(self._map[offset + i * _FIELD_SIZE:offset + (i + 1) * _FIELD_SIZE].rstrip(b'\0').decode()
+                            for i in range(field_count))
+        offset += _FIELD_SIZE * field_count
+
+        self._slots = offset
+        offset += _SLOT.size * self._slot_count
+        self._names = offset
+        offset += _NAME.size * self.count
+        self._text = offset
+        offset += text_size
+
+        view = memoryview(self._map)
+        self._fetched = view[offset:offset + 8 * self.count].cast('d')
+        offset += 8 * self.count
+        self._days = view[offset:offset + 8 * self.count * self.days].cast('q')
+        offset += 8 * self.count * self.days
+
+        block = 8 * self.count * self.days
+        self._columns = dict()
+        for field in self.fields:
+            self._columns[field] = view[offset:offset + block].cast('d')
+            offset += block
+
+    def __enter__(self) -> 'ForecastCache':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        """
+        Releases the views and unmaps the file. If forecasts returned by get are still referenced, the file stays
+        mapped until they are released.
+        """
+        for column in self._columns.values():
+            column.release()
+        self._fetched.release()
+        self._days.release()
+
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+    def _index(self, name: str) -> int | None:
+        key = _hash(name)
+        slot = key % self._slot_count
+        while True:
+            slot_key, index = _SLOT.unpack_from(self._map, self._slots + slot * _SLOT.size)
+            if index == 0:
+                return None
+            if slot_key == key and self.name(index - 1) == name:
+                return index - 1
+            slot = (slot + 1) % self._slot_count
+
+    def name(self, index: int) -> str:
+        """
+        Returns the unique location name stored at the given index
+        """
+        offset, length = _NAME.unpack_from(self._map, self._names + index * _NAME.size)
+        return self._map[self._text + offset:self._text + offset + length].decode('utf-8')
+
+    def fetched_at(self, name: str) -> float | None:
+        """
+        Returns the time the forecast for the location was downloaded, or None if it is not in the cache
+        """
+        index = self._index(name)
+        return None if index is None else self._fetched[index]
+
+    def get(self, name: str, max_age: float | None = None,
+            location: str | None = None) -> pipeline.ForecastColumns | None:
+        """
+        Returns the forecast for the location as views over the file
+
+        :param name: The unique location name
+        :param max_age: The maximum age in seconds of the forecast, any age when not given
+        :param location: The label given to the forecast, the name when not given
+        :return: The forecast columns, or None if the location is missing or the forecast too old
+        """
+        index = self._index(name)
+        if index is None:
+            return None
+        if max_age is not None and time.time() - self._fetched[index] > max_age:
+            return None
+
+        start, end = index * self.days, (index + 1) * self.days
+        days = self._days[start:end]
+        length = next((i for i in range(0, self.days) if days[i] == 0), self.days)
+
+        return pipeline.ForecastColumns(name if location is None else location, days[:length],
+                                        dict((field, column[start:start + length])
+                                             for field, column in self._columns.items()), name)
+
+    def column(self, field: str) -> memoryview:
+        """
+        Returns the values of a field for all the locations, location by location, as one flat view
+        """
+        return self._columns[field][:]
@@ -0,0 +1,314 @@
+# *******************************************************************************************
+#  File:  forecast_history.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['Snapshot', 'CompactionReport', 'ForecastHistory', 'encode_block', 'decode_block']
+
+import sqlite3
+import struct
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator
+from loguru import logger
+from . import pipeline
+from . import utils
+
+# Each block holds the snapshots of one location, zlib compressed. Its layout once decompressed is a sequence of
+# frames, each one snapshot:
+#
+#   header      issued time, day count, field count, length of the field names
+#   names       the field names, comma separated
+#   days        day count x int64 day ordinals
+#   columns     per field: one typecode byte, then day count x 8 byte values
+#
+# The values of a frame are XORed with those the previous frame of the block holds for the same field and day, so
+# the values that did not change between two issues are stored as zeros and cost next to nothing once compressed.
+# The first frame of a block has no predecessor, so every block can be decoded on its own.
+_FRAME = struct.Struct('<dHHH')
+
+# The number of snapshots per block, bounding the work of appending one and of reading any one of them
+BLOCK_SIZE: int = 32
+
+
+class Snapshot:
+    """
+    This class holds one issued forecast of a location
+    """
+
+    def __init__(self, issued: float, forecast: pipeline.ForecastColumns) -> None:
+        self.issued = issued
+        self.forecast = forecast
+
+
+class CompactionReport:
+    """
+    This class records the effect of compacting the history
+    """
+
+    def __init__(self) -> None:
+        self.snapshots = 0
+        self.pruned = 0
+        self.size_before = 0
+        self.size_after = 0
+
+
+def _aligned(previous: pipeline.ForecastColumns | None, field: str, days: array, typecode: str) -> bytes:
+    """
+    Returns the values the previous snapshot holds for the field on the given days, zero where it has none
+    """
+    values = array(typecode, bytes(8 * len(days)))
+    if previous is None or field not in previous.columns or previous.columns[field].typecode != typecode:
+        return values.tobytes()
+
+    column = previous.columns[field]
+    positions = dict((day, index) for index, day in enumerate(previous.days))
+    for index, day in enumerate(days):
+        position = positions.get(day)
+        if position is not None:
+            values[index] = column[position]
+    return values.tobytes()
+
+
+def _xor(left: bytes, right: bytes) -> bytes:
+    """
+    XORs two byte strings of the same length
+    """
+    return (int.from_bytes(left, 'little') ^ int.from_bytes(right, 'little')).to_bytes(len(left), 'little')
+
+
+def _encode_frame(snapshot: Snapshot, previous: pipeline.ForecastColumns | None) -> bytes:
+    forecast = snapshot.forecast
+    names = ','.join(forecast.columns.keys()).encode('ascii')
+    parts = [_FRAME.pack(snapshot.issued, len(forecast.days), len(forecast.columns), len(names)), names,
+             array('q', forecast.days).tobytes()]
+
+    for field, column in forecast.columns.items():
+        parts.append(column.typecode.encode('ascii'))
+        parts.append(_xor(column.tobytes(), _aligned(previous, field, forecast.days, column.typecode)))
+
+    return b''.join(parts)
+
+
+def _decode_frame(location: str, buffer: bytes, offset: int,
+                  previous: pipeline.ForecastColumns | None) -> tuple[Snapshot, int]:
+    issued, day_count, field_count, names_size = _FRAME.unpack_from(buffer, offset)
+    offset += _FRAME.size
+
+    fields = buffer[offset:offset + names_size].decode('ascii').split(',') if field_count else []
+    offset += names_size
+
+    days = array('q', buffer[offset:offset + 8 * day_count])
+    offset += 8 * day_count
+
+    columns = dict()
+    for field in fields:
+        typecode = chr(buffer[offset])
+        offset += 1
+        values = _xor(buffer[offset:offset + 8 * day_count], _aligned(previous, field, days, typecode))
+        columns[field] = array(typecode, values)
+        offset += 8 * day_count
+
+    return Snapshot(issued, pipeline.ForecastColumns(location, array('l', days), columns)), offset
+
+
+def encode_block(snapshots: Iterable[Snapshot], level: int = zlib.Z_DEFAULT_COMPRESSION) -> bytes:
+    """
+    Encodes the snapshots of one location, oldest first, into a compressed block
+
+    :param snapshots: The snapshots
+    :param level: The zlib compression level
+    :return: The block
+    """
+    frames = list()
+    previous = None
+    for snapshot in snapshots:
+        frames.append(_encode_frame(snapshot, previous))
+        previous = snapshot.forecast
+    return zlib.compress(b''.join(frames), level)
+
+
+def decode_block(location: str, block: bytes) -> list[Snapshot]:
+    """
+    Decodes a block back into the snapshots of the location, oldest first
+    """
+    buffer = zlib.decompress(block)
+    snapshots = list()
+    offset = 0
+    previous = None
+
+    while offset < len(buffer):
+        snapshot, offset = _decode_frame(location, buffer, offset, previous)
+        snapshots.append(snapshot)
+        previous = snapshot.forecast
+
+    return snapshots
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+class ForecastHistory:
+    """
+    This class stores every forecast issued for the locations. The snapshots are kept in a small SQLite file,
+    in blocks of up to BLOCK_SIZE snapshots per location. New snapshots are appended to the last block of their
+    location with fast compression; compaction rewrites the blocks with the best compression and prunes the old
+    snapshots.
+    """
+
+    def __init__(self, file: Path | None = None, block_size: int = BLOCK_SIZE) -> None:
+        self.block_size = block_size
+        self._file = file if file is not None else utils.app_folder().joinpath("history.sqlite")
+
+    def _connect(self) -> sqlite3.Connection:
+        self._file.parent.mkdir(parents=True, exist_ok=True)
+        con = sqlite3.connect(self._file, timeout=30, isolation_level=None)
+        con.execute("""CREATE TABLE IF NOT EXISTS snapshot_block(
+                            name TEXT NOT NULL,
+                            block INTEGER NOT NULL,
+                            first_issued REAL NOT NULL,
+                            last_issued REAL NOT NULL,
+                            count INTEGER NOT NULL,
+                            payload BLOB NOT NULL,
+                            PRIMARY KEY(name, block)) WITHOUT ROWID;""")
+        return con
+
+    def append(self, forecasts: Iterable[pipeline.ForecastColumns], issued: float | None = None) -> int:
+        """
+        Appends the forecasts to the history of their locations, in one transaction. The history is kept by the
+        unique location name, as several locations can share a label.
+
+        :param forecasts: The forecasts, one per location
+        :param issued: The time the forecasts were issued, now when not given
+        :return: The number of snapshots appended
+        """
+        issued = time.time() if issued is None else issued
+        count = 0
+        con = self._connect()
+
+        try:
+            # BEGIN IMMEDIATE takes the write lock up front, so the last block is not changed under us
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                for forecast in forecasts:
+                    row = con.execute("""SELECT block, count, payload FROM snapshot_block WHERE (name = ?)
+                                            ORDER BY block DESC LIMIT 1""", (forecast.name,)).fetchone()
+                    snapshot = Snapshot(issued, forecast)
+
+                    if row is not None and row[1] < self.block_size:
+                        snapshots = decode_block(forecast.name, row[2]) + [snapshot]
+                        con.execute("""UPDATE snapshot_block SET last_issued = ?, count = ?, payload = ?
+                                            WHERE (name = ?) AND (block = ?)""",
+                                    (issued, len(snapshots), encode_block(snapshots, 1), forecast.name, row[0]))
+                    else:
+                        block = 0 if row is None else row[0] + 1
+                        con.execute("""INSERT INTO snapshot_block(name, block, first_issued, last_issued, count,
+                                                                  payload) VALUES (?, ?, ?, ?, 1, ?)""",
+                                    (forecast.name, block, issued, issued, encode_block([snapshot], 1)))
+                    count += 1
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+        finally:
+            con.close()
+
+        return count
+
+    def snapshots(self, name: str, since: float | None = None, until: float | None = None) -> Iterator[Snapshot]:
+        """
+        Returns the snapshots of a location, oldest first, decoding only the blocks overlapping the period
+
+        :param name: The unique location name
+        :param since: The earliest issue time returned
+        :param until: The latest issue time returned
+        :return: The snapshots
+        """
+        since = float('-inf') if since is None else since
+        until = float('inf') if until is None else until
+        con = self._connect()
+
+        try:
+            rows = con.execute("""SELECT payload FROM snapshot_block
+                                    WHERE (name = ?) AND (last_issued >= ?) AND (first_issued <= ?)
+                                    ORDER BY block""", (name, since, until)).fetchall()
+        finally:
+            con.close()
+
+        for row in rows:
+            for snapshot in decode_block(name, row[0]):
+                if since <= snapshot.issued <= until:
+                    yield snapshot
+
+    def size(self) -> int:
+        """
+        Returns the number of bytes the compressed snapshots take up
+        """
+        con = self._connect()
+        try:
+            return con.execute("SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM snapshot_block").fetchone()[0]
+        finally:
+            con.close()
+
+    def compact(self, keep_days: int | None = None) -> CompactionReport:
+        """
+        Rewrites the history of every location into full blocks with the best compression, dropping the snapshots
+        issued more than the given number of days ago, then returns the freed space to the file system
+
+        :param keep_days: The number of days of history to keep, all of it when not given
+        :return: The report of the compaction
+        """
+        cutoff = float('-inf') if keep_days is None else time.time() - keep_days * 86400
+        report = CompactionReport()
+        report.size_before = self.size()
+        con = self._connect()
+
+        try:
+            names = [row[0] for row in con.execute("SELECT DISTINCT name FROM snapshot_block")]
+
+            for name in names:
+                con.execute("BEGIN IMMEDIATE")
+                try:
+                    snapshots = list()
+                    for row in con.execute("SELECT payload FROM snapshot_block WHERE (name = ?) ORDER BY block",
+                                           (name,)).fetchall():
+                        snapshots.extend(decode_block(name, row[0]))
+
+                    kept = [snapshot for snapshot in snapshots if snapshot.issued >= cutoff]
+                    report.pruned += len(snapshots) - len(kept)
+                    report.snapshots += len(kept)
+
+                    con.execute("DELETE FROM snapshot_block WHERE (name = ?)", (name,))
+                    for block, start in enumerate(range(0, len(kept), self.block_size)):
+                        chunk = kept[start:start + self.block_size]
+                        con.execute("""INSERT INTO snapshot_block(name, block, first_issued, last_issued, count,
+                                                                  payload) VALUES (?, ?, ?, ?, ?, ?)""",
+                                    (name, block, chunk[0].issued, chunk[-1].issued, len(chunk),
+                                     encode_block(chunk, 9)))
+                    con.execute("COMMIT")
+                except Exception:
+                    con.execute("ROLLBACK")
+                    raise
+
+            con.execute("VACUUM")
+        finally:
+            con.close()
+
+        report.size_after = self.size()
+        logger.info(f"Compacted the forecast history: snapshots={report.snapshots}, pruned={report.pruned}, "
+                    f"bytes={report.size_before} -> {report.size_after}")
+
+        return report
@@ -17,7 +17,8 @@ __maintainer__ = "James Dooley"
 __status__ = "Production"
 
 __all__ = ['Location', 'Forecast', 'CurrentWeather', 'Locations', 'Forecasts', 'CurrentWeatherScreen',
-           'WeatherForecastScreen']
+           'WeatherForecastScreen', 'CurrentWeatherBoard', 'DailyStatistics', 'RegionSummary',
+           'ObservationStatistic', 'ObservationStatistics', 'EndpointTransfer', 'Transfers']
 
 import enum
 import related
@@ -62,6 +63,7 @@ class Location:
     lock_version = related.IntegerField(required=False)
     created_at = related.DateTimeField(required=False)
     updated_at = related.DateTimeField(required=False)
+    population = related.IntegerField(required=False)
 
     def __rich__(self) -> Padding:
         table = Table(style="table-style", show_header=False, show_footer=False,
@@ -89,22 +91,31 @@ class Locations(list):
     This collection houses the metadata for the locations store din the database
     """
 
+    def __init__(self, *args, offset: int = 0, title: str | None = "locations") -> None:
+        super().__init__(*args)
+        self.offset = offset
+        self.title = title
+
+    # The table columns as (header, justification), shared with the pager
+    columns = (("Id", "right"), ("Name", "left"), ("Latitude", "right"), ("Longitude", "right"), ("Region", "left"),
+               ("Country", "left"))
+
+    @staticmethod
+    def row(item: Location, row_number: int) -> tuple[str, ...]:
+        """
+        Returns the cells of the table row for a location
+        """
+        return str(row_number), item.name, str(item.latitude), str(item.longitude), item.region, item.country
+
     def __rich__(self) -> Padding:
-        table = Table(title="locations", style="table-style", header_style="table-header-style",
+        table = Table(title=self.title, style="table-style", header_style="table-header-style",
                       title_style="table-title-style", row_styles=["table-odd-row-style", "table-even-row-style"],
                       border_style="table-border-style")
 
-        table.add_column("Id", justify='right')
-        table.add_column("Name")
-        table.add_column("Latitude", justify='right')
-        table.add_column("Longitude", justify='right')
-        table.add_column("Region")
-        table.add_column("Country")
-        count = 0
-
-        for row_number, item in enumerate(self):
-            table.add_row(str(row_number), item.name, str(item.latitude), str(item.longitude), item.region,
-                          item.country)
+        for header, justify in self.columns:
+            table.add_column(header, justify=justify)
+        for row_number, item in enumerate(self, start=self.offset):
+            table.add_row(*self.row(item, row_number))
 
         return Padding(table, (0, 0, 0, 3))
 
@@ -175,6 +186,43 @@ class CurrentWeatherScreen:
         return table
 
 
+class CurrentWeatherBoard(list):
+    """
+    This collection houses the formatted rows of the current weather board used by the watch mode
+    """
+
+    @staticmethod
+    def format_row(location: Location, weather: CurrentWeather | None) -> tuple[str, ...]:
+        """
+        This method converts the current weather for a location into the cells displayed on the board
+        """
+        if weather is None:
+            return location.location, '-', 'Unavailable', '-', '-', '-'
+
+        return (location.location, weather.current_time.strftime("%d-%m-%Y, %H:%M"), weather.weather_summary,
+                f"{weather.temperature}°C", f"{weather.windspeed} km/h", _degrees_2_direction(weather.winddirection))
+
+    def __rich__(self) -> Table:
+        """
+        This method formats the board for display in the terminal
+        """
+        table = Table(title="Current Weather", style="table-style", header_style="table-header-style",
+                      title_style="table-title-style", row_styles=["table-odd-row-style", "table-even-row-style"],
+                      border_style="table-border-style")
+
+        table.add_column("Location")
+        table.add_column("Time")
+        table.add_column("Summary")
+        table.add_column("Temperature", justify="right")
+        table.add_column("Wind Speed", justify="right")
+        table.add_column("Wind Direction", justify="center")
+
+        for row in self:
+            table.add_row(*row)
+
+        return table
+
+
 @related.immutable()
 class Forecast:
     """
@@ -182,19 +230,21 @@ class Forecast:
     """
     location = related.StringField(required=True)
     day = related.DateField(required=True)
-    weather_code = related.IntegerField(required=True)
-    weather_summary = related.StringField(required=True)
-    temp_max = related.FloatField(required=True)
-    temp_min = related.FloatField(required=True)
-    sunrise = related.DateTimeField(required=True)
-    sunset = related.DateTimeField(required=True)
-    precipitation_sum = related.FloatField(required=True)
-    rain = related.FloatField(required=True)
-    showers = related.FloatField(required=True)
-    snowfall = related.FloatField(required=True)
-    precipitation_hours = related.FloatField(required=True)
-    wind_speed = related.FloatField(required=True)
-    wind_direction = related.FloatField(required=True)
+    weather_code = related.IntegerField(required=False)
+    weather_summary = related.StringField(required=False)
+    temp_max = related.FloatField(required=False)
+    temp_min = related.FloatField(required=False)
+    sunrise = related.DateTimeField(required=False)
+    sunset = related.DateTimeField(required=False)
+    precipitation_sum = related.FloatField(required=False)
+    rain = related.FloatField(required=False)
+    showers = related.FloatField(required=False)
+    snowfall = related.FloatField(required=False)
+    precipitation_hours = related.FloatField(required=False)
+    wind_speed = related.FloatField(required=False)
+    wind_direction = related.FloatField(required=False)
+    # The seconds of daylight, where the sun times were calculated locally, so polar days and nights have one
+    day_length = related.FloatField(required=False)
 
     # def __rich__(self) -> Padding:
     #     """
@@ -225,39 +275,62 @@ class Forecast:
     #     return Padding(table, (0, 0, 0, 3))
 
 
+def _format(value: object, template: str = "{}") -> str:
+    """
+    Formats a forecast value that may not have been downloaded
+    """
+    if value is None:
+        return "-"
+    return template.format(value)
+
+
 class Forecasts(list):
     """
     This collection houses the metadata for the locations store din the database
     """
 
-    def __rich__(self) -> Table:
-        forecast = self[0]
+    # The forecast fields rendered by the table that need to be downloaded, the sun times are calculated locally
+    variables = ('weather_code', 'temp_max', 'temp_min', 'rain', 'showers', 'snowfall', 'wind_speed',
+                 'wind_direction')
+
+    # The table columns as (header, justification), shared with the pager
+    columns = (("Date", "left"), ("Summary", "left"), ("Max Temp.", "right"), ("Min Temp.", "right"),
+               ("Sunrise", "left"), ("Sunset", "left"), ("Day Length", "right"), ("Rain", "right"),
+               ("Showers", "right"), ("Snowfall", "right"), ("Wind Speed", "right"), ("Wind Direction", "center"))
 
+    @staticmethod
+    def row(item: Forecast) -> tuple[str, ...]:
+        """
+        Returns the cells of the table row for a forecast
+        """
+        date = item.day.strftime("%d-%m-%Y")
+        sunset_date = "-" if item.sunset is None else item.sunset.strftime("%H:%M:%S")
+        sunrise_date = "-" if item.sunrise is None else item.sunrise.strftime("%H:%M:%S")
+        wind_direction = "-" if item.wind_direction is None else _degrees_2_direction(item.wind_direction)
+
+        seconds = item.day_length
+        if seconds is None and item.sunrise is not None and item.sunset is not None:
+            seconds = (item.sunset - item.sunrise).total_seconds()
+
+        day_length = "-"
+        if seconds is not None:
+            minutes = round(seconds / 60)
+            day_length = f"{minutes // 60}h {minutes % 60:02d}m"
+
+        return (date, _format(item.weather_summary), _format(item.temp_max, "{}°C"), _format(item.temp_min, "{}°C"),
+                sunrise_date, sunset_date, day_length, _format(item.rain, "{}mm"), _format(item.showers, "{}mm"),
+                _format(item.snowfall, "{}cm"), _format(item.wind_speed, "{} km/h"), wind_direction)
+
+    def __rich__(self) -> Table:
         table = Table(style="table-style",
                       header_style="table-header-style",
                       title_style="table-title-style", row_styles=["table-odd-row-style", "table-even-row-style"],
                       border_style="table-border-style")
 
-        table.add_column("Date")
-        table.add_column("Summary")
-        table.add_column("Max Temp.", justify="right")
-        table.add_column("Min Temp.", justify="right")
-        table.add_column("Sunrise")
-        table.add_column("Sunset")
-        table.add_column("Rain", justify="right")
-        table.add_column("Showers", justify="right")
-        table.add_column("Snowfall", justify="right")
-        table.add_column("Wind Speed", justify="right")
-        table.add_column("Wind Direction", justify="center")
-
+        for header, justify in self.columns:
+            table.add_column(header, justify=justify)
         for item in self:
-            date = item.day.strftime("%d-%m-%Y")
-            sunset_date = item.sunset.strftime("%H:%M:%S")
-            sunrise_date = item.sunrise.strftime("%H:%M:%S")
-
-            table.add_row(date, item.weather_summary, f"{item.temp_max}°C", f"{item.temp_min}°C",
-                          sunrise_date, sunset_date, f"{item.rain}mm", f"{item.showers}mm", f"{item.snowfall}cm",
-                          f"{item.wind_speed} km/h", _degrees_2_direction(item.wind_direction))
+            table.add_row(*self.row(item))
 
         return table
 
@@ -280,3 +353,161 @@ class WeatherForecastScreen:
         table.add_row(self.forecasts)
 
         return table
+
+
+@related.immutable
+class DailyStatistics:
+    """
+    This class represents the spread of one forecast value across the sites of a region on a given day
+    """
+    day = related.DateField(required=True)
+    metric = related.StringField(required=True)
+    count = related.IntegerField(required=True)
+    minimum = related.FloatField(required=True)
+    maximum = related.FloatField(required=True)
+    mean = related.FloatField(required=True)
+    p10 = related.FloatField(required=True)
+    p50 = related.FloatField(required=True)
+    p90 = related.FloatField(required=True)
+
+
+class RegionSummary(list):
+    """
+    This collection houses the daily statistics of a region, rendered as one row per day
+    """
+
+    def __init__(self, *args, title: str = "Region") -> None:
+        super().__init__(*args)
+        self.title = title
+
+    def __rich__(self) -> Table:
+        table = Table(title=self.title, style="table-style", header_style="table-header-style",
+                      title_style="table-title-style", row_styles=["table-odd-row-style", "table-even-row-style"],
+                      border_style="table-border-style")
+
+        table.add_column("Date")
+        table.add_column("Sites", justify="right")
+        table.add_column("Max Temp. (mean, range)", justify="right")
+        table.add_column("Min Temp. (mean, range)", justify="right")
+        table.add_column("Precipitation (mean, p90)", justify="right")
+        table.add_column("Wind Speed (mean, max)", justify="right")
+
+        days = dict()
+        for item in self:
+            days.setdefault(item.day, dict())[item.metric] = item
+
+        for day, metrics in days.items():
+            def cell(metric: str, template: str) -> str:
+                stats = metrics.get(metric)
+                return "-" if stats is None else template.format(stats=stats)
+
+            sites = max(stats.count for stats in metrics.values())
+            table.add_row(day.strftime("%d-%m-%Y"), str(sites),
+                          cell('temp_max', "{stats.mean:.1f}°C ({stats.minimum:.1f}..{stats.maximum:.1f})"),
+                          cell('temp_min', "{stats.mean:.1f}°C ({stats.minimum:.1f}..{stats.maximum:.1f})"),
+                          cell('precipitation_sum', "{stats.mean:.1f}mm ({stats.p90:.1f})"),
+                          cell('wind_speed', "{stats.mean:.1f} km/h ({stats.maximum:.1f})"))
+
+        return table
+
+
+@related.immutable
+class ObservationStatistic:
+    """
+    This class represents an observed value with its rolling statistics and its departure from the average for the
+    calendar day
+    """
+    day = related.DateField(required=True)
+    value = related.FloatField(required=False)
+    rolling_mean = related.FloatField(required=False)
+    rolling_min = related.FloatField(required=False)
+    rolling_max = related.FloatField(required=False)
+    normal = related.FloatField(required=False)
+    anomaly = related.FloatField(required=False)
+
+
+class ObservationStatistics(list):
+    """
+    This collection houses the statistics of a metric over a date range, rendered with its extremes as the caption
+    """
+
+    def __init__(self, *args, title: str = "Statistics") -> None:
+        super().__init__(*args)
+        self.title = title
+
+    def __rich__(self) -> Table:
+        def number(value: float | None, template: str = "{:.1f}") -> str:
+            return "-" if value is None else template.format(value)
+
+        observed = [item for item in self if item.value is not None]
+        caption = None
+        if observed:
+            highest = max(observed, key=lambda item: item.value)
+            lowest = min(observed, key=lambda item: item.value)
+            caption = f"Highest {highest.value:.1f} on {highest.day.strftime('%d-%m-%Y')}, " \
+                      f"lowest {lowest.value:.1f} on {lowest.day.strftime('%d-%m-%Y')}"
+
+        table = Table(title=self.title, caption=caption, style="table-style", header_style="table-header-style",
+                      title_style="table-title-style", row_styles=["table-odd-row-style", "table-even-row-style"],
+                      border_style="table-border-style")
+
+        table.add_column("Date")
+        table.add_column("Value", justify="right")
+        table.add_column("Rolling Mean", justify="right")
+        table.add_column("Rolling Min.", justify="right")
+        table.add_column("Rolling Max.", justify="right")
+        table.add_column("Average", justify="right")
+        table.add_column("Anomaly", justify="right")
+
+        for item in self:
+            table.add_row(item.day.strftime("%d-%m-%Y"), number(item.value), number(item.rolling_mean),
+                          number(item.rolling_min), number(item.rolling_max), number(item.normal),
+                          number(item.anomaly, "{:+.1f}"))
+
+        return table
+
+
+@related.immutable
+class EndpointTransfer:
+    """
+    This class represents the traffic to one upstream endpoint: the requests made, those answered as not modified,
+    and the bytes received over the network and once decompressed
+    """
+    endpoint = related.StringField(required=True)
+    requests = related.IntegerField(required=True)
+    not_modified = related.IntegerField(required=True)
+    received = related.IntegerField(required=True)
+    decoded = related.IntegerField(required=True)
+
+
+class Transfers(list):
+    """
+    This collection houses the traffic per upstream endpoint, rendered with the totals as the caption
+    """
+
+    def __init__(self, *args, title: str = "Upstream Traffic") -> None:
+        super().__init__(*args)
+        self.title = title
+
+    def __rich__(self) -> Table:
+        received = sum(item.received for item in self)
+        decoded = sum(item.decoded for item in self)
+        caption = f"{received:,} bytes received for {decoded:,} bytes of documents" if self else None
+
+        table = Table(title=self.title, caption=caption, style="table-style", header_style="table-header-style",
+                      title_style="table-title-style", row_styles=["table-odd-row-style", "table-even-row-style"],
+                      border_style="table-border-style")
+
+        table.add_column("Endpoint")
+        table.add_column("Requests", justify="right")
+        table.add_column("Not Modified", justify="right")
+        table.add_column("Received", justify="right")
+        table.add_column("Decoded", justify="right")
+        table.add_column("Saved", justify="right")
+
+        for item in self:
+            saved = 1 - item.received / item.decoded if item.decoded else 0.0
+            table.add_row(item.endpoint, f"{item.requests:,}", f"{item.not_modified:,}", f"{item.received:,}",
+                          f"{item.decoded:,}", f"{saved:.0%}")
+
+        return table
@@ -0,0 +1,86 @@
+# *******************************************************************************************
+#  File:  name_index.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['index_file', 'write_index', 'lookup', 'complete']
+
+# This module backs shell completion, so it must not import rich, requests, related or sqlite3
+import bisect
+import os
+from pathlib import Path
+from typing import Iterable
+import click
+from . import utils
+
+
+def index_file(db_file: Path | None = None) -> Path:
+    """
+    Returns the location of the name index belonging to the given database file
+    """
+    if db_file is None:
+        db_file = utils.app_folder().joinpath("data.sqlite")
+
+    return db_file.with_suffix('.names')
+
+
+def write_index(names: Iterable[str], db_file: Path | None = None) -> None:
+    """
+    Writes the name index, one casefolded key and name per line, sorted by key. The file is replaced atomically
+    so that completion never sees a partial index.
+
+    :param names: The location names
+    :param db_file: The database file the names come from
+    """
+    file = index_file(db_file)
+    lines = sorted(f"{name.casefold()}\t{name}\n" for name in names)
+
+    temp_file = file.with_suffix(f".{os.getpid()}.tmp")
+    temp_file.write_text(''.join(lines), encoding='utf-8')
+    os.replace(temp_file, file)
+
+
+def lookup(prefix: str, limit: int = 50, db_file: Path | None = None) -> list[str]:
+    """
+    Returns the names starting with the given prefix, ignoring case
+
+    :param prefix: The start of the name
+    :param limit: The maximum number of names to return
+    :param db_file: The database file the index belongs to
+    :return: The matching names in alphabetical order
+    """
+    try:
+        lines = index_file(db_file).read_text(encoding='utf-8').splitlines()
+    except OSError:
+        return list()
+
+    key = prefix.casefold()
+    names = list()
+
+    for i in range(bisect.bisect_left(lines, key), len(lines)):
+        if not lines[i].startswith(key) or len(names) == limit:
+            break
+        names.append(lines[i].split('\t', 1)[1])
+
+    return names
+
+
+# noinspection PyUnusedLocal
+def complete(ctx: click.Context, param: click.Parameter, incomplete: str) -> list[str]:
+    """
+    Click shell completion callback for location arguments
+    """
+    return lookup(incomplete)
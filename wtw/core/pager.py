@@ -0,0 +1,250 @@
+# *******************************************************************************************
+#  File:  pager.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['Pager', 'interactive']
+
+import contextlib
+import os
+import sys
+from typing import Callable, Iterable, Iterator
+from rich.console import Console, Group
+from rich.live import Live
+from rich.table import Table
+from rich.text import Text
+from . import ui
+
+# The escape sequences of the keys the pager understands, as sent by POSIX terminals and by the Windows console
+_SEQUENCES = {
+    '\x1b[A': 'up', '\x1b[B': 'down', '\x1b[5~': 'pageup', '\x1b[6~': 'pagedown', '\x1b[H': 'home',
+    '\x1b[1~': 'home', '\x1bOH': 'home', '\x1b[F': 'end', '\x1b[4~': 'end', '\x1bOF': 'end'
+}
+_WINDOWS_KEYS = {'H': 'up', 'P': 'down', 'I': 'pageup', 'Q': 'pagedown', 'G': 'home', 'O': 'end'}
+
+# The lines taken by the title, the table borders, the header and the status line
+_CHROME = 6
+
+
+def interactive() -> bool:
+    """
+    Returns True when both the input and the output are a terminal, so the pager can be used
+    """
+    return sys.stdin.isatty() and sys.stdout.isatty()
+
+
+@contextlib.contextmanager
+def _keyboard() -> Iterator[Callable[[], str]]:
+    """
+    Puts the terminal in character mode for the duration, yielding a function that reads one key
+    """
+    if os.name == 'nt':
+        import msvcrt
+
+        def read() -> str:
+            key = msvcrt.getwch()
+            if key in ('\x00', '\xe0'):
+                return _WINDOWS_KEYS.get(msvcrt.getwch(), '')
+            return {'\r': 'enter', '\x1b': 'escape', '\x08': 'backspace'}.get(key, key)
+
+        yield read
+        return
+
+    import select
+    import termios
+    import tty
+
+    fd = sys.stdin.fileno()
+    settings = termios.tcgetattr(fd)
+
+    def read() -> str:
+        key = os.read(fd, 1).decode('utf-8', errors='ignore')
+        if key == '\x1b':
+            # The rest of an escape sequence arrives at once, a lone escape is the escape key
+            while select.select([fd], [], [], 0.02)[0]:
+                key += os.read(fd, 1).decode('utf-8', errors='ignore')
+                if key in _SEQUENCES:
+                    break
+            return _SEQUENCES.get(key, 'escape' if key == '\x1b' else '')
+        return {'\n': 'enter', '\r': 'enter', '\x7f': 'backspace'}.get(key, key)
+
+    try:
+        tty.setcbreak(fd)
+        yield read
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, settings)
+
+
+class Pager:
+    """
+    This class displays a table one screen at a time. The items are drawn from the source only as far as the
+    reader has scrolled or searched, and the cells of a row are only formatted when the row first comes into view,
+    so the first screen appears at once however many rows there are.
+
+    Keys: up/down or j/k scroll a row, page up/down or space/b a screen, home/end or g/G go to the first or last
+    row, / searches, n finds the next match and q quits.
+    """
+
+    def __init__(self, columns: Iterable[tuple[str, str]], items: Iterable, row: Callable[[int, object], tuple],
+                 title: str | None = None, console: Console | None = None) -> None:
+        """
+        :param columns: The table columns as (header, justification)
+        :param items: The items, one per row, read lazily
+        :param row: Returns the cells of the row for the item at the given position
+        :param title: The table title
+        :param console: The console to draw on, the application console by default
+        """
+        self.columns = tuple(columns)
+        self.title = title
+        self.console = ui.console if console is None else console
+        self.top = 0
+        self.height = max(1, self.console.size.height - _CHROME)
+        self.query: str | None = None
+        self.pattern: str | None = None
+        self.match: int | None = None
+        self.message = ''
+        self._row = row
+        self._source = iter(items)
+        self._items: list = list()
+        self._rows: dict[int, tuple] = dict()
+        self._exhausted = False
+
+    def _fetch(self, count: int) -> int:
+        """
+        Draws items from the source until there are at least count of them or the source is exhausted, returning
+        the number available
+        """
+        while not self._exhausted and len(self._items) < count:
+            item = next(self._source, None)
+            if item is None:
+                self._exhausted = True
+            else:
+                self._items.append(item)
+        return len(self._items)
+
+    def cells(self, index: int) -> tuple:
+        """
+        Returns the cells of a row, formatting them the first time they are needed
+        """
+        cells = self._rows.get(index)
+        if cells is None:
+            cells = self._rows[index] = tuple(self._row(index, self._items[index]))
+        return cells
+
+    def find(self, pattern: str, start: int) -> int | None:
+        """
+        Returns the first row at or after start with a cell containing the pattern, ignoring case
+        """
+        pattern = pattern.lower()
+        index = start
+        while index < self._fetch(index + 1):
+            if any(pattern in str(cell).lower() for cell in self.cells(index)):
+                return index
+            index += 1
+        return None
+
+    def scroll(self, top: int) -> None:
+        """
+        Moves the first visible row, keeping a full screen in view where the rows allow
+        """
+        available = self._fetch(top + self.height)
+        self.top = max(0, min(top, available - self.height))
+
+    def _search(self, start: int) -> None:
+        self.match = self.find(self.pattern, start)
+        if self.match is None:
+            self.message = f"Not found: {self.pattern}"
+        else:
+            self.scroll(self.match)
+            self.message = ''
+
+    def handle(self, key: str) -> bool:
+        """
+        Acts on a key, returning False once the reader has quit
+        """
+        if self.query is not None:
+            if key == 'enter':
+                self.pattern, self.query = self.query, None
+                if self.pattern:
+                    self._search(self.top)
+            elif key == 'escape':
+                self.query = None
+            elif key == 'backspace':
+                self.query = self.query[:-1]
+            elif len(key) == 1 and key.isprintable():
+                self.query += key
+            return True
+
+        self.message = ''
+        if key in ('q', 'escape'):
+            return False
+        elif key in ('down', 'j', 'enter'):
+            self.scroll(self.top + 1)
+        elif key in ('up', 'k'):
+            self.scroll(self.top - 1)
+        elif key in ('pagedown', ' ', 'f'):
+            self.scroll(self.top + self.height)
+        elif key in ('pageup', 'b'):
+            self.scroll(self.top - self.height)
+        elif key in ('home', 'g'):
+            self.scroll(0)
+        elif key in ('end', 'G'):
+            self._fetch(sys.maxsize)
+            self.scroll(len(self._items))
+        elif key == '/':
+            self.query = ''
+        elif key == 'n' and self.pattern:
+            self._search(self.top + 1 if self.match == self.top else self.top)
+        return True
+
+    def status(self) -> Text:
+        """
+        Returns the status line shown below the table
+        """
+        if self.query is not None:
+            return Text(f"/{self.query}", style="normal_message", no_wrap=True, overflow='ellipsis')
+
+        available = self._fetch(self.top + self.height)
+        last = min(self.top + self.height, available)
+        total = f"{available}" if self._exhausted else f"{available}+"
+        text = f"Rows {min(self.top + 1, available)}-{last} of {total}   " \
+               f"↑↓ PgUp PgDn scroll, / search, n next, q quit"
+        if self.message:
+            text = f"{self.message}   {text}"
+        return Text(text, style="system_message", no_wrap=True, overflow='ellipsis')
+
+    def __rich__(self) -> Group:
+        available = self._fetch(self.top + self.height)
+        table = Table(title=self.title, style="table-style", header_style="table-header-style",
+                      title_style="table-title-style", row_styles=["table-odd-row-style", "table-even-row-style"],
+                      border_style="table-border-style")
+
+        for header, justify in self.columns:
+            table.add_column(header, justify=justify, no_wrap=True)
+        for index in range(self.top, min(self.top + self.height, available)):
+            table.add_row(*self.cells(index), style="reverse" if index == self.match else None)
+
+        return Group(table, self.status())
+
+    def run(self) -> None:
+        """
+        Displays the table on the alternate screen until the reader quits
+        """
+        with _keyboard() as read, Live(self, console=self.console, screen=True, auto_refresh=False) as live:
+            live.refresh()
+            while self.handle(read()):
+                self.height = max(1, self.console.size.height - _CHROME)
+                live.refresh()
@@ -0,0 +1,168 @@
+# *******************************************************************************************
+#  File:  pipeline.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['ForecastColumns', 'decode_forecast', 'fetch_forecasts']
+
+import datetime
+import json
+import math
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator
+from loguru import logger
+from . import model
+from . import weather_service
+
+# The fields holding times of day, stored as seconds since the epoch of the naive local time
+_TIME_FIELDS = ('sunrise', 'sunset')
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class ForecastColumns:
+    """
+    This class holds the forecast for one location in columnar form, one packed array per field. It is what the
+    parse workers send back, as it pickles to a fraction of the size of the equivalent model objects.
+    """
+
+    def __init__(self, location: str, days: array, columns: dict[str, array], name: str | None = None) -> None:
+        """
+        :param location: The location label the forecasts are given
+        :param days: The days, as date ordinals
+        :param columns: The values, one packed array per field
+        :param name: The unique name of the location, the label when not given
+        """
+        self.location = location
+        self.name = location if name is None else name
+        self.days = days
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def to_forecasts(self) -> model.Forecasts:
+        """
+        Converts the columns to the model objects used by the views
+        """
+        forecasts = model.Forecasts()
+
+        for i in range(0, len(self.days)):
+            values = dict()
+            for field, column in self.columns.items():
+                value = column[i]
+                if field in _TIME_FIELDS:
+                    value = _EPOCH + datetime.timedelta(seconds=value) if value >= 0 else None
+                elif math.isnan(value):
+                    value = None
+                values[field] = value
+
+            if values.get('weather_code') is not None:
+                values['weather_code'] = int(values['weather_code'])
+                values['weather_summary'] = weather_service.get_summary(values['weather_code'])
+
+            forecasts.append(model.Forecast(location=self.location, day=datetime.date.fromordinal(self.days[i]),
+                                            **values))
+
+        return forecasts
+
+
+def decode_forecast(location: str, payload: bytes, fields: tuple[str, ...], name: str | None = None) -> ForecastColumns:
+    """
+    Decodes a forecast document into packed columns. This runs in the parse worker processes.
+
+    :param location: The label of the location the forecast is for
+    :param payload: The JSON body returned by Open-Meteo
+    :param fields: The model.Forecast fields that were requested
+    :param name: The unique name of the location, the label when not given
+    :return: The forecast in columnar form
+    """
+    data = json.loads(payload)['daily']
+
+    days = array('l', (datetime.date.fromisoformat(day).toordinal() for day in data['time']))
+    columns = dict()
+
+    for field in fields:
+        values = data[weather_service.FORECAST_VARIABLES[field]]
+        if field in _TIME_FIELDS:
+            columns[field] = array('q', (-1 if value is None else
+                                         int((datetime.datetime.fromisoformat(value) - _EPOCH).total_seconds())
+                                         for value in values))
+        else:
+            columns[field] = array('d', (math.nan if value is None else float(value) for value in values))
+
+    return ForecastColumns(location, days, columns, name)
+
+
+def _download(record: model.Location, fields: tuple[str, ...]) -> bytes | None:
+    """
+    Downloads the forecast for one location, logging rather than raising failures so that one bad location does
+    not stop a large pull
+    """
+    try:
+        return weather_service.download_forecast(record.latitude, record.longitude, record.timezone, fields)
+    except Exception as e:
+        logger.warning(f"Pipeline download failed for {record.name}: {e}")
+
+
+def fetch_forecasts(locations: Iterable[model.Location], variables: Iterable[str] | None = None,
+                    io_workers: int = 8, parse_workers: int | None = None) -> \
+        Iterator[tuple[model.Location, ForecastColumns | None]]:
+    """
+    Fetches the forecasts for many locations. The downloads run in a thread pool while the documents are decoded
+    in a process pool, so that parsing is not limited by the GIL. Results are yielded as they complete, in no
+    particular order, and the number of documents held in memory is bounded.
+
+    :param locations: The locations to fetch
+    :param variables: The model.Forecast fields to fetch, all of them when not given
+    :param io_workers: The number of concurrent downloads
+    :param parse_workers: The number of parse processes, one per CPU when not given
+    :return: Pairs of location and forecast columns, the forecast being None when it could not be obtained
+    """
+    fields = tuple(weather_service.FORECAST_VARIABLES.keys() if variables is None else variables)
+    window = io_workers * 4
+    source = iter(locations)
+    pending: dict[Future, model.Location] = dict()
+
+    with ThreadPoolExecutor(max_workers=io_workers) as io_pool, \
+            ProcessPoolExecutor(max_workers=parse_workers) as parse_pool:
+
+        def fill() -> None:
+            while len(pending) < window:
+                record = next(source, None)
+                if record is None:
+                    return
+                pending[io_pool.submit(_download, record, fields)] = record
+
+        fill()
+        while pending:
+            done, _ = wait(pending.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                record = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"Pipeline failed to decode the forecast for {record.name}: {e}")
+                    result = None
+
+                if isinstance(result, ForecastColumns):
+                    yield record, result
+                elif result is None:
+                    yield record, None
+                else:
+                    pending[parse_pool.submit(decode_forecast, record.location, result, fields, record.name)] = record
+
+            fill()
@@ -0,0 +1,378 @@
+# *******************************************************************************************
+#  File:  providers.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['Response', 'Provider', 'OpenMeteoProvider', 'StubProvider', 'ProviderStats', 'Router']
+
+import abc
+import datetime
+import hashlib
+import json
+import threading
+import time
+from typing import Callable
+import requests
+from loguru import logger
+from . import errors
+
+
+class Response:
+    """
+    This class holds the answer of a provider: the document, the validators to revalidate it with later, the
+    number of bytes that crossed the network for it and, where the provider measured it, the seconds the network
+    request took. The answer to a conditional request for a document that has not changed has no body.
+    """
+
+    def __init__(self, body: bytes | None, etag: str | None = None, last_modified: str | None = None,
+                 received: int | None = None, elapsed: float | None = None) -> None:
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.received = (0 if body is None else len(body)) if received is None else received
+        self.elapsed = elapsed
+
+    @property
+    def not_modified(self) -> bool:
+        return self.body is None
+
+
+class Provider(abc.ABC):
+    """
+    This class defines the interface of a weather data provider. Each method takes the request parameters of the
+    Open-Meteo API, and optionally the cached response to revalidate, and returns the JSON document Open-Meteo
+    would, raising a ProviderError when it cannot. Providers that do not support conditional requests ignore the
+    cached response and always return the document.
+    """
+    name: str = 'provider'
+
+    @abc.abstractmethod
+    def forecast(self, params: dict, cached: Response | None = None) -> Response:
+        """
+        Returns the daily forecast document
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def current(self, params: dict, cached: Response | None = None) -> Response:
+        """
+        Returns the current weather document
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def archive(self, params: dict, cached: Response | None = None) -> Response:
+        """
+        Returns the historical observations document
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def geocode(self, params: dict, cached: Response | None = None) -> Response:
+        """
+        Returns the places matching a name
+        """
+        raise NotImplementedError
+
+
+def _received(response: requests.Response) -> int:
+    """
+    Returns the size of the body as it crossed the network, before it was decompressed
+    """
+    try:
+        return response.raw.tell()
+    except AttributeError:
+        return len(response.content)
+
+
+class OpenMeteoProvider(Provider):
+    """
+    This class calls the Open-Meteo APIs, either the public service, which serves each API from its own host, or a
+    self-hosted instance serving them all from one base url. Bodies are requested compressed, with brotli when the
+    brotli package is installed, and cached responses are revalidated with the validators the server gave for them.
+    """
+
+    def __init__(self, base_url: str | None = None, session: requests.Session | None = None,
+                 acquire: Callable[[], None] | None = None, timeout: float = 30.0) -> None:
+        """
+        :param base_url: The url of a self-hosted instance, the public service when not given
+        :param session: The session the requests are made with
+        :param acquire: Called before each request, to take a token from the call quota
+        :param timeout: The seconds to wait for a response before failing over
+        """
+        self.name = 'open-meteo' if base_url is None else base_url.rstrip('/')
+        self.base_url = None if base_url is None else base_url.rstrip('/')
+        self.session = requests.Session() if session is None else session
+        self.acquire = acquire
+        self.timeout = timeout
+
+    def _get(self, host: str, path: str, params: dict, cached: Response | None) -> Response:
+        url = f"https://{host}{path}" if self.base_url is None else f"{self.base_url}{path}"
+
+        # urllib3 adds br to the encodings it accepts when a brotli package is installed
+        headers = {'Accept-Encoding': requests.utils.DEFAULT_ACCEPT_ENCODING}
+        if cached is not None and cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached is not None and cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+
+        if self.acquire is not None:
+            self.acquire()
+
+        # Timed after the quota wait, so that the router ranks the providers on their network time alone
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url=url, params=params, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise errors.ProviderError(self.name, str(e)) from e
+        elapsed = time.perf_counter() - start
+
+        if response.status_code == 304 and cached is not None:
+            return Response(None, response.headers.get('ETag', cached.etag),
+                            response.headers.get('Last-Modified', cached.last_modified), _received(response),
+                            elapsed)
+
+        if response.status_code != 200:
+            raise errors.ProviderError(self.name, f"{response.status_code} - {response.text}", response.status_code)
+
+        return Response(response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                        _received(response), elapsed)
+
+    def forecast(self, params: dict, cached: Response | None = None) -> Response:
+        return self._get('api.open-meteo.com', '/v1/forecast', params, cached)
+
+    def current(self, params: dict, cached: Response | None = None) -> Response:
+        return self._get('api.open-meteo.com', '/v1/forecast', params, cached)
+
+    def archive(self, params: dict, cached: Response | None = None) -> Response:
+        return self._get('archive-api.open-meteo.com', '/v1/archive', params, cached)
+
+    def geocode(self, params: dict, cached: Response | None = None) -> Response:
+        return self._get('geocoding-api.open-meteo.com', '/v1/search', params, cached)
+
+
+def _seed(*values: object) -> int:
+    return int.from_bytes(hashlib.blake2b(repr(values).encode('utf-8'), digest_size=4).digest(), 'little')
+
+
+def _stub_value(variable: str, day: datetime.date, seed: int) -> object:
+    """
+    Returns a plausible value of an Open-Meteo variable
+    """
+    noise = _seed(variable, day.toordinal(), seed) % 1000 / 1000
+    if variable in ('sunrise', 'sunset'):
+        hour = 6 if variable == 'sunrise' else 19
+        return f"{day.isoformat()}T{hour:02d}:{int(noise * 59):02d}"
+    if variable == 'weathercode':
+        return (0, 1, 2, 3, 45, 61, 63, 71, 80, 95)[int(noise * 10)]
+    if variable.startswith('temperature'):
+        return round(5 + 20 * noise, 1)
+    if variable.startswith('winddirection'):
+        return round(360 * noise)
+    if variable.startswith('windspeed'):
+        return round(60 * noise, 1)
+    return round(10 * noise * noise, 1)
+
+
+class StubProvider(Provider):
+    """
+    This class answers every request locally with made up but consistent data, for testing and working offline.
+    The same place and day always get the same values. Each document is tagged with a hash of its content, so
+    revalidating an unchanged document answers without a body.
+    """
+    name = 'stub'
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """
+        :param latency: The seconds added to every request
+        """
+        self.latency = latency
+
+    def _wait(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    @staticmethod
+    def _respond(body: bytes, cached: Response | None) -> Response:
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if cached is not None and cached.etag == etag:
+            return Response(None, etag)
+        return Response(body, etag)
+
+    @staticmethod
+    def _daily(params: dict, start: datetime.date, end: datetime.date) -> bytes:
+        seed = _seed(str(params['latitude']), str(params['longitude']))
+        days = [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+        variables = params.get('daily', [])
+        if isinstance(variables, str):
+            variables = variables.split(',')
+
+        daily = {'time': [day.isoformat() for day in days]}
+        for variable in variables:
+            daily[variable] = [_stub_value(variable, day, seed) for day in days]
+        return json.dumps({'daily': daily}).encode('utf-8')
+
+    def forecast(self, params: dict, cached: Response | None = None) -> Response:
+        self._wait()
+        today = datetime.date.today()
+        return self._respond(self._daily(params, today, today + datetime.timedelta(days=6)), cached)
+
+    def current(self, params: dict, cached: Response | None = None) -> Response:
+        self._wait()
+        seed = _seed(str(params['latitude']), str(params['longitude']))
+        now = datetime.datetime.now().replace(second=0, microsecond=0)
+        return self._respond(json.dumps({'current_weather': {
+            'time': now.isoformat(timespec='minutes'),
+            'weathercode': _stub_value('weathercode', now.date(), seed),
+            'temperature': _stub_value('temperature_2m', now.date(), seed),
+            'windspeed': _stub_value('windspeed_10m', now.date(), seed),
+            'winddirection': _stub_value('winddirection_10m', now.date(), seed)}}).encode('utf-8'), cached)
+
+    def archive(self, params: dict, cached: Response | None = None) -> Response:
+        self._wait()
+        return self._respond(self._daily(params, datetime.date.fromisoformat(params['start_date']),
+                                         datetime.date.fromisoformat(params['end_date'])), cached)
+
+    def geocode(self, params: dict, cached: Response | None = None) -> Response:
+        self._wait()
+        name = str(params['name']).title()
+        seed = _seed(name)
+        return self._respond(json.dumps({'results': [
+            {'name': name, 'latitude': round(-60 + (seed + i) % 12000 / 100, 4),
+             'longitude': round(-180 + (seed * 7 + i) % 36000 / 100, 4), 'admin1': 'Stub', 'country_code': 'XX',
+             'country': 'Stubland', 'timezone': 'UTC', 'population': (seed >> i) % 100000}
+            for i in range(min(int(params.get('count', 10)), 3))]}).encode('utf-8'), cached)
+
+
+class ProviderStats:
+    """
+    This class tracks the health of a provider: its smoothed latency, its error count and, after repeated
+    failures, the time until which it is not used
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.failures = 0
+        self.latency: float | None = None
+        self.down_until = 0.0
+
+    def healthy(self, now: float) -> bool:
+        return self.down_until <= now
+
+
+class Router:
+    """
+    This class sends each request to the fastest healthy provider, failing over to the next one when it fails.
+    A provider that fails several times in a row is left out for a cool-down period, unless no other provider
+    is left to try. Providers not yet used are tried first, so every provider gets a measured latency.
+    """
+
+    def __init__(self, providers: list[Provider], max_failures: int = 3, cooldown: float = 60.0,
+                 smoothing: float = 0.3) -> None:
+        """
+        :param providers: The providers, in order of preference when their latencies are equal
+        :param max_failures: The consecutive failures after which a provider is left out
+        :param cooldown: The seconds a failing provider is left out for
+        :param smoothing: The weight of the latest request in the smoothed latency
+        """
+        if not providers:
+            raise ValueError("At least one provider is needed")
+
+        self.providers = list(providers)
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self._stats = dict((provider.name, ProviderStats()) for provider in self.providers)
+        self._lock = threading.Lock()
+
+    def ranked(self) -> list[Provider]:
+        """
+        Returns the providers in the order they will be tried
+        """
+        now = time.monotonic()
+        with self._lock:
+            def rank(item: tuple[int, Provider]) -> tuple:
+                index, provider = item
+                stats = self._stats[provider.name]
+                if not stats.healthy(now):
+                    return 2, stats.down_until, index
+                if stats.latency is None:
+                    return 0, 0.0, index
+                return 1, stats.latency, index
+
+            return [provider for _, provider in sorted(enumerate(self.providers), key=rank)]
+
+    def _record(self, provider: Provider, latency: float | None) -> None:
+        with self._lock:
+            stats = self._stats[provider.name]
+            stats.requests += 1
+
+            if latency is not None:
+                stats.failures = 0
+                stats.down_until = 0.0
+                stats.latency = latency if stats.latency is None else \
+                    self.smoothing * latency + (1 - self.smoothing) * stats.latency
+                return
+
+            stats.errors += 1
+            stats.failures += 1
+            if stats.failures >= self.max_failures:
+                stats.down_until = time.monotonic() + self.cooldown
+                logger.warning(f"Weather provider {provider.name} left out for {self.cooldown:.0f} seconds after "
+                               f"{stats.failures} failures")
+
+    def call(self, method: str, params: dict, cached: Response | None = None) -> Response:
+        """
+        Calls the provider method, one of forecast, current, archive or geocode, on the providers in turn until
+        one succeeds
+
+        :param method: The provider method
+        :param params: The request parameters
+        :param cached: The cached response to revalidate, if any
+        :return: The response returned
+        """
+        error: Exception | None = None
+
+        for provider in self.ranked():
+            start = time.perf_counter()
+            try:
+                response = getattr(provider, method)(params, cached)
+            except errors.RateLimitExceededError as e:
+                # The provider is fine, its quota is used up, so try the next one without holding it against it
+                error = e
+                continue
+            except errors.ProviderError as e:
+                # A request the provider rejected as invalid would be rejected by the others as well
+                if e.status_code is not None and 400 <= e.status_code < 500 and e.status_code != 429:
+                    raise
+                self._record(provider, None)
+                logger.warning(f"Weather provider {provider.name} failed, trying the next one: {e}")
+                error = e
+                continue
+
+            # Providers that wait on a call quota report the network time, which excludes the wait
+            self._record(provider, time.perf_counter() - start if response.elapsed is None else response.elapsed)
+            return response
+
+        raise error
+
+    def stats(self) -> dict[str, ProviderStats]:
+        """
+        Returns the health statistics of the providers
+        """
+        with self._lock:
+            return dict(self._stats)
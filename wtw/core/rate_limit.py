@@ -0,0 +1,137 @@
+# *******************************************************************************************
+#  File:  rate_limit.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['Mode', 'Window', 'RateLimiter', 'OPEN_METEO_WINDOWS']
+
+import enum
+import sqlite3
+import time
+from pathlib import Path
+import related
+from loguru import logger
+from . import errors
+from . import utils
+
+
+@enum.unique
+class Mode(enum.Enum):
+    """
+    This enum represents what happens when the quota is exhausted
+    """
+    Queue = 1
+    FailFast = 2
+
+
+@related.immutable
+class Window:
+    """
+    This class represents a quota of calls allowed within a number of seconds
+    """
+    name = related.StringField(required=True)
+    limit = related.IntegerField(required=True)
+    seconds = related.IntegerField(required=True)
+
+    @property
+    def rate(self) -> float:
+        """
+        The number of tokens added to the bucket per second
+        """
+        return self.limit / self.seconds
+
+
+# The limits of the free Open-Meteo tier
+OPEN_METEO_WINDOWS = (Window('minute', 600, 60), Window('hour', 5000, 3600), Window('day', 10000, 86400))
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+class RateLimiter:
+    """
+    This class implements a token bucket per quota window. The buckets are stored in a small SQLite file so that
+    all the processes sharing the application folder draw from the same quota.
+    """
+
+    def __init__(self, windows: tuple[Window, ...] = OPEN_METEO_WINDOWS, mode: Mode = Mode.Queue,
+                 max_wait: float = 300.0, file: Path | None = None) -> None:
+        self.windows = windows
+        self.mode = mode
+        self.max_wait = max_wait
+        self._file = file if file is not None else utils.app_folder().joinpath("ratelimit.sqlite")
+
+    def _connect(self) -> sqlite3.Connection:
+        self._file.parent.mkdir(parents=True, exist_ok=True)
+        con = sqlite3.connect(self._file, timeout=30, isolation_level=None)
+        con.execute("""CREATE TABLE IF NOT EXISTS bucket(
+                            name TEXT NOT NULL,
+                            tokens REAL NOT NULL,
+                            updated_at REAL NOT NULL,
+                            PRIMARY KEY(name));""")
+        return con
+
+    def _try_acquire(self, con: sqlite3.Connection) -> float:
+        """
+        Takes a token from every bucket if all of them have one, returning zero, otherwise returns the number of
+        seconds until the emptiest bucket has refilled a token
+        """
+        now = time.time()
+
+        # BEGIN IMMEDIATE takes the write lock up front so concurrent processes serialise here
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            rows = dict((name, (tokens, updated_at)) for name, tokens, updated_at in
+                        con.execute("SELECT name, tokens, updated_at FROM bucket"))
+
+            levels = dict()
+            for window in self.windows:
+                tokens, updated_at = rows.get(window.name, (float(window.limit), now))
+                levels[window.name] = min(float(window.limit), tokens + max(0.0, now - updated_at) * window.rate)
+
+            wait = max((1.0 - levels[window.name]) / window.rate for window in self.windows)
+            if wait <= 0:
+                for window in self.windows:
+                    levels[window.name] -= 1.0
+
+            con.executemany("INSERT OR REPLACE INTO bucket(name, tokens, updated_at) VALUES (?, ?, ?)",
+                            [(name, tokens, now) for name, tokens in levels.items()])
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+
+        return max(0.0, wait)
+
+    def acquire(self) -> None:
+        """
+        Takes a token for one upstream call, waiting for the quota to refill in queue mode or raising a
+        RateLimitExceededError in fail-fast mode
+        """
+        deadline = time.monotonic() + self.max_wait
+        con = self._connect()
+
+        try:
+            while True:
+                wait = self._try_acquire(con)
+                if wait == 0:
+                    return
+
+                if self.mode == Mode.FailFast or time.monotonic() + wait > deadline:
+                    logger.warning(f"Open-Meteo quota exhausted, retry in {wait:.1f} seconds")
+                    raise errors.RateLimitExceededError(wait)
+
+                time.sleep(wait)
+        finally:
+            con.close()
@@ -0,0 +1,161 @@
+# *******************************************************************************************
+#  File:  response_cache.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['ResponseCache']
+
+import sqlite3
+import time
+from pathlib import Path
+from . import model
+from . import providers
+from . import utils
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+class ResponseCache:
+    """
+    This class keeps the upstream responses with the validators they came with, so that every process sharing the
+    application folder can reuse a response while it is fresh and revalidate it once it has expired. It also counts
+    the traffic to each endpoint, and holds the leases that let one process at a time refresh a response. All of
+    them are stored in a small SQLite file.
+    """
+
+    def __init__(self, file: Path | None = None) -> None:
+        self._file = file if file is not None else utils.app_folder().joinpath("responses.sqlite")
+
+    def _connect(self) -> sqlite3.Connection:
+        self._file.parent.mkdir(parents=True, exist_ok=True)
+        con = sqlite3.connect(self._file, timeout=30, isolation_level=None)
+        con.execute("""CREATE TABLE IF NOT EXISTS response(
+                            key TEXT NOT NULL,
+                            endpoint TEXT NOT NULL,
+                            etag TEXT,
+                            last_modified TEXT,
+                            expires REAL NOT NULL,
+                            body BLOB NOT NULL,
+                            PRIMARY KEY(key)) WITHOUT ROWID;""")
+        con.execute("""CREATE TABLE IF NOT EXISTS transfer(
+                            endpoint TEXT NOT NULL,
+                            requests INTEGER NOT NULL,
+                            not_modified INTEGER NOT NULL,
+                            received INTEGER NOT NULL,
+                            decoded INTEGER NOT NULL,
+                            PRIMARY KEY(endpoint)) WITHOUT ROWID;""")
+        con.execute("""CREATE TABLE IF NOT EXISTS refresh_lease(
+                            key TEXT NOT NULL,
+                            owner TEXT NOT NULL,
+                            expires REAL NOT NULL,
+                            PRIMARY KEY(key)) WITHOUT ROWID;""")
+        return con
+
+    def get(self, key: str) -> tuple[float, providers.Response] | None:
+        """
+        Returns the time the response expires, as a POSIX timestamp, and the response, or None if none is cached
+        """
+        con = self._connect()
+        try:
+            row = con.execute("SELECT expires, etag, last_modified, body FROM response WHERE (key = ?)",
+                              (key,)).fetchone()
+        finally:
+            con.close()
+
+        if row is None:
+            return None
+        return row[0], providers.Response(row[3], row[1], row[2])
+
+    def put(self, key: str, endpoint: str, response: providers.Response, ttl: float) -> None:
+        """
+        Stores a response for the given number of seconds
+        """
+        con = self._connect()
+        try:
+            con.execute("""INSERT INTO response(key, endpoint, etag, last_modified, expires, body)
+                                VALUES (?, ?, ?, ?, ?, ?)
+                                ON CONFLICT(key) DO UPDATE SET endpoint = excluded.endpoint, etag = excluded.etag,
+                                    last_modified = excluded.last_modified, expires = excluded.expires,
+                                    body = excluded.body""",
+                        (key, endpoint, response.etag, response.last_modified, time.time() + ttl, response.body))
+        finally:
+            con.close()
+
+    def touch(self, key: str, response: providers.Response, ttl: float) -> None:
+        """
+        Extends the life of a cached response found unchanged upstream, taking any new validators it came with
+        """
+        con = self._connect()
+        try:
+            con.execute("""UPDATE response SET expires = ?, etag = COALESCE(?, etag),
+                                last_modified = COALESCE(?, last_modified) WHERE (key = ?)""",
+                        (time.time() + ttl, response.etag, response.last_modified, key))
+        finally:
+            con.close()
+
+    def lock(self, key: str, owner: str, lease: float) -> bool:
+        """
+        Takes the lease to refresh a response, returning False if another owner holds it. The lease lapses after
+        the given number of seconds, so an owner that crashed does not keep the others waiting.
+        """
+        now = time.time()
+        con = self._connect()
+        try:
+            con.execute("""INSERT INTO refresh_lease(key, owner, expires) VALUES (?, ?, ?)
+                                ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires = excluded.expires
+                                    WHERE (refresh_lease.expires <= ?) OR (refresh_lease.owner = excluded.owner)""",
+                        (key, owner, now + lease, now))
+            return con.execute("SELECT changes()").fetchone()[0] == 1
+        finally:
+            con.close()
+
+    def unlock(self, key: str, owner: str) -> None:
+        """
+        Gives up the lease to refresh a response, if the owner still holds it
+        """
+        con = self._connect()
+        try:
+            con.execute("DELETE FROM refresh_lease WHERE (key = ?) AND (owner = ?)", (key, owner))
+        finally:
+            con.close()
+
+    def record(self, endpoint: str, response: providers.Response) -> None:
+        """
+        Adds a response to the traffic counted for its endpoint
+        """
+        con = self._connect()
+        try:
+            con.execute("""INSERT INTO transfer(endpoint, requests, not_modified, received, decoded)
+                                VALUES (?, 1, ?, ?, ?)
+                                ON CONFLICT(endpoint) DO UPDATE SET requests = requests + 1,
+                                    not_modified = not_modified + excluded.not_modified,
+                                    received = received + excluded.received, decoded = decoded + excluded.decoded""",
+                        (endpoint, int(response.not_modified), response.received,
+                         0 if response.body is None else len(response.body)))
+        finally:
+            con.close()
+
+    def transfers(self) -> model.Transfers:
+        """
+        Returns the traffic counted per endpoint
+        """
+        con = self._connect()
+        try:
+            rows = con.execute("""SELECT endpoint, requests, not_modified, received, decoded FROM transfer
+                                    ORDER BY endpoint""").fetchall()
+        finally:
+            con.close()
+
+        return model.Transfers(model.EndpointTransfer(*row) for row in rows)
@@ -0,0 +1,294 @@
+# *******************************************************************************************
+#  File:  schema.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['Migration', 'MIGRATIONS', 'LATEST_VERSION', 'CLIMATOLOGY_METRICS', 'current_version', 'pending_migrations',
+           'migrate']
+
+import sqlite3
+from typing import Callable
+import related
+from loguru import logger
+
+
+@related.immutable
+class Migration:
+    """
+    This class represents one step in the evolution of the database schema. The database records the version of
+    the last step applied in PRAGMA user_version. The search statements maintain the trigram search index and
+    are skipped where SQLite lacks the FTS5 trigram tokenizer (before 3.34), the search falling back on LIKE.
+    """
+    version = related.IntegerField(required=True)
+    description = related.StringField(required=True)
+    statements = related.SequenceField(str, required=True)
+    search_statements = related.SequenceField(str, required=False)
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+_SEARCH_TRIGGERS = (
+    """CREATE TRIGGER location_search_insert AFTER INSERT ON location BEGIN
+            INSERT INTO location_search(rowid, name, location, region, country)
+                VALUES (new.rowid, new.name, new.location, new.region, new.country);
+        END""",
+    """CREATE TRIGGER location_search_delete AFTER DELETE ON location BEGIN
+            INSERT INTO location_search(location_search, rowid, name, location, region, country)
+                VALUES ('delete', old.rowid, old.name, old.location, old.region, old.country);
+        END""",
+    """CREATE TRIGGER location_search_update AFTER UPDATE ON location BEGIN
+            INSERT INTO location_search(location_search, rowid, name, location, region, country)
+                VALUES ('delete', old.rowid, old.name, old.location, old.region, old.country);
+            INSERT INTO location_search(rowid, name, location, region, country)
+                VALUES (new.rowid, new.name, new.location, new.region, new.country);
+        END""")
+
+# The observation columns whose multi-year average per calendar day is kept in the climatology table. The wind
+# direction is left out, as the arithmetic mean of angles is meaningless (350° and 10° average to 180°).
+CLIMATOLOGY_METRICS = ('temp_max', 'temp_min', 'precipitation_sum', 'rain', 'showers', 'snowfall',
+                       'precipitation_hours', 'wind_speed')
+
+
+def _metric_value(row: str) -> str:
+    """
+    Builds the expression returning the value of the metric named by climatology.metric from an observation row
+    """
+    cases = ' '.join(f"WHEN '{metric}' THEN {row}.{metric}" for metric in CLIMATOLOGY_METRICS)
+    return f"(CASE metric {cases} END)"
+
+
+def _metric_rows(row: str) -> str:
+    """
+    Builds a query returning one (metric, value) row per metric from an observation row
+    """
+    return ' UNION ALL '.join(f"SELECT '{metric}' AS metric, {row}.{metric} AS value" for metric in CLIMATOLOGY_METRICS)
+
+
+# A query returning the names of the metrics, one per row
+_METRIC_NAMES = ' UNION ALL '.join(f"SELECT '{metric}' AS metric" for metric in CLIMATOLOGY_METRICS)
+
+
+# The climatology table is kept up to date by triggers, each observation stored, replaced or removed adjusting
+# the totals of its calendar day
+_CLIMATOLOGY_ADD = f"""INSERT INTO climatology(name, metric, month_day, count, total)
+            SELECT new.name, metric, substr(new.day, 6), 1, value FROM ({_metric_rows('new')}) WHERE value IS NOT NULL
+            ON CONFLICT(name, metric, month_day) DO UPDATE SET count = count + 1, total = total + excluded.total;"""
+
+_CLIMATOLOGY_REMOVE = f"""UPDATE climatology SET count = count - 1, total = total - {_metric_value('old')}
+            WHERE (name = old.name) AND (month_day = substr(old.day, 6)) AND ({_metric_value('old')} IS NOT NULL);"""
+
+_CLIMATOLOGY_TRIGGERS = (
+    f"""CREATE TRIGGER observation_climatology_insert AFTER INSERT ON observation BEGIN
+            {_CLIMATOLOGY_ADD}
+        END""",
+    f"""CREATE TRIGGER observation_climatology_delete AFTER DELETE ON observation BEGIN
+            {_CLIMATOLOGY_REMOVE}
+        END""",
+    f"""CREATE TRIGGER observation_climatology_update AFTER UPDATE ON observation BEGIN
+            {_CLIMATOLOGY_REMOVE}
+            {_CLIMATOLOGY_ADD}
+        END""")
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+MIGRATIONS = (
+    Migration(1, "Create the location table", [
+        """CREATE TABLE IF NOT EXISTS location(
+            name TEXT NOT NULL,
+            location TEXT NOT NULL,
+            latitude TEXT NOT NULL,
+            longitude TEXT NOT NULL,
+            timezone TEXT NOT NULL,
+            region TEXT,
+            country_code TEXT NOT NULL,
+            country TEXT,
+            post_codes TEXT,
+            lock_version INTEGER NOT NULL DEFAULT 1,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY(name))"""]),
+
+    Migration(2, "Add the trigram search index over the location names", [], [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS location_search USING fts5(
+            name, location, region, country, content='location', content_rowid='rowid', tokenize='trigram')""",
+        "DROP TRIGGER IF EXISTS location_search_insert",
+        "DROP TRIGGER IF EXISTS location_search_delete",
+        "DROP TRIGGER IF EXISTS location_search_update",
+        *_SEARCH_TRIGGERS,
+        "INSERT INTO location_search(location_search) VALUES ('rebuild')"]),
+
+    Migration(3, "Index the location column used to order the location list", [
+        "CREATE INDEX IF NOT EXISTS location_location ON location(location)"]),
+
+    # SQLite cannot change the type of a column, so the table is rebuilt, keeping the rowids the search index
+    # refers to. Dropping the old table drops its triggers and indexes, which are then recreated.
+    Migration(4, "Store latitude and longitude as REAL", [
+        """CREATE TABLE location_new(
+            name TEXT NOT NULL,
+            location TEXT NOT NULL,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            timezone TEXT NOT NULL,
+            region TEXT,
+            country_code TEXT NOT NULL,
+            country TEXT,
+            post_codes TEXT,
+            lock_version INTEGER NOT NULL DEFAULT 1,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY(name))""",
+        """INSERT INTO location_new(rowid, name, location, latitude, longitude, timezone, region, country_code,
+                                    country, post_codes, lock_version, created_at, updated_at)
+            SELECT rowid, name, location, CAST(latitude AS REAL), CAST(longitude AS REAL), timezone, region,
+                   country_code, country, post_codes, lock_version, created_at, updated_at FROM location""",
+        "DROP TABLE location",
+        "ALTER TABLE location_new RENAME TO location",
+        "CREATE INDEX location_location ON location(location)"], [
+        *_SEARCH_TRIGGERS,
+        "INSERT INTO location_search(location_search) VALUES ('rebuild')"]),
+
+    Migration(5, "Extend the location index with the name for keyset pagination", [
+        "DROP INDEX IF EXISTS location_location",
+        "CREATE INDEX location_location ON location(location, name)"]),
+
+    Migration(6, "Create the historical observation store and its backfill checkpoints", [
+        """CREATE TABLE IF NOT EXISTS observation(
+            name TEXT NOT NULL,
+            day TEXT NOT NULL,
+            weather_code INTEGER,
+            temp_max REAL,
+            temp_min REAL,
+            sunrise INTEGER,
+            sunset INTEGER,
+            precipitation_sum REAL,
+            rain REAL,
+            showers REAL,
+            snowfall REAL,
+            precipitation_hours REAL,
+            wind_speed REAL,
+            wind_direction REAL,
+            PRIMARY KEY(name, day)) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS backfill_chunk(
+            name TEXT NOT NULL,
+            start_day TEXT NOT NULL,
+            end_day TEXT NOT NULL,
+            completed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY(name, start_day, end_day)) WITHOUT ROWID"""]),
+
+    Migration(7, "Add the climatology totals maintained from the observations", [
+        """CREATE TABLE IF NOT EXISTS climatology(
+            name TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            month_day TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            total REAL NOT NULL,
+            PRIMARY KEY(name, metric, month_day)) WITHOUT ROWID""",
+        "DELETE FROM climatology",
+        f"""INSERT INTO climatology(name, metric, month_day, count, total)
+            SELECT name, metric, month_day, COUNT(value), SUM(value) FROM (
+                SELECT observation.name, metric, substr(observation.day, 6) AS month_day,
+                       {_metric_value('observation')} AS value
+                    FROM observation, ({_METRIC_NAMES}))
+                WHERE value IS NOT NULL GROUP BY name, metric, month_day""",
+        *_CLIMATOLOGY_TRIGGERS]),
+
+    Migration(8, "Stop averaging the wind direction in the climatology", [
+        "DROP TRIGGER IF EXISTS observation_climatology_insert",
+        "DROP TRIGGER IF EXISTS observation_climatology_delete",
+        "DROP TRIGGER IF EXISTS observation_climatology_update",
+        *_CLIMATOLOGY_TRIGGERS,
+        "DELETE FROM climatology WHERE (metric = 'wind_direction')"]),
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(db_con: sqlite3.Connection) -> int:
+    """
+    Returns the schema version of the database
+    """
+    return db_con.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _trigram_available(db_con: sqlite3.Connection) -> bool:
+    """
+    Returns True if the SQLite library has FTS5 with the trigram tokenizer
+    """
+    try:
+        db_con.execute("CREATE VIRTUAL TABLE temp.trigram_probe USING fts5(value, tokenize='trigram')")
+        db_con.execute("DROP TABLE temp.trigram_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def pending_migrations(db_con: sqlite3.Connection) -> list[Migration]:
+    """
+    Returns the migrations not yet applied to the database, in the order they will be applied
+    """
+    version = current_version(db_con)
+    return [migration for migration in MIGRATIONS if migration.version > version]
+
+
+def migrate(db_con: sqlite3.Connection, progress: Callable[[Migration], None] | None = None) -> list[Migration]:
+    """
+    Applies the pending migrations, each in its own transaction together with the new schema version. The write
+    lock is taken before the version is checked, so concurrent processes apply each migration once.
+
+    :param db_con: The database connection
+    :param progress: Called with each migration before it is applied
+    :return: The migrations applied
+    """
+    applied = list()
+
+    if db_con.in_transaction:
+        db_con.commit()
+
+    isolation_level = db_con.isolation_level
+    db_con.isolation_level = None
+
+    try:
+        trigram = _trigram_available(db_con)
+        if not trigram:
+            logger.warning(f"SQLite {sqlite3.sqlite_version} lacks the FTS5 trigram tokenizer, "
+                           "the location search falls back on LIKE")
+
+        for migration in MIGRATIONS:
+            db_con.execute("BEGIN IMMEDIATE")
+            try:
+                if migration.version <= current_version(db_con):
+                    db_con.execute("COMMIT")
+                    continue
+
+                if progress is not None:
+                    progress(migration)
+
+                for statement in migration.statements:
+                    db_con.execute(statement)
+                if trigram:
+                    for statement in migration.search_statements or ():
+                        db_con.execute(statement)
+                db_con.execute(f"PRAGMA user_version = {migration.version:d}")
+                db_con.execute("COMMIT")
+            except Exception as e:
+                db_con.execute("ROLLBACK")
+                logger.error(f"Failed to apply migration {migration.version} ({migration.description}): {e}")
+                raise
+
+            logger.info(f"Applied database migration {migration.version}: {migration.description}")
+            applied.append(migration)
+    finally:
+        db_con.isolation_level = isolation_level
+
+    return applied
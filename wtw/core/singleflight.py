@@ -0,0 +1,133 @@
+# *******************************************************************************************
+#  File:  singleflight.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['FlightStats', 'SingleFlight']
+
+import threading
+from typing import Callable, Hashable, TypeVar
+import related
+
+T = TypeVar('T')
+
+
+@related.mutable
+class FlightStats:
+    """
+    This class records how often a key was requested and how many of those requests were actually executed
+    """
+    calls = related.IntegerField(default=0)
+    executed = related.IntegerField(default=0)
+
+    @property
+    def saved(self) -> int:
+        """
+        The number of requests that were served by sharing an in-flight result
+        """
+        return self.calls - self.executed
+
+
+class _Call:
+    """
+    This class holds the outcome of an in-flight call so that waiting callers can share it
+    """
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    This class coalesces concurrent calls with the same key, so that only one of them does the work and the
+    others receive its result. Statistics are kept for the most recently used keys only, so that a long-running
+    process calling with ever new keys does not grow without bound.
+    """
+
+    def __init__(self, max_keys: int = 1024) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = dict()
+        self._stats: dict[Hashable, FlightStats] = dict()
+        self._max_keys = max_keys
+
+    def _key_stats(self, key: Hashable) -> FlightStats:
+        """
+        Returns the statistics of a key, moving it to the most recently used end and evicting the least recently
+        used keys not in flight beyond the limit. Must be called with the lock held.
+        """
+        stats = self._stats.pop(key, None) or FlightStats()
+        self._stats[key] = stats
+
+        while len(self._stats) > self._max_keys:
+            old_key = next((old_key for old_key in self._stats if old_key not in self._calls and old_key != key), None)
+            if old_key is None:
+                break
+            del self._stats[old_key]
+
+        return stats
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """
+        Executes the function unless a call with the same key is already in flight, in which case it waits for
+        that call and returns its result (or raises its exception)
+
+        :param key: The key identifying the call
+        :param func: The function that does the work
+        :return: The result of the function
+        """
+        with self._lock:
+            stats = self._key_stats(key)
+            stats.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                stats.executed += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def stats(self) -> dict[Hashable, FlightStats]:
+        """
+        Returns a snapshot of the per-key statistics
+        """
+        with self._lock:
+            return {key: FlightStats(value.calls, value.executed) for key, value in self._stats.items()}
+
+    def reset(self) -> None:
+        """
+        Clears the statistics
+        """
+        with self._lock:
+            self._stats.clear()
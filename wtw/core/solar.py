@@ -0,0 +1,184 @@
+# *******************************************************************************************
+#  File:  solar.py
+#
+#  Created: 19-10-2026
+#
+#  History:
+#  19-10-2026: Initial version
+#
+# *******************************************************************************************
+
+__author__ = "James Dooley"
+__contact__ = "james@developernotes.org"
+__copyright__ = "Copyright (c) 2022 James Dooley <james@dooley.ch>"
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "James Dooley"
+__status__ = "Production"
+
+__all__ = ['SunTimes', 'sun_times', 'add_sun_times', 'sun_forecasts']
+
+import datetime
+import math
+import zoneinfo
+from array import array
+from typing import Iterable, Sequence
+import attr
+from loguru import logger
+from . import model
+
+# The sun is taken to have risen when its upper limb clears the horizon, allowing for atmospheric refraction
+_ZENITH = math.radians(90.833)
+
+# The times are stored as seconds since the epoch of the naive local time, as the pipeline stores them
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+
+
+class SunTimes:
+    """
+    This class holds the sun times of one location, one packed array per value. Sunrise and sunset are -1 on the
+    days the sun does not rise or does not set, the day length telling which.
+    """
+
+    def __init__(self, location: str, days: array, sunrise: array, sunset: array, day_length: array) -> None:
+        self.location = location
+        self.days = days
+        self.sunrise = sunrise
+        self.sunset = sunset
+        self.day_length = day_length
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def times(self, index: int) -> tuple[datetime.datetime | None, datetime.datetime | None]:
+        """
+        Returns the local sunrise and sunset of a day, None where the sun does not rise or set
+        """
+        def local(value: int) -> datetime.datetime | None:
+            return None if value < 0 else _EPOCH + datetime.timedelta(seconds=value)
+
+        return local(self.sunrise[index]), local(self.sunset[index])
+
+
+def _solar_terms(days: Sequence[int]) -> tuple[array, array, array]:
+    """
+    Returns the sine and cosine of the solar declination and the equation of time in minutes for each day, at
+    noon, using the NOAA approximations. They depend on the day alone, so they are shared by every location.
+    """
+    sin_declination, cos_declination, equation = array('d'), array('d'), array('d')
+
+    for ordinal in days:
+        date = datetime.date.fromordinal(ordinal)
+        year_days = 366 if date.year % 4 == 0 and (date.year % 100 != 0 or date.year % 400 == 0) else 365
+        gamma = 2 * math.pi / year_days * (date.timetuple().tm_yday - 1)
+
+        declination = 0.006918 - 0.399912 * math.cos(gamma) + 0.070257 * math.sin(gamma) \
+            - 0.006758 * math.cos(2 * gamma) + 0.000907 * math.sin(2 * gamma) \
+            - 0.002697 * math.cos(3 * gamma) + 0.00148 * math.sin(3 * gamma)
+        sin_declination.append(math.sin(declination))
+        cos_declination.append(math.cos(declination))
+        equation.append(229.18 * (0.000075 + 0.001868 * math.cos(gamma) - 0.032077 * math.sin(gamma)
+                                  - 0.014615 * math.cos(2 * gamma) - 0.040849 * math.sin(2 * gamma)))
+
+    return sin_declination, cos_declination, equation
+
+
+def _offsets(record: model.Location, days: Sequence[int], cache: dict[tuple[str, int], float]) -> list[float]:
+    """
+    Returns the UTC offset in minutes of the location at noon on each day. Locations with an unknown time zone
+    fall back to the solar time of their longitude.
+    """
+    try:
+        zone = zoneinfo.ZoneInfo(record.timezone)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown time zone {record.timezone!r} for {record.location}, using solar time")
+        return [round(record.longitude / 15) * 60.0] * len(days)
+
+    offsets = list()
+    for ordinal in days:
+        offset = cache.get((record.timezone, ordinal))
+        if offset is None:
+            noon = datetime.datetime.fromordinal(ordinal).replace(hour=12, tzinfo=zone)
+            offset = cache[(record.timezone, ordinal)] = noon.utcoffset().total_seconds() / 60
+        offsets.append(offset)
+    return offsets
+
+
+def sun_times(locations: Iterable[model.Location], days: Sequence[int]) -> list[SunTimes]:
+    """
+    Calculates the sunrise, sunset and day length of many locations over the same days. The terms that depend on
+    the day alone are calculated once for all the locations, and the time zone offsets once per time zone. The
+    times are within a few minutes of the published ones outside the polar regions.
+
+    :param locations: The locations
+    :param days: The days, as date ordinals
+    :return: The sun times, one per location, in the order given
+    """
+    days = array('l', days)
+    sin_declination, cos_declination, equation = _solar_terms(days)
+    midnights = [(ordinal - _EPOCH_ORDINAL) * 86400 for ordinal in days]
+    cos_zenith = math.cos(_ZENITH)
+    offset_cache: dict[tuple[str, int], float] = dict()
+    results = list()
+
+    for record in locations:
+        latitude = math.radians(record.latitude)
+        sin_latitude, cos_latitude = math.sin(latitude), math.cos(latitude)
+        offsets = _offsets(record, days, offset_cache)
+        sunrise, sunset, day_length = array('q'), array('q'), array('d')
+
+        for i in range(len(days)):
+            # The cosine of the hour angle at sunrise, beyond [-1, 1] the sun stays up or down all day
+            cos_hour_angle = (cos_zenith - sin_latitude * sin_declination[i]) / \
+                             max(cos_latitude * cos_declination[i], 1e-12)
+
+            if abs(cos_hour_angle) >= 1:
+                sunrise.append(-1)
+                sunset.append(-1)
+                day_length.append(0.0 if cos_hour_angle > 0 else 86400.0)
+                continue
+
+            # Minutes from sunrise to solar noon, and solar noon in minutes after local midnight
+            half_day = 4 * math.degrees(math.acos(cos_hour_angle))
+            noon = 720 - 4 * record.longitude - equation[i] + offsets[i]
+            sunrise.append(midnights[i] + round((noon - half_day) * 60))
+            sunset.append(midnights[i] + round((noon + half_day) * 60))
+            day_length.append(half_day * 120)
+
+        results.append(SunTimes(record.location, days, sunrise, sunset, day_length))
+
+    return results
+
+
+def add_sun_times(record: model.Location, forecasts: model.Forecasts) -> model.Forecasts:
+    """
+    Returns the forecasts with the sunrise, sunset and day length calculated locally where they were not
+    downloaded
+    """
+    times = sun_times([record], [forecast.day.toordinal() for forecast in forecasts])[0]
+
+    result = model.Forecasts()
+    for index, forecast in enumerate(forecasts):
+        if forecast.sunrise is None and forecast.sunset is None:
+            sunrise, sunset = times.times(index)
+            forecast = attr.evolve(forecast, sunrise=sunrise, sunset=sunset, day_length=times.day_length[index])
+        result.append(forecast)
+
+    return result
+
+
+def sun_forecasts(record: model.Location, start: datetime.date, count: int = 7) -> model.Forecasts:
+    """
+    Returns forecasts holding only the sun times, for when the weather forecast cannot be obtained
+    """
+    days = [start.toordinal() + i for i in range(count)]
+    times = sun_times([record], days)[0]
+
+    forecasts = model.Forecasts()
+    for index, ordinal in enumerate(days):
+        sunrise, sunset = times.times(index)
+        forecasts.append(model.Forecast(location=record.location, day=datetime.date.fromordinal(ordinal),
+                                        sunrise=sunrise, sunset=sunset, day_length=times.day_length[index]))
+
+    return forecasts
@@ -16,7 +16,7 @@ __version__ = "1.0.0"
 __maintainer__ = "James Dooley"
 __status__ = "Production"
 
-__all__ = ['console', 'message', 'success_message', 'error_message', 'system_message', 'warning_message',
+__all__ = ['console', 'error_console', 'message', 'success_message', 'error_message', 'system_message', 'warning_message',
            'start_feature', 'end_feature']
 
 from rich.console import Console
@@ -43,6 +43,9 @@ theme = Theme({
 })
 console = Console(theme=theme)
 
+# For commands whose output goes to stdout, so that their diagnostics do not end up mixed in with it
+error_console = Console(theme=theme, stderr=True)
+
 
 def start_feature(message: str, style: str = "line-normal-style") -> None:
     """
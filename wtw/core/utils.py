@@ -16,30 +16,94 @@ __version__ = "1.0.0"
 __maintainer__ = "James Dooley"
 __status__ = "Production"
 
-__all__ = ['app_folder', 'config_logging']
+__all__ = ['app_folder', 'config_logging', 'log_command']
 
+import functools
+import os
 import pathlib
+import sys
+import time
 import click
 import loguru
 
 
 def app_folder() -> pathlib.Path:
     """
-    Returns the location of the folder where the application's data is stored
+    Returns the location of the folder where the application's data is stored, which the WTW_APP_DIR environment
+    variable overrides
     """
+    folder = os.environ.get('WTW_APP_DIR')
+    if folder:
+        return pathlib.Path(folder)
     return pathlib.Path(click.get_app_dir('wtw'))
 
 
-def config_logging():
+def config_logging(level: str | None = None, json: bool | None = None, sinks: list[str] | None = None,
+                   enqueue: bool = True):
     """
-    Configures logging for the application
+    Configures logging for the application. The settings not passed in are taken from the WTW_LOG_LEVEL,
+    WTW_LOG_JSON and WTW_LOG_SINKS environment variables.
+
+    :param level: The minimum level logged, INFO by default
+    :param json: Flag to indicate if the records should be written as JSON, one per line
+    :param sinks: Where to log, each entry being "file" (the rotated application log), "stderr" or a file path
+    :param enqueue: Flag to indicate if the records should be written, rotated and compressed by a background thread
     """
     file_format: str = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {function: ^15} | {file: ^15} | {line: >3} | {" \
                        "message}"
 
-    log_file = app_folder().joinpath("app.log")
+    if level is None:
+        level = os.environ.get('WTW_LOG_LEVEL', 'INFO')
+    level = level.upper()
+
+    if json is None:
+        json = os.environ.get('WTW_LOG_JSON', '').lower() in ('1', 'true', 'yes')
+
+    if sinks is None:
+        sinks = [sink.strip() for sink in os.environ.get('WTW_LOG_SINKS', 'file').split(',') if sink.strip()]
+
+    # Capturing the local variables of every frame is expensive, so only do it when debugging
+    diagnose = level in ('TRACE', 'DEBUG')
 
     loguru.logger.remove()
 
-    loguru.logger.add(log_file, rotation='1 day', retention='5 days', compression='zip', level='INFO',
-                      backtrace=True, diagnose=True, format=file_format)
+    for sink in sinks:
+        options = dict(level=level, enqueue=enqueue, backtrace=diagnose, diagnose=diagnose, serialize=json,
+                       format=file_format)
+        if sink == 'file':
+            loguru.logger.add(app_folder().joinpath("app.log"), rotation='1 day', retention='5 days',
+                              compression='zip', **options)
+        elif sink == 'stderr':
+            loguru.logger.add(sys.stderr, **options)
+        else:
+            loguru.logger.add(pathlib.Path(sink), **options)
+
+
+def log_command(name: str):
+    """
+    Decorator that logs a structured record with the command, location, latency and status of each command run
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            status = 'success'
+
+            try:
+                return func(*args, **kwargs)
+            except click.exceptions.Exit as e:
+                status = 'success' if e.exit_code == 0 else 'fail'
+                raise
+            except BaseException:
+                status = 'error'
+                raise
+            finally:
+                latency = round((time.perf_counter() - start) * 1000, 3)
+                location = kwargs.get('location')
+                loguru.logger.bind(command=name, location=location, latency=latency, status=status).info(
+                    f"Command {name} finished: location={location}, latency={latency}ms, status={status}")
+
+        return wrapper
+
+    return decorator
@@ -16,17 +16,312 @@ __version__ = "1.0.0"
 __maintainer__ = "James Dooley"
 __status__ = "Production"
 
-__all__ = ['get_locations', 'get_forecast', 'get_current_weather']
+__all__ = ['get_locations', 'get_forecast', 'get_current_weather', 'flight_stats', 'configure_rate_limit',
+           'download_forecast', 'download_archive', 'get_summary', 'configure_providers', 'provider_stats',
+           'transfer_stats']
 
+import datetime
+import json
+import os
+import threading
+import time
+from typing import Callable, Iterable
 import requests
 from rich.console import Console
 from loguru import logger
+from . import errors
 from . import model
+from . import providers
+from . import response_cache
+from . import singleflight
+from . import rate_limit
+
+# Open-Meteo refreshes its models at most every 15 minutes, so there is no point asking again sooner
+CACHE_TTL: int = 900
+
+# While another process refreshes an expired response, the others serve it for up to STALE_TTL seconds past its
+# expiry, or else wait up to REFRESH_WAIT seconds for the new one before asking for it themselves. The lease on a
+# refresh lapses after REFRESH_LEASE seconds, so a process that crashed while refreshing holds nobody up for long.
+STALE_TTL: int = 3600
+REFRESH_WAIT: float = 10.0
+REFRESH_LEASE: float = 60.0
+
+# Maps the fields of model.Forecast to the Open-Meteo daily variables they are read from
+FORECAST_VARIABLES: dict[str, str] = {
+    'weather_code': 'weathercode',
+    'temp_max': 'temperature_2m_max',
+    'temp_min': 'temperature_2m_min',
+    'sunrise': 'sunrise',
+    'sunset': 'sunset',
+    'precipitation_sum': 'precipitation_sum',
+    'rain': 'rain_sum',
+    'showers': 'showers_sum',
+    'snowfall': 'snowfall_sum',
+    'precipitation_hours': 'precipitation_hours',
+    'wind_speed': 'windspeed_10m_max',
+    'wind_direction': 'winddirection_10m_dominant'
+}
+
+# The fields the historical archive serves, which has no showers
+ARCHIVE_VARIABLES: dict[str, str] = dict((field, upstream) for field, upstream in FORECAST_VARIABLES.items()
+                                         if field != 'showers')
+
 
 _console = Console()
+_session = requests.Session()
+_cache: dict[tuple, tuple[float, object, tuple]] = dict()
+_flights = singleflight.SingleFlight()
+_limiter: rate_limit.RateLimiter | None = None
+_router: providers.Router | None = None
+_store: response_cache.ResponseCache | None = None
+
+
+def configure_rate_limit(mode: rate_limit.Mode = rate_limit.Mode.Queue, max_wait: float = 300.0) -> None:
+    """
+    Configures how upstream calls behave once the Open-Meteo quota is exhausted
+
+    :param mode: Queue to wait for the quota to refill, FailFast to raise a RateLimitExceededError
+    :param max_wait: The longest time in seconds a call will wait in queue mode
+    """
+    global _limiter
+    _limiter = rate_limit.RateLimiter(mode=mode, max_wait=max_wait)
+
+
+def _get_limiter() -> rate_limit.RateLimiter:
+    """
+    Returns the rate limiter, creating it with the default settings on first use
+    """
+    if _limiter is None:
+        configure_rate_limit()
+    return _limiter
+
+
+def _provider(spec: str) -> providers.Provider:
+    """
+    Creates a provider from its description: open-meteo for the public service, which is subject to the call
+    quota, stub for the local stub, or the base url of a self-hosted Open-Meteo instance
+    """
+    spec = spec.strip()
+    if spec == 'open-meteo':
+        return providers.OpenMeteoProvider(session=_session, acquire=lambda: _get_limiter().acquire())
+    if spec == 'stub':
+        return providers.StubProvider()
+    if spec.startswith(('http://', 'https://')):
+        return providers.OpenMeteoProvider(spec, session=_session)
+    raise ValueError(f"Unknown weather provider: {spec}")
+
+
+def configure_providers(provider_list: list[providers.Provider] | None = None) -> None:
+    """
+    Configures the weather providers requests are routed between. When none are given they are read from the
+    WTW_PROVIDERS environment variable, a comma separated list of open-meteo, stub or self-hosted instance urls,
+    falling back to the instance at WTW_OPEN_METEO_URL or else the public Open-Meteo service.
+
+    :param provider_list: The providers, in order of preference
+    """
+    global _router
+
+    if provider_list is None:
+        specs = os.environ.get('WTW_PROVIDERS') or os.environ.get('WTW_OPEN_METEO_URL') or 'open-meteo'
+        provider_list = [_provider(spec) for spec in specs.split(',') if spec.strip()]
+
+    _router = providers.Router(provider_list)
+
+
+def _get_router() -> providers.Router:
+    """
+    Returns the provider router, creating it from the environment on first use
+    """
+    if _router is None:
+        configure_providers()
+    return _router
+
+
+def provider_stats() -> dict[str, providers.ProviderStats]:
+    """
+    Returns the latency and error statistics of the weather providers
+    """
+    return _get_router().stats()
+
+
+def _get_store() -> response_cache.ResponseCache:
+    """
+    Returns the shared response cache, creating it on first use
+    """
+    global _store
+
+    if _store is None:
+        _store = response_cache.ResponseCache()
+    return _store
+
+
+def transfer_stats() -> model.Transfers:
+    """
+    Returns the requests made and the bytes received per upstream endpoint
+    """
+    return _get_store().transfers()
+
+
+def _normalise(value: object) -> object:
+    """
+    Normalises a request parameter so that equivalent requests produce the same key
+    """
+    if isinstance(value, float):
+        return round(value, 4)
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return value
+
+
+def _cache_key(endpoint: str, params: dict, location: str | None = None) -> tuple:
+    """
+    Builds a hashable cache key from the endpoint, the request parameters and the location the result is labelled
+    with. The provider is not part of the key, as every provider answers the same request with the same data.
+    """
+    return endpoint, location, tuple(sorted((key, _normalise(value)) for key, value in params.items()))
+
+
+def flight_stats() -> dict[tuple, singleflight.FlightStats]:
+    """
+    Returns the per-request statistics of the in-flight request coalescing
+    """
+    return _flights.stats()
+
+
+def _cache_get(key: tuple) -> object | None:
+    """
+    Returns the cached value for the given key, provided it has not expired
+    """
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+
+    expires, value, _ = entry
+    if expires < time.monotonic():
+        return None
+
+    return value
+
+
+def _cache_revalidated(key: tuple, response: providers.Response) -> object | None:
+    """
+    Returns the cached value for the given key, expired or not, provided it was parsed from the body the given
+    response validates, so a response found unchanged upstream does not need parsing again. Expired values are
+    kept for this reason.
+    """
+    entry = _cache.get(key)
+    validators = (response.etag, response.last_modified)
+    if entry is None or entry[2] != validators or validators == (None, None):
+        return None
+
+    return entry[1]
+
+
+def _cache_put(key: tuple, value: object, ttl: float = CACHE_TTL,
+               response: providers.Response | None = None) -> None:
+    """
+    Stores a value in the cache for the given number of seconds, with the validators of the response it was
+    parsed from
+    """
+    validators = (None, None) if response is None else (response.etag, response.last_modified)
+    _cache[key] = (time.monotonic() + ttl, value, validators)
+
+
+def _download(method: str, params: dict, message: str, show_status: bool,
+              cached: providers.Response | None = None) -> providers.Response:
+    """
+    Performs the request through the provider router, optionally displaying a status spinner, and counts the
+    traffic it caused
+
+    :param method: The provider method, one of forecast, current, archive or geocode
+    :param cached: The cached response to revalidate, if any
+    """
+    if not show_status:
+        response = _get_router().call(method, params, cached)
+    else:
+        with _console.status(message):
+            response = _get_router().call(method, params, cached)
+
+    _get_store().record(method, response)
+    return response
+
+
+def _fetch(method: str, params: dict, key: tuple, message: str, show_status: bool,
+           parse: Callable[[bytes], object]) -> object | None:
+    """
+    Returns the parsed document for a request. A cached response is used as is while it is fresh, and revalidated
+    with the provider once it has expired; when it is found unchanged only its lifetime is extended, and the value
+    already parsed from it is reused if this process has one. The parsed value is stored in the in-memory cache.
+
+    Only one process at a time refreshes a response. The others serve the expired response while it is less than
+    STALE_TTL seconds past its expiry, otherwise they wait for the refresh, up to REFRESH_WAIT seconds.
+    """
+    store = _get_store()
+    store_key = repr(key)
+    owner = f"{os.getpid()}:{threading.get_ident()}"
+    deadline = time.monotonic() + REFRESH_WAIT
+    locked = False
+
+    while True:
+        entry = store.get(store_key)
+        now = time.time()
+
+        if entry is not None and entry[0] > now:
+            value = parse(entry[1].body)
+            if value is not None:
+                _cache_put(key, value, entry[0] - now, entry[1])
+            return value
+
+        if store.lock(store_key, owner, REFRESH_LEASE):
+            # Another process may have finished refreshing between reading the response and taking the lease
+            entry = store.get(store_key)
+            if entry is None or entry[0] <= time.time():
+                locked = True
+                break
+            store.unlock(store_key, owner)
+            continue
+
+        if entry is not None and now - entry[0] <= STALE_TTL:
+            logger.debug(f"Serving a stale {method} response while another process refreshes it")
+            value = _cache_revalidated(key, entry[1])
+            return parse(entry[1].body) if value is None else value
+
+        if time.monotonic() >= deadline:
+            logger.warning(f"Gave up waiting for another process to refresh a {method} response")
+            break
 
+        time.sleep(0.1)
 
-def _get_summary(code: int) -> str:
+    try:
+        cached = None if entry is None else entry[1]
+        response = _download(method, params, message, show_status, cached)
+
+        if response.not_modified:
+            # The value parsed earlier is only reused if it came from the body just revalidated, as another process
+            # may have stored a newer response since
+            store.touch(store_key, response, CACHE_TTL)
+            value = _cache_revalidated(key, cached)
+            if value is None:
+                value = parse(cached.body)
+            source = providers.Response(cached.body, response.etag or cached.etag,
+                                        response.last_modified or cached.last_modified)
+        else:
+            store.put(store_key, method, response, CACHE_TTL)
+            value = parse(response.body)
+            source = response
+    finally:
+        if locked:
+            store.unlock(store_key, owner)
+
+    if value is not None:
+        _cache_put(key, value, CACHE_TTL, source)
+    return value
+
+
+def get_summary(code: int) -> str:
+    """
+    Returns the description of a WMO weather code
+    """
     match code:
         case 0:
             return 'Clear sky'
@@ -58,7 +353,8 @@ def _get_summary(code: int) -> str:
             return 'Unknown'
 
 
-def get_current_weather(location: str, lat: float, long: float, timezone: str) -> model.CurrentWeather | None:
+def get_current_weather(location: str, lat: float, long: float, timezone: str,
+                        show_status: bool = True) -> model.CurrentWeather | None:
     """
     This function returns the weather forecast at the given location
 
@@ -66,43 +362,80 @@ def get_current_weather(location: str, lat: float, long: float, timezone: str) -
     :param lat: The latitude for the location to report on
     :param long:  The longitude for the location to report on
     :param timezone: The time zone for the given location
+    :param show_status: Flag to indicate if a status spinner should be displayed during the download
     :return: The 7-day forecast for the given location
     """
     params = {
         "latitude": lat,
         "longitude": long,
-        "daily": ['weathercode', 'temperature_2m_max', 'temperature_2m_min', 'sunrise', 'sunset', 'precipitation_sum',
-                  'rain_sum', 'showers_sum', 'snowfall_sum', 'precipitation_hours'],
         "timezone": timezone,
         "current_weather": "true"
     }
 
+    key = _cache_key('current', params, location)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    return _flights.do(key, lambda: _load_current_weather(location, params, key, show_status))
+
+
+def _load_current_weather(location: str, params: dict, key: tuple,
+                          show_status: bool) -> model.CurrentWeather | None:
+    """
+    Downloads or revalidates and parses the current weather, storing the result in the cache
+    """
+    lat, long, timezone = params['latitude'], params['longitude'], params['timezone']
+
     try:
-        with _console.status("Downloading current weather..."):
-            response = requests.get(url='https://api.open-meteo.com/v1/forecast', params=params)
+        return _fetch('current', params, key, "Downloading current weather...", show_status,
+                      lambda body: _parse_current_weather(location, body))
+    except errors.ProviderError as e:
+        logger.error(f"Failed to obtain current weather data: ({lat},{long}), {timezone} - {e}")
+        return None
     except Exception as e:
         logger.error(f"Failed to get forecast data: ({lat},{long}), {timezone} - {e}")
         raise
 
-    if response.status_code == 200:
-        data = response.json()['current_weather']
 
-        time = data['time']
-        weather_code = int(data['weathercode'])
-        weather_summary = _get_summary(weather_code)
-        temperature = data['temperature']
-        windspeed = data['windspeed']
-        winddirection = data['winddirection']
+def _parse_current_weather(location: str, body: bytes) -> model.CurrentWeather:
+    """
+    Parses the current weather document
+    """
+    data = json.loads(body)['current_weather']
+
+    time = data['time']
+    weather_code = int(data['weathercode'])
+    temperature = data['temperature']
+    windspeed = data['windspeed']
+    winddirection = data['winddirection']
 
-        return model.CurrentWeather(temperature, windspeed, winddirection, weather_code, _get_summary(weather_code),
-                                    time, location)
-    else:
-        logger.error(
-            f"Failed to obtain current weather data: ({lat},{long}), {timezone} - {response.status_code} - "
-            f"{response.text}")
+    return model.CurrentWeather(temperature, windspeed, winddirection, weather_code,
+                                get_summary(weather_code), time, location)
 
 
-def get_forecast(location: str, lat: float, long: float, timezone: str) -> model.Forecasts | None:
+def _forecast_params(lat: float, long: float, timezone: str, variables: Iterable[str] | None,
+                     available: dict[str, str] = FORECAST_VARIABLES) -> dict:
+    """
+    Builds the forecast request parameters for the given model.Forecast fields, out of those the endpoint serves
+    """
+    # Taken once, as a generator would be used up by the check below
+    variables = tuple(available.keys() if variables is None else variables)
+
+    unknown = set(variables) - available.keys()
+    if unknown:
+        raise ValueError(f"Unknown forecast variables: {', '.join(sorted(unknown))}")
+
+    return {
+        "latitude": lat,
+        "longitude": long,
+        "daily": [upstream for field, upstream in available.items() if field in variables],
+        "timezone": timezone
+    }
+
+
+def get_forecast(location: str, lat: float, long: float, timezone: str, show_status: bool = True,
+                 variables: Iterable[str] | None = None) -> model.Forecasts | None:
     """
     This function returns the weather forecast at the given location
 
@@ -110,93 +443,172 @@ def get_forecast(location: str, lat: float, long: float, timezone: str) -> model
     :param lat: The latitude for the location to report on
     :param long:  The longitude for the location to report on
     :param timezone: The time zone for the given location
+    :param show_status: Flag to indicate if a status spinner should be displayed during the download
+    :param variables: The model.Forecast fields to download, all of them when not given. The fields not
+                      requested are left empty.
     :return: The 7-day forecast for the given location
     """
-    params = {
-        "latitude": lat,
-        "longitude": long,
-        "daily": ['weathercode', 'temperature_2m_max', 'temperature_2m_min', 'sunrise', 'sunset', 'precipitation_sum',
-                  'rain_sum', 'showers_sum', 'snowfall_sum', 'precipitation_hours', 'windspeed_10m_max',
-                  'winddirection_10m_dominant'],
-        "timezone": timezone
-    }
+    params = _forecast_params(lat, long, timezone, variables)
+
+    key = _cache_key('forecast', params, location)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    return _flights.do(key, lambda: _load_forecast(location, params, key, show_status))
+
+
+def _load_forecast(location: str, params: dict, key: tuple, show_status: bool) -> model.Forecasts | None:
+    """
+    Downloads or revalidates and parses the weather forecast, storing the result in the cache
+    """
+    lat, long, timezone = params['latitude'], params['longitude'], params['timezone']
 
     try:
-        with _console.status("Downloading weather forecast..."):
-            response = requests.get(url='https://api.open-meteo.com/v1/forecast', params=params)
+        return _fetch('forecast', params, key, "Downloading weather forecast...", show_status,
+                      lambda body: _parse_forecast(location, params, body))
+    except errors.ProviderError as e:
+        logger.error(f"Failed to obtain forecast data: ({lat},{long}), {timezone} - {e}")
+        return None
     except Exception as e:
         logger.error(f"Failed to get forecast data: ({lat},{long}), {timezone} - {e}")
         raise
 
-    if response.status_code == 200:
-        data = response.json()['daily']
-
-        forecasts = list()
-
-        for i in range(0, len(data['time'])):
-            day = data['time'][i]
-            weather_code = int(data['weathercode'][i])
-            weather_summary = _get_summary(weather_code)
-            temp_max = data['temperature_2m_max'][i]
-            temp_min = data['temperature_2m_min'][i]
-            sunrise = data['sunrise'][i]
-            sunset = data['sunset'][i]
-            precipitation_sum = data['precipitation_sum'][i]
-            rain = data['rain_sum'][i]
-            showers = data['showers_sum'][i]
-            snowfall = data['snowfall_sum'][i]
-            precipitation_hours = data['precipitation_hours'][i]
-            windspeed = data['windspeed_10m_max'][i]
-            winddirection = data['winddirection_10m_dominant'][i]
-
-            forecasts.append(
-                model.Forecast(location, day, weather_code, weather_summary, temp_max, temp_min, sunrise, sunset,
-                               precipitation_sum, rain, showers, snowfall, precipitation_hours, windspeed,
-                               winddirection))
-
-        return model.Forecasts(forecasts)
-    else:
-        logger.error(
-            f"Failed to obtain forecast data: ({lat},{long}), {timezone} - {response.status_code} - {response.text}")
 
+def _parse_forecast(location: str, params: dict, body: bytes) -> model.Forecasts:
+    """
+    Parses the daily forecast document
+    """
+    data = json.loads(body)['daily']
+
+    forecasts = list()
+
+    fields = [(field, data[upstream]) for field, upstream in FORECAST_VARIABLES.items()
+              if upstream in params['daily']]
 
-def get_locations(name: str, limit: int = 10) -> model.Locations | None:
+    for i in range(0, len(data['time'])):
+        values = dict((field, column[i]) for field, column in fields)
+        if 'weather_code' in values:
+            values['weather_code'] = int(values['weather_code'])
+            values['weather_summary'] = get_summary(values['weather_code'])
+
+        forecasts.append(model.Forecast(location=location, day=data['time'][i], **values))
+
+    return model.Forecasts(forecasts)
+
+
+def download_forecast(lat: float, long: float, timezone: str, variables: Iterable[str] | None = None) -> bytes | None:
+    """
+    This function downloads the raw forecast document without parsing it, for callers that decode elsewhere
+
+    :param lat: The latitude for the location to report on
+    :param long:  The longitude for the location to report on
+    :param timezone: The time zone for the given location
+    :param variables: The model.Forecast fields to download, all of them when not given
+    :return: The JSON body of the response
+    """
+    params = _forecast_params(lat, long, timezone, variables)
+
+    try:
+        return _download('forecast', params, "", False).body
+    except errors.ProviderError as e:
+        logger.error(f"Failed to obtain forecast data: ({lat},{long}), {timezone} - {e}")
+    except Exception as e:
+        logger.error(f"Failed to get forecast data: ({lat},{long}), {timezone} - {e}")
+        raise
+
+
+def download_archive(lat: float, long: float, timezone: str, start: datetime.date, end: datetime.date,
+                     variables: Iterable[str] | None = None) -> bytes | None:
+    """
+    This function downloads the raw historical observations for a date range from the Open-Meteo archive, whose
+    daily document has the same layout as the forecast
+
+    :param lat: The latitude for the location to report on
+    :param long:  The longitude for the location to report on
+    :param timezone: The time zone for the given location
+    :param start: The first day of the range
+    :param end: The last day of the range
+    :param variables: The model.Forecast fields to download, all those in ARCHIVE_VARIABLES when not given
+    :return: The JSON body of the response
+    """
+    params = _forecast_params(lat, long, timezone, variables, ARCHIVE_VARIABLES)
+    params['start_date'] = start.isoformat()
+    params['end_date'] = end.isoformat()
+
+    try:
+        return _download('archive', params, "", False).body
+    except errors.ProviderError as e:
+        logger.error(f"Failed to obtain archive data: ({lat},{long}), {timezone}, {start} - {end} - {e}")
+    except Exception as e:
+        logger.error(f"Failed to get archive data: ({lat},{long}), {timezone}, {start} - {end} - {e}")
+        raise
+
+
+def get_locations(name: str, limit: int = 10, show_status: bool = True,
+                  raise_errors: bool = False) -> model.Locations | None:
     """
     This function returns the lookup entries for a given location name
 
     :param name: The name of the location
     :param limit: The number of entries to return
+    :param show_status: Flag to indicate if a status spinner should be displayed during the download
+    :param raise_errors: Flag to raise a ProviderError when no provider answers, rather than returning None as when
+        nothing matches
     :return: The lost of possible locations matching the name given
     """
     params = {"name": name, "count": limit}
 
+    key = _cache_key('geocode', params)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
     try:
-        with _console.status("Downloading locations..."):
-            response = requests.get(url='https://geocoding-api.open-meteo.com/v1/search', params=params)
+        return _flights.do(key, lambda: _load_locations(name, params, key, show_status))
+    except errors.ProviderError as e:
+        if raise_errors:
+            raise
+        logger.error(f"Failed to obtain location data: {name} - {e}")
+        return None
+
+
+def _load_locations(name: str, params: dict, key: tuple, show_status: bool) -> model.Locations | None:
+    """
+    Downloads or revalidates and parses the locations matching the name, storing the result in the cache
+    """
+    try:
+        return _fetch('geocode', params, key, "Downloading locations...", show_status, _parse_locations)
+    except errors.ProviderError:
+        raise
     except Exception as e:
         logger.error(f"Failed to get location: {name} - {e}")
         raise
 
-    if response.status_code == 200:
-        response_data = response.json()
-        if 'results' not in response_data:
-            return None
-        data = response_data['results']
-        locations = model.Locations()
-
-        for item in data:
-            name = item['name']
-            latitude = item['latitude']
-            longitude = item['longitude']
-            region = item['admin1'] if 'admin1' in item else ''
-            country_code = item['country_code']
-            country = item['country'] if 'country' in item else ''
-            timezone = item['timezone']
-            post_codes = item['postcodes'] if 'postcodes' in item else []
-
-            locations.append(
-                model.Location(name, name, longitude, latitude, region, country_code, country, timezone, post_codes))
-
-        return locations
-    else:
-        logger.error(f"Failed to obtain location data: {name} - {response.status_code} - {response.text}")
+
+def _parse_locations(body: bytes) -> model.Locations | None:
+    """
+    Parses the geocoding document, returning None when nothing matched
+    """
+    response_data = json.loads(body)
+    if 'results' not in response_data:
+        return None
+    data = response_data['results']
+    locations = model.Locations()
+
+    for item in data:
+        name = item['name']
+        latitude = item['latitude']
+        longitude = item['longitude']
+        region = item['admin1'] if 'admin1' in item else ''
+        country_code = item['country_code']
+        country = item['country'] if 'country' in item else ''
+        timezone = item['timezone']
+        post_codes = item['postcodes'] if 'postcodes' in item else []
+        population = item['population'] if 'population' in item else None
+
+        locations.append(
+            model.Location(name, name, longitude, latitude, region, country_code, country, timezone, post_codes,
+                           population=population))
+
+    return locations